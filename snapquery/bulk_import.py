@@ -0,0 +1,187 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from snapquery.snapquery_core import NamedQuery, NamedQueryManager, NamedQuerySet, QueryDetails
+
+logger = logging.getLogger(__name__)
+
+
+def query_details_record(query_id_and_sparql: Tuple[str, str]) -> Dict:
+    """
+    compute the QueryDetails record for the given query id and sparql
+
+    module level function so that it can be used in a process pool
+
+    Args:
+        query_id_and_sparql(Tuple[str,str]): the query_id and sparql query
+
+    Returns:
+        Dict: the QueryDetails record
+    """
+    query_id, sparql = query_id_and_sparql
+    qd = QueryDetails.from_sparql(query_id=query_id, sparql=sparql)
+    return asdict(qd)
+
+
+@dataclass
+class BulkImportStats:
+    """
+    statistics of a bulk import
+    """
+
+    name: str
+    rows: int = 0
+    batches: int = 0
+    skipped: int = 0  # queries without sparql
+    details_duration: float = 0.0  # seconds for computing the QueryDetails
+    store_duration: float = 0.0  # seconds for the SQL upserts
+    # the ids of the stored queries with the same fingerprint by imported query_id
+    duplicates: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.details_duration + self.store_duration
+
+    @property
+    def rows_per_sec(self) -> float:
+        rows_per_sec = self.rows / self.duration if self.duration > 0 else 0.0
+        return rows_per_sec
+
+    def __str__(self) -> str:
+        text = (
+            f"{self.name}: {self.rows} rows in {self.batches} batches "
+            f"{self.duration:.2f} s ({self.rows_per_sec:.0f} rows/s)"
+        )
+        if self.skipped:
+            text += f" {self.skipped} skipped without sparql"
+        if self.duplicates:
+            text += f" {len(self.duplicates)} duplicates"
+        return text
+
+
+class BulkImporter:
+    """
+    import named queries and their QueryDetails in bulk
+    using one upsert transaction per batch instead of one store call per query
+    """
+
+    def __init__(
+        self,
+        nqm: NamedQueryManager,
+        batch_size: int = 1000,
+        max_workers: Optional[int] = None,
+        min_parallel: int = 250,
+        debug: bool = False,
+    ):
+        """
+        Constructor
+
+        Args:
+            nqm(NamedQueryManager): the manager to store the queries with
+            batch_size(int): number of rows per transaction
+            max_workers(int): number of processes for computing the QueryDetails - default: cpu count
+            min_parallel(int): minimum number of queries for which a process pool is used
+            debug(bool): if True show debug information
+        """
+        self.nqm = nqm
+        self.batch_size = batch_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_parallel = min_parallel
+        self.debug = debug
+
+    def get_details_lod(self, nq_list: List[NamedQuery]) -> List[Dict]:
+        """
+        compute the QueryDetails records for the given named queries
+        using a process pool for large lists
+
+        Args:
+            nq_list(List[NamedQuery]): the named queries
+
+        Returns:
+            List[Dict]: the QueryDetails records
+        """
+        items = [(nq.query_id, nq.sparql) for nq in nq_list]
+        if len(items) < self.min_parallel or self.max_workers < 2:
+            details_lod = [query_details_record(item) for item in items]
+        else:
+            chunksize = max(1, len(items) // (self.max_workers * 4))
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                details_lod = list(executor.map(query_details_record, items, chunksize=chunksize))
+        return details_lod
+
+    def batches(self, lod: List[Dict]) -> Iterable[List[Dict]]:
+        """
+        split the given list of dicts into batches of my batch_size
+        """
+        for i in range(0, len(lod), self.batch_size):
+            yield lod[i : i + self.batch_size]
+
+    def import_queries(
+        self,
+        nq_list: List[NamedQuery],
+        name: str = "import",
+        show_progress: bool = False,
+    ) -> BulkImportStats:
+        """
+        upsert the given named queries and their QueryDetails in batched transactions
+
+        Args:
+            nq_list(List[NamedQuery]): the named queries to import
+            name(str): the name to report the statistics with
+            show_progress(bool): if True show a tqdm progress bar
+
+        Returns:
+            BulkImportStats: the statistics of the import
+        """
+        stats = BulkImportStats(name=name)
+        without_sparql = [nq.query_id for nq in nq_list if not nq.sparql]
+        if without_sparql:
+            stats.skipped = len(without_sparql)
+            logger.warning(f"{name}: skipping {stats.skipped} queries without sparql: {without_sparql}")
+        # deduplicate by query_id - the last entry wins as with single row upserts
+        nq_by_id = {nq.query_id: nq for nq in nq_list if nq.sparql}
+        nq_list = list(nq_by_id.values())
+        start_time = time.monotonic()
+        details_lod = self.get_details_lod(nq_list)
+        stats.details_duration = time.monotonic() - start_time
+        nq_lod = [asdict(nq) for nq in nq_list]
+        start_time = time.monotonic()
+        pbar = tqdm(total=len(nq_lod), desc=f"Storing {name}", disable=not show_progress)
+        for nq_batch, qd_batch in zip(self.batches(nq_lod), self.batches(details_lod)):
+            self.nqm.store_batch([(nq_batch, NamedQuery), (qd_batch, QueryDetails)])
+            stats.duplicates.update(self.nqm.find_duplicates(qd_batch))
+            stats.batches += 1
+            stats.rows += len(nq_batch)
+            pbar.update(len(nq_batch))
+        pbar.close()
+        stats.store_duration = time.monotonic() - start_time
+        if self.debug:
+            print(stats)
+        return stats
+
+    def import_query_set(self, nq_set: NamedQuerySet, show_progress: bool = False) -> BulkImportStats:
+        """
+        import the given named query set
+
+        Args:
+            nq_set(NamedQuerySet): the query set to import
+            show_progress(bool): if True show a tqdm progress bar
+
+        Returns:
+            BulkImportStats: the statistics of the import
+        """
+        name = f"{nq_set.namespace}@{nq_set.domain}"
+        stats = self.import_queries(nq_set.queries, name=name, show_progress=show_progress)
+        return stats
@@ -0,0 +1,227 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import math
+import statistics
+import threading
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from lodstorage.sql import SQLDB
+
+
+@dataclass
+class DurationPrediction:
+    """
+    the predicted duration of a query on an endpoint
+    """
+
+    query_id: str
+    endpoint_name: str
+    duration: Optional[float] = None  # expected duration in seconds
+    upper: Optional[float] = None  # 90th percentile in seconds
+    count: int = 0  # number of successful executions the prediction is based on
+    timeouts: int = 0  # number of timed out executions in the window
+    source: str = "none"  # history, duplicate, structure or none
+
+    @property
+    def known(self) -> bool:
+        return self.duration is not None
+
+
+class DurationPredictor:
+    """
+    predict query durations from the rolling statistics of the historical QueryStats
+    per query and endpoint with a fallback to the history of the queries with the same
+    fingerprint and then to the durations of queries of similar size (see QueryDetails)
+    on the same endpoint
+    """
+
+    def __init__(self, window: int = 20):
+        """
+        constructor
+
+        Args:
+            window(int): the number of most recent executions per query and endpoint to consider
+        """
+        self.window = window
+        self.lock = threading.Lock()
+        self.durations: Dict[Tuple[str, str], Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        self.timeouts: Dict[Tuple[str, str], Deque[bool]] = defaultdict(lambda: deque(maxlen=self.window))
+        self.sizes: Dict[str, int] = {}
+        # the ids of the queries by fingerprint
+        self.duplicates: Dict[str, Set[str]] = defaultdict(set)
+        self.fingerprints: Dict[str, str] = {}
+        # the stats_id of the last observed execution per query and endpoint
+        self.last_stats_ids: Dict[Tuple[str, str], str] = {}
+
+    @classmethod
+    def from_sql_db(cls, sql_db: SQLDB, window: int = 20) -> "DurationPredictor":
+        """
+        create a predictor from the QueryStats and QueryDetails of the given database
+        """
+        predictor = cls(window=window)
+        stats_records = sql_db.queryGen(
+            "SELECT query_id, endpoint_name, duration, error_category FROM QueryStats ORDER BY time_stamp"
+        )
+        for record in stats_records:
+            predictor.add(record["query_id"], record["endpoint_name"], record["duration"], record["error_category"])
+        for record in sql_db.queryGen("SELECT query_id, size, fingerprint FROM QueryDetails"):
+            predictor.add_details(record["query_id"], record["size"], record["fingerprint"])
+        return predictor
+
+    def add_details(self, query_id: str, size: Optional[int], fingerprint: Optional[str] = None):
+        """
+        add the size and fingerprint of the given query from its QueryDetails
+        """
+        with self.lock:
+            self.sizes[query_id] = size
+            previous = self.fingerprints.pop(query_id, None)
+            if previous:
+                self.duplicates[previous].discard(query_id)
+            if fingerprint:
+                self.fingerprints[query_id] = fingerprint
+                self.duplicates[fingerprint].add(query_id)
+
+    def add(self, query_id: str, endpoint_name: str, duration: Optional[float], error_category: Optional[str] = None):
+        """
+        add the outcome of an execution
+        """
+        key = (query_id, endpoint_name)
+        with self.lock:
+            if error_category == "Timeout":
+                self.timeouts[key].append(True)
+            elif duration is not None and not error_category:
+                self.durations[key].append(duration)
+                self.timeouts[key].append(False)
+
+    def observe(self, stats):
+        """
+        add the outcome of the execution with the given QueryStats
+        stats that are stored repeatedly e.g. with a changed context are only counted once
+        """
+        key = (stats.query_id, stats.endpoint_name)
+        with self.lock:
+            if self.last_stats_ids.get(key) == stats.stats_id:
+                return
+            self.last_stats_ids[key] = stats.stats_id
+        self.add(stats.query_id, stats.endpoint_name, stats.duration, stats.error_category)
+
+    @classmethod
+    def percentile(cls, values: List[float], p: float) -> float:
+        """
+        the nearest rank percentile of the given values
+        """
+        ordered = sorted(values)
+        index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+        return ordered[index]
+
+    @classmethod
+    def size_bucket(cls, size: int) -> int:
+        return int(math.log2(size)) if size and size > 0 else 0
+
+    def predict(self, query_id: str, endpoint_name: str) -> DurationPrediction:
+        """
+        predict the duration of the given query on the given endpoint
+        """
+        prediction = DurationPrediction(query_id=query_id, endpoint_name=endpoint_name)
+        key = (query_id, endpoint_name)
+        with self.lock:
+            durations = list(self.durations.get(key, []))
+            prediction.timeouts = sum(self.timeouts.get(key, []))
+            if durations:
+                prediction.source = "history"
+            else:
+                durations = self.duplicate_durations(query_id, endpoint_name)
+                if durations:
+                    prediction.source = "duplicate"
+            if durations:
+                prediction.count = len(durations)
+            else:
+                durations = self.similar_durations(query_id, endpoint_name)
+                if durations:
+                    prediction.source = "structure"
+        if durations:
+            prediction.duration = statistics.median(durations)
+            prediction.upper = self.percentile(durations, 90)
+        return prediction
+
+    def duplicate_durations(self, query_id: str, endpoint_name: str) -> List[float]:
+        """
+        get the durations of the queries with the same fingerprint on the given endpoint
+        - must be called with the lock held
+        """
+        fingerprint = self.fingerprints.get(query_id)
+        if not fingerprint:
+            return []
+        durations = []
+        for other_id in sorted(self.duplicates[fingerprint]):
+            if other_id != query_id:
+                durations.extend(self.durations.get((other_id, endpoint_name), []))
+        return durations
+
+    def similar_durations(self, query_id: str, endpoint_name: str) -> List[float]:
+        """
+        get the median durations of the queries of similar size on the given endpoint
+        - empty if the size of the query or of all similar queries is unknown
+        - must be called with the lock held
+        """
+        similar = []
+        if query_id not in self.sizes:
+            return similar
+        bucket = self.size_bucket(self.sizes[query_id])
+        for (other_id, other_endpoint), durations in self.durations.items():
+            if other_endpoint != endpoint_name or not durations or other_id not in self.sizes:
+                continue
+            if self.size_bucket(self.sizes[other_id]) == bucket:
+                similar.append(statistics.median(durations))
+        return similar
+
+    def get_timeout(
+        self,
+        query_id: str,
+        endpoint_name: str,
+        factor: float = 3.0,
+        min_timeout: float = 10.0,
+        max_timeout: float = 120.0,
+    ) -> float:
+        """
+        get an adaptive timeout for the given query on the given endpoint
+
+        Args:
+            factor(float): the multiple of the 90th percentile duration to allow
+            min_timeout(float): the lower bound in seconds
+            max_timeout(float): the upper bound in seconds - used if nothing is known
+
+        Returns:
+            float: the timeout in seconds
+        """
+        prediction = self.predict(query_id, endpoint_name)
+        if not prediction.known:
+            return max_timeout
+        timeout = min(max(factor * prediction.upper, min_timeout), max_timeout)
+        return timeout
+
+    def order(self, query_ids: Iterable[str], endpoint_name: str, longest_first: bool = False) -> List[str]:
+        """
+        order the given queries by their predicted duration on the given endpoint
+
+        shortest first minimizes the average completion time, longest first
+        minimizes the makespan when the queries are spread over parallel workers
+        queries with unknown durations are kept last in their original order
+
+        Args:
+            query_ids: the ids of the queries to order
+            endpoint_name(str): the endpoint the queries are going to be executed on
+            longest_first(bool): if True order by descending predicted duration
+        """
+        query_ids = list(query_ids)
+        predicted = {query_id: self.predict(query_id, endpoint_name).duration for query_id in query_ids}
+        known = [query_id for query_id in query_ids if predicted[query_id] is not None]
+        unknown = [query_id for query_id in query_ids if predicted[query_id] is None]
+        known.sort(key=lambda query_id: predicted[query_id], reverse=longest_first)
+        return known + unknown
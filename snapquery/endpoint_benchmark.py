@@ -0,0 +1,202 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+from tabulate import tabulate
+from tqdm import tqdm
+
+from snapquery.endpoint_benchmark_result import EndpointBenchmarkResult
+from snapquery.execution import Execution
+from snapquery.param_template import ParamTemplateCache
+from snapquery.snapquery_core import NamedQuery, NamedQueryManager, QueryBundle, QueryPrefixMerger
+
+logger = logging.getLogger(__name__)
+
+
+class EndpointBenchmark:
+    """
+    run a query set against selected endpoints with warmup rounds,
+    repetitions, concurrency levels and a cooldown and record the
+    latency percentiles, throughput and result sizes
+    """
+
+    def __init__(
+        self,
+        nqm: NamedQueryManager,
+        endpoint_names: List[str],
+        warmup: int = 1,
+        repetitions: int = 5,
+        concurrency_levels: Optional[List[int]] = None,
+        cooldown: float = 1.0,
+        limit: Optional[int] = None,
+        prefix_merger: QueryPrefixMerger = QueryPrefixMerger.SIMPLE_MERGER,
+        debug: bool = False,
+    ):
+        """
+        Constructor
+
+        Args:
+            nqm(NamedQueryManager): the manager of the queries, endpoints and the result table
+            endpoint_names(List[str]): the endpoints to benchmark
+            warmup(int): the number of untimed runs before the timed runs
+            repetitions(int): the number of timed runs per concurrency level
+            concurrency_levels(List[int]): the numbers of concurrent clients - default: [1]
+            cooldown(float): the pause in seconds after each query/endpoint/concurrency combination
+            limit(int): the record limit for the queries (if any)
+            prefix_merger: prefix merger to use
+            debug(bool): if True show debug information
+        """
+        self.nqm = nqm
+        self.endpoint_names = endpoint_names
+        self.warmup = warmup
+        self.repetitions = repetitions
+        self.concurrency_levels = concurrency_levels or [1]
+        self.cooldown = cooldown
+        self.limit = limit
+        self.prefix_merger = prefix_merger
+        self.debug = debug
+        self.run_id = str(uuid.uuid4())
+        self.execution = Execution(nqm, debug=debug)
+
+    def get_query_bundle(self, nq: NamedQuery, endpoint_name: str) -> QueryBundle:
+        """
+        get the parameterized query bundle for the given query and endpoint
+        """
+        query_bundle = self.nqm.as_query_bundle(nq, endpoint_name, self.limit, self.prefix_merger)
+        template = ParamTemplateCache.get_instance().get(query_bundle.query.query)
+        if template.has_params:
+            _qd, params_dict = self.execution.parameterize(nq)
+            query_bundle.query.query = template.render(params_dict)
+        return query_bundle
+
+    def timed_run(self, query_bundle: QueryBundle) -> Tuple[float, int]:
+        """
+        run the given query once
+
+        Returns:
+            Tuple[float, int]: the duration in seconds and the number of records
+        """
+        start = time.perf_counter()
+        lod = query_bundle.get_lod()
+        duration = time.perf_counter() - start
+        return duration, len(lod) if lod else 0
+
+    def benchmark_query(self, nq: NamedQuery, endpoint_name: str, concurrency: int) -> EndpointBenchmarkResult:
+        """
+        benchmark the given query on the given endpoint at the given concurrency level
+        """
+        result = EndpointBenchmarkResult(
+            run_id=self.run_id,
+            query_id=nq.query_id,
+            endpoint_name=endpoint_name,
+            concurrency=concurrency,
+            warmup=self.warmup,
+            repetitions=self.repetitions,
+        )
+        try:
+            query_bundle = self.get_query_bundle(nq, endpoint_name)
+            for _ in range(self.warmup):
+                self.timed_run(query_bundle)
+        except Exception as ex:
+            result.errors = 1
+            result.error_msg = str(ex)
+            return result
+        durations = []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(self.timed_run, query_bundle) for _ in range(self.repetitions)]
+            for future in futures:
+                try:
+                    duration, records = future.result()
+                    durations.append(duration)
+                    result.records = records
+                except Exception as ex:
+                    result.errors += 1
+                    result.error_msg = str(ex)
+        result.set_durations(durations, time.perf_counter() - start)
+        return result
+
+    def run(
+        self, queries: List[NamedQuery], with_store: bool = True, with_progress: bool = False
+    ) -> List[EndpointBenchmarkResult]:
+        """
+        benchmark the given queries on all my endpoints and concurrency levels
+
+        Args:
+            queries(List[NamedQuery]): the queries e.g. of the qlever_performance query set
+            with_store(bool): if True store the results in the EndpointBenchmarkResult table
+            with_progress(bool): if True show a progress bar
+
+        Returns:
+            List[EndpointBenchmarkResult]: the results
+        """
+        combinations = [
+            (nq, endpoint_name, concurrency)
+            for nq in queries
+            for endpoint_name in self.endpoint_names
+            for concurrency in self.concurrency_levels
+        ]
+        results = []
+        for i, (nq, endpoint_name, concurrency) in enumerate(
+            tqdm(combinations, desc="Benchmarking", disable=not with_progress)
+        ):
+            if i > 0 and self.cooldown > 0:
+                time.sleep(self.cooldown)
+            result = self.benchmark_query(nq, endpoint_name, concurrency)
+            logger.debug(f"{nq.query_id}@{endpoint_name}x{concurrency}: p50={result.p50} errors={result.errors}")
+            results.append(result)
+            if with_store:
+                self.nqm.store([asdict(result)], source_class=EndpointBenchmarkResult)
+        return results
+
+    @classmethod
+    def get_report(cls, results: List[EndpointBenchmarkResult], tablefmt: str = "github") -> str:
+        """
+        get a comparison report with a row per query and concurrency level
+        and the median latency and throughput per endpoint
+
+        Args:
+            results(List[EndpointBenchmarkResult]): the results to compare
+            tablefmt(str): the tabulate table format
+
+        Returns:
+            str: the report
+        """
+        endpoint_names = list(dict.fromkeys(result.endpoint_name for result in results))
+        rows: Dict[Tuple[str, int], Dict[str, object]] = {}
+        wins = {endpoint_name: 0 for endpoint_name in endpoint_names}
+        for result in results:
+            row = rows.setdefault(
+                (result.query_id, result.concurrency),
+                {"query_id": result.query_id, "concurrency": result.concurrency},
+            )
+            if result.runs:
+                cell = f"{result.p50 * 1000:.0f}/{result.p90 * 1000:.0f}/{result.p99 * 1000:.0f} ms"
+                cell += f" {result.throughput:.1f}/s" if result.throughput else ""
+                cell += f" ({result.records})"
+            else:
+                cell = "error"
+            row[result.endpoint_name] = cell
+        for (query_id, concurrency), row in rows.items():
+            timed = [
+                result
+                for result in results
+                if result.query_id == query_id and result.concurrency == concurrency and result.runs
+            ]
+            if timed:
+                fastest = min(timed, key=lambda result: result.p50)
+                row["fastest"] = fastest.endpoint_name
+                wins[fastest.endpoint_name] += 1
+        report = tabulate(list(rows.values()), headers="keys", tablefmt=tablefmt)
+        report += "\n\np50/p90/p99 latency, throughput and (records) - fastest by p50: "
+        report += ", ".join(f"{endpoint_name}: {count}" for endpoint_name, count in wins.items())
+        return report
@@ -0,0 +1,98 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import datetime
+import math
+import uuid
+from dataclasses import field
+from typing import List, Optional
+
+from basemkit.yamlable import lod_storable
+
+
+@lod_storable
+class EndpointBenchmarkResult:
+    """
+    the timings of a query on an endpoint at a concurrency level - times are seconds
+    """
+
+    run_id: str
+    query_id: str
+    endpoint_name: str
+    concurrency: int = 1
+    warmup: int = 0
+    repetitions: int = 0
+    runs: int = 0  # successful timed runs
+    errors: int = 0
+    records: Optional[int] = None
+    p50: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+    mean: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    throughput: Optional[float] = None  # successful queries per second
+    error_msg: Optional[str] = None
+    result_id: str = field(init=False)
+    time_stamp: datetime.datetime = field(init=False)
+
+    def __post_init__(self):
+        self.result_id = str(uuid.uuid4())
+        self.time_stamp = datetime.datetime.now()
+
+    @classmethod
+    def percentile(cls, sorted_values: List[float], p: float) -> float:
+        """
+        get the p-th percentile of the given sorted values by linear interpolation
+        """
+        k = (len(sorted_values) - 1) * p / 100
+        lower = math.floor(k)
+        upper = min(lower + 1, len(sorted_values) - 1)
+        value = sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+        return value
+
+    def set_durations(self, durations: List[float], elapsed: float):
+        """
+        set my statistics from the durations of the successful timed runs
+
+        Args:
+            durations(List[float]): the durations of the successful runs
+            elapsed(float): the wall clock time of the timed phase
+        """
+        self.runs = len(durations)
+        if durations:
+            values = sorted(durations)
+            self.p50 = self.percentile(values, 50)
+            self.p90 = self.percentile(values, 90)
+            self.p99 = self.percentile(values, 99)
+            self.mean = sum(values) / len(values)
+            self.min = values[0]
+            self.max = values[-1]
+            self.throughput = len(values) / elapsed if elapsed > 0 else None
+
+    @classmethod
+    def get_samples(cls) -> dict[str, "EndpointBenchmarkResult"]:
+        sample = cls(
+            run_id="2d0ed0a6-4d5e-4bd7-a0c0-6ad4d8b7a1a4",
+            query_id="all-papers-published-in-sigir--performance-dblp@qlever.cs.uni-freiburg.de",
+            endpoint_name="dblp",
+            concurrency=2,
+            warmup=1,
+            repetitions=10,
+            runs=10,
+            errors=0,
+            records=7167,
+            p50=0.12,
+            p90=0.25,
+            p99=0.31,
+            mean=0.15,
+            min=0.09,
+            max=0.32,
+            throughput=12.5,
+            error_msg="",
+        )
+        samples = {"dblp-performance": [sample]}
+        return samples
@@ -126,9 +126,13 @@ class ErrorFilter:
         Returns:
 
         """
-        start_token = "Response: b'"
         end_token = "SPARQL query:"
-        message = self._extract_message_between_tokens(start_token, end_token)
+        message = None
+        # older SPARQLWrapper versions put the response on the same line
+        for start_token in ["Response:\nb'", "Response: b'"]:
+            message = self._extract_message_between_tokens(start_token, end_token)
+            if message:
+                break
         if message:
             return message
         else:
@@ -5,6 +5,7 @@ Created on 2024-07-09
 """
 
 import logging
+from typing import List
 
 from snapquery.snapquery_core import NamedQuery, NamedQueryManager, QueryDetails, QueryPrefixMerger
 
@@ -26,7 +27,7 @@ class Execution:
         see
         https://github.com/WolfgangFahl/snapquery/issues/33
         """
-        qd = QueryDetails.from_sparql(query_id=nq.query_id, sparql=nq.sparql)
+        qd = QueryDetails.from_sparql(query_id=nq.query_id, sparql=nq.sparql, with_fingerprint=False)
         # Execute the query
         params_dict = {}
         # @FIXME - you can't do this - hard code
@@ -44,20 +45,47 @@ class Execution:
         title: str,
         context: str = "test",
         prefix_merger: QueryPrefixMerger = QueryPrefixMerger.SIMPLE_MERGER,
+        with_snapshot: bool = False,
+        adaptive_timeout: bool = False,
     ):
         """
-        execute the given named query
+        execute the given named query - with_snapshot keeps a content addressed snapshot of the result
+        adaptive_timeout derives the request timeout from the predicted duration
         """
         qd, params_dict = self.parameterize(nq)
         self.logger.debug(f"{title}: {nq.name} {qd} - via {endpoint_name}")
+        timeout = None
+        if adaptive_timeout:
+            timeout = self.nqm.get_duration_predictor().get_timeout(nq.query_id, endpoint_name)
         _results, stats = self.nqm.execute_query(
-            nq, params_dict=params_dict, endpoint_name=endpoint_name, prefix_merger=prefix_merger
+            nq,
+            params_dict=params_dict,
+            endpoint_name=endpoint_name,
+            prefix_merger=prefix_merger,
+            with_snapshot=with_snapshot,
+            timeout=timeout,
+            context=context,
         )
-        stats.context = context
-        self.nqm.store_stats([stats])
         msg = f"{title} executed:"
         if not stats.records:
             msg += f"error {stats.filtered_msg}"
         else:
             msg += f"{stats.records} records found"
         self.logger.debug(msg)
+
+    def order_queries(self, queries: List[NamedQuery], endpoint_name: str, order: str = None) -> List[NamedQuery]:
+        """
+        order the given queries by their predicted duration on the given endpoint
+
+        Args:
+            queries(List[NamedQuery]): the queries to order
+            endpoint_name(str): the endpoint the queries are going to be executed on
+            order(str): "shortest" or "longest" first - None keeps the given order
+        """
+        if not order:
+            return queries
+        by_id = {nq.query_id: nq for nq in queries}
+        predictor = self.nqm.get_duration_predictor()
+        query_ids = predictor.order(by_id.keys(), endpoint_name, longest_first=order == "longest")
+        ordered = [by_id[query_id] for query_id in query_ids]
+        return ordered
@@ -5,14 +5,55 @@ Created on 2025-12-02
 @author: wf
 """
 
+import hashlib
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import requests
 
 
-class GitHub:
+class RepositoryImportState:
+    """
+    remember the blob SHAs by file path of the last import of a repository path
+    to support incremental imports - needs owner, repo, branch and cache_dir attributes
+    """
+
+    def get_import_state_path(self, path: str = "") -> Optional[Path]:
+        """
+        get the path of the import state file for the given repository path
+        """
+        if self.cache_dir is None:
+            return None
+        owner = self.owner or "local"
+        key = f"{owner}/{self.repo}/{self.branch or 'HEAD'}/{path.strip('/')}"
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"import-{owner}-{self.repo}-{digest}.json"
+
+    def load_import_state(self, path: str = "") -> Dict[str, str]:
+        """
+        load the blob SHAs by file path of the last import of the given repository path
+        """
+        state_path = self.get_import_state_path(path)
+        if state_path and state_path.exists():
+            try:
+                return json.loads(state_path.read_text())
+            except (json.JSONDecodeError, OSError):
+                pass
+        return {}
+
+    def save_import_state(self, shas: Dict[str, str], path: str = ""):
+        """
+        save the blob SHAs by file path of an import of the given repository path
+        """
+        state_path = self.get_import_state_path(path)
+        if state_path:
+            state_path.parent.mkdir(parents=True, exist_ok=True)
+            state_path.write_text(json.dumps(shas, indent=2))
+
+
+class GitHub(RepositoryImportState):
     """
     A simple GitHub API client for accessing repository contents.
     """
@@ -23,7 +64,10 @@ class GitHub:
         repo: str,
         branch: Optional[str] = None,
         token: Optional[str] = None,
-        session: Optional[requests.Session] = None
+        session: Optional[requests.Session] = None,
+        cache_dir: Optional[str] = None,
+        with_cache: bool = True,
+        max_workers: int = 8,
     ):
         """
         Initialize GitHub client.
@@ -34,6 +78,10 @@ class GitHub:
             branch: Optional specific branch or commit SHA (default: default repo branch)
             token: Optional GitHub API token for authentication
             session: Optional custom requests.Session
+            cache_dir: Optional directory for the ETag response and blob cache
+                (default: ~/.solutions/snapquery/github)
+            with_cache: if False do not cache any responses on disk
+            max_workers: maximum number of concurrent downloads
         """
         self.owner = owner
         self.repo = repo
@@ -47,7 +95,13 @@ class GitHub:
 
         # Use custom session or create new one
         self.session = session or requests.Session()
-
+        self.max_workers = max_workers
+        self.cache_dir = None
+        if with_cache:
+            if cache_dir is None:
+                cache_dir = Path.home() / ".solutions" / "snapquery" / "github"
+            # the directories are created on the first write
+            self.cache_dir = Path(cache_dir)
 
     def _headers(self) -> Dict[str, str]:
         headers = {"Accept": "application/vnd.github.v3+json"}
@@ -88,14 +142,111 @@ class GitHub:
         if self.branch:
             params["ref"] = self.branch
 
-        response = self.session.get(url, headers=self._headers(), params=params, timeout=30)
+        return self.get_json(url, params=params)
+
+    def _response_cache_path(self, url: str, params: Dict[str, str]) -> Optional[Path]:
+        """
+        get the cache file path for the given request
+        """
+        if self.cache_dir is None:
+            return None
+        key = json.dumps([url, sorted(params.items())])
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / "responses" / f"{digest}.json"
+
+    def get_json(self, url: str, params: Optional[Dict[str, str]] = None) -> Any:
+        """
+        GET the given API url as JSON revalidating a disk cached
+        response with If-None-Match - 304 responses do not count against the rate limit
+
+        Args:
+            url: the API url
+            params: optional query parameters
+
+        Returns:
+            the decoded JSON response
+        """
+        params = params or {}
+        headers = self._headers()
+        cache_path = self._response_cache_path(url, params)
+        cached = None
+        if cache_path and cache_path.exists():
+            try:
+                cached = json.loads(cache_path.read_text())
+                headers["If-None-Match"] = cached["etag"]
+            except (json.JSONDecodeError, KeyError, OSError):
+                cached = None
+        response = self.session.get(url, headers=headers, params=params, timeout=30)
+        if response.status_code == 304 and cached is not None:
+            return cached["data"]
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if cache_path and etag:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps({"etag": etag, "data": data}))
+        return data
+
+    def get_tree(self) -> Dict[str, Any]:
+        """
+        Get the complete recursive git tree of the branch with a single API call.
+
+        Returns:
+            the git tree response with "tree" entries and the "truncated" flag
+        """
+        ref = self.branch or "HEAD"
+        url = f"{self.base_url}/git/trees/{ref}"
+        return self.get_json(url, params={"recursive": "1"})
 
+    def tree_item_as_file_info(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a git tree blob entry to a contents API like file item dict.
+        """
+        ref = self.branch or "HEAD"
+        path = item["path"]
+        file_info = {
+            "name": path.rsplit("/", 1)[-1],
+            "path": path,
+            "sha": item.get("sha"),
+            "size": item.get("size"),
+            "type": "file",
+            "download_url": f"https://raw.githubusercontent.com/{self.owner}/{self.repo}/{ref}/{path}",
+            "html_url": f"https://github.com/{self.owner}/{self.repo}/blob/{ref}/{path}",
+        }
+        return file_info
 
     def list_files_recursive(self, path: str = "", suffix: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Recursively list files under a given path. Optionally filter by file suffix.
+        Recursively list files under a given path using a single recursive git trees API call.
+        Optionally filter by file suffix.
+
+        Args:
+            path: starting path within the repository
+            suffix: optional filename suffix filter, e.g., ".ttl"
+
+        Returns:
+            A flat list of GitHub content item dicts for files.
+        """
+        tree = self.get_tree()
+        if tree.get("truncated"):
+            # too large for a single trees call - walk the directories
+            return self.list_files_via_contents(path, suffix=suffix)
+        prefix = path.strip("/")
+        if prefix:
+            prefix += "/"
+        files: List[Dict[str, Any]] = []
+        for item in tree.get("tree", []):
+            item_path = item.get("path", "")
+            if item.get("type") != "blob" or not item_path.startswith(prefix):
+                continue
+            if suffix is None or item_path.endswith(suffix):
+                files.append(self.tree_item_as_file_info(item))
+        return files
+
+    def list_files_via_contents(self, path: str = "", suffix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Recursively list files under a given path with one contents API call per directory.
+        Optionally filter by file suffix.
 
         Args:
             path: starting path within the repository
@@ -116,7 +267,7 @@ class GitHub:
                 if suffix is None or item_path.endswith(suffix):
                     files.append(item)
             elif item_type == "dir":
-                files.extend(self.list_files_recursive(item_path, suffix=suffix))
+                files.extend(self.list_files_via_contents(item_path, suffix=suffix))
         return files
 
     def download(self, download_url: str) -> str:
@@ -132,3 +283,55 @@ class GitHub:
         response = self.session.get(download_url, headers=self._headers(), timeout=30)
         response.raise_for_status()
         return response.text
+
+    def download_file(self, file_info: Dict[str, Any]) -> str:
+        """
+        Download the content of the given file item - blobs are cached on disk by their SHA
+        so unchanged files are never downloaded twice.
+
+        Args:
+            file_info: a file item dict with "download_url" and optional "sha"
+
+        Returns:
+            The text content of the file
+        """
+        sha = file_info.get("sha")
+        blob_path = self.cache_dir / "blobs" / sha if self.cache_dir and sha else None
+        if blob_path and blob_path.exists():
+            return blob_path.read_text(encoding="utf-8")
+        text = self.download(file_info["download_url"])
+        if blob_path:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            blob_path.write_text(text, encoding="utf-8")
+        return text
+
+    def download_all(
+        self,
+        file_infos: List[Dict[str, Any]],
+        on_error: Optional[Callable[[Dict[str, Any], Exception], None]] = None,
+        on_done: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, str]:
+        """
+        Download the given files concurrently through my session.
+
+        Args:
+            file_infos: the file item dicts to download
+            on_error: optional callback for failed downloads
+            on_done: optional callback after each download e.g. for progress
+
+        Returns:
+            a dict of the text contents by file path
+        """
+        contents: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.download_file, file_info): file_info for file_info in file_infos}
+            for future in as_completed(futures):
+                file_info = futures[future]
+                try:
+                    contents[file_info["path"]] = future.result()
+                except Exception as ex:
+                    if on_error:
+                        on_error(file_info, ex)
+                if on_done:
+                    on_done(file_info)
+        return contents
@@ -0,0 +1,231 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import rdflib
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from lodstorage.query import Endpoint
+from rdflib.query import Result
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LocalEndpointConfig:
+    """
+    the configuration of a local stand-in SPARQL endpoint
+    """
+
+    name: str = "local"
+    host: str = "127.0.0.1"
+    port: int = 0  # 0 picks a free port
+    fixture_path: Optional[str] = None  # default: the bundled samples/local_endpoint.ttl
+    latency: float = 0.0  # seconds added to every query
+    error_rate: float = 0.0  # share of the queries that fail with the error_kind
+    error_kind: str = "503"  # see LocalSparqlEndpoint.errors
+    seed: int = 42  # seed of the error injection
+    repeat: int = 1  # repeat the result rows to get large results
+
+
+class LocalSparqlEndpoint:
+    """
+    a local rdflib backed SPARQL endpoint for offline load and regression tests
+
+    the endpoint answers from a fixture graph and injects the configured
+    latency, errors and result sizes - the errors mimic the responses of
+    the public endpoints so that the ErrorFilter paths can be tested
+    deterministically
+    """
+
+    # error kind -> status code, content type, body
+    errors: Dict[str, Tuple[int, str, str]] = {
+        "429": (429, "text/plain", "Too Many Requests - Please retry in 60 seconds."),
+        "503": (503, "text/html", "<html><body><h1>503 Service Unavailable</h1></body></html>"),
+        "504": (504, "text/html", "<html><body><h1>504 Gateway Time-out</h1></body></html>"),
+        "virtuoso": (
+            400,
+            "text/plain",
+            "Virtuoso 37000 Error SP030: SPARQL compiler, line 1: syntax error at 'WHERE' before '{{'\n\n"
+            "SPARQL query:\n{query}",
+        ),
+        "qlever": (
+            400,
+            "application/json",
+            '{{"exception": "Not supported: SERVICE clause with a variable", "query": {query_json}, "status": "ERROR"}}',
+        ),
+    }
+
+    # result format -> rdflib serializer format, content type
+    formats: Dict[str, Tuple[str, str]] = {
+        "json": ("json", "application/sparql-results+json"),
+        "csv": ("csv", "text/csv"),
+        "xml": ("xml", "application/sparql-results+xml"),
+    }
+
+    def __init__(self, config: Optional[LocalEndpointConfig] = None):
+        """
+        Constructor
+
+        Args:
+            config(LocalEndpointConfig): the configuration - default: no latency, errors or repetition
+        """
+        self.config = config or LocalEndpointConfig()
+        fixture_path = self.config.fixture_path
+        if fixture_path is None:
+            fixture_path = os.path.join(os.path.dirname(__file__), "samples", "local_endpoint.ttl")
+        self.graph = rdflib.Graph()
+        self.graph.parse(fixture_path)
+        self.random = random.Random(self.config.seed)
+        # the rdflib graph is not meant for concurrent query evaluation
+        self.lock = threading.Lock()
+        self.query_count = 0
+        self.error_count = 0
+        self.server: Optional[uvicorn.Server] = None
+        self.thread: Optional[threading.Thread] = None
+        self.app = FastAPI()
+        self.app.add_api_route("/sparql", self.handle_request, methods=["GET", "POST"])
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.config.host}:{self.config.port}/sparql"
+
+    def get_result_format(self, request: Request, params: Dict[str, str]) -> str:
+        """
+        get the result format from the format/output parameter or the Accept header
+        """
+        r_format = params.get("format") or params.get("output")
+        if r_format not in self.formats:
+            accept = request.headers.get("accept", "")
+            r_format = "json"
+            for name, (_serializer, content_type) in self.formats.items():
+                if content_type in accept or f"/{name}" in accept:
+                    r_format = name
+                    break
+        return r_format
+
+    def should_fail(self) -> bool:
+        """
+        check whether the next query gets the configured error - deterministic for the seed
+        """
+        with self.lock:
+            self.query_count += 1
+            fail = self.config.error_rate > 0 and self.random.random() < self.config.error_rate
+            if fail:
+                self.error_count += 1
+        return fail
+
+    def error_response(self, query: str) -> Response:
+        status_code, media_type, body = self.errors[self.config.error_kind]
+        body = body.format(query=query, query_json=json.dumps(query))
+        return Response(content=body, status_code=status_code, media_type=media_type)
+
+    def evaluate(self, query: str, r_format: str) -> Tuple[bytes, str]:
+        """
+        evaluate the given query on my graph and serialize the result
+
+        Returns:
+            Tuple[bytes, str]: the serialized result and its content type
+        """
+        serializer, content_type = self.formats[r_format]
+        with self.lock:
+            result = self.graph.query(query)
+            if result.type == "SELECT" and self.config.repeat > 1:
+                repeated = Result("SELECT")
+                repeated.vars = result.vars
+                repeated.bindings = list(result.bindings) * self.config.repeat
+                result = repeated
+            if result.type in ("CONSTRUCT", "DESCRIBE"):
+                content = result.serialize(format="turtle")
+                content_type = "text/turtle"
+            else:
+                content = result.serialize(format=serializer)
+        return content, content_type
+
+    async def handle_request(self, request: Request) -> Response:
+        """
+        handle a SPARQL protocol GET or POST request
+        """
+        params = dict(request.query_params)
+        if request.method == "POST":
+            body = (await request.body()).decode("utf-8")
+            if request.headers.get("content-type", "").startswith("application/sparql-query"):
+                params["query"] = body
+            else:
+                params.update({key: values[0] for key, values in urllib.parse.parse_qs(body).items()})
+        query = params.get("query")
+        if not query:
+            return Response(content="no query given", status_code=400, media_type="text/plain")
+        if self.config.latency > 0:
+            await asyncio.sleep(self.config.latency)
+        if self.should_fail():
+            return self.error_response(query)
+        r_format = self.get_result_format(request, params)
+        try:
+            content, content_type = await run_in_threadpool(self.evaluate, query, r_format)
+        except Exception as ex:
+            return Response(content=f"Invalid SPARQL query: {ex}", status_code=400, media_type="text/plain")
+        return Response(content=content, media_type=content_type)
+
+    def as_endpoint(self) -> Endpoint:
+        endpoint = Endpoint(
+            name=self.config.name,
+            endpoint=self.url,
+            method="POST",
+            lang="sparql",
+            database="rdflib",
+            prefix_sets=["rdf", "wikidata"],
+        )
+        return endpoint
+
+    def register(self, nqm) -> Endpoint:
+        """
+        register me in the endpoints of the given NamedQueryManager
+        """
+        endpoint = self.as_endpoint()
+        nqm.endpoints[endpoint.name] = endpoint
+        return endpoint
+
+    def start(self, timeout: float = 10.0) -> "LocalSparqlEndpoint":
+        """
+        start serving in a background thread
+        """
+        config = uvicorn.Config(self.app, host=self.config.host, port=self.config.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        start_time = time.time()
+        while not self.server.started:
+            if not self.thread.is_alive() or time.time() - start_time > timeout:
+                raise RuntimeError(f"local SPARQL endpoint {self.config.name} did not start")
+            time.sleep(0.01)
+        self.config.port = self.server.servers[0].sockets[0].getsockname()[1]
+        logger.debug(f"local SPARQL endpoint {self.config.name} serving at {self.url}")
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.should_exit = True
+            self.thread.join()
+            self.server = None
+
+    def __enter__(self) -> "LocalSparqlEndpoint":
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,256 @@
+"""
+Local git repository access for query imports.
+
+Created on 2026-10-19
+@author: wf
+"""
+
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from snapquery.github_access import RepositoryImportState
+
+
+class LocalRepository(RepositoryImportState):
+    """
+    A cloned working tree or a bare git repository as a query source
+    offering the same listing and download interface as the GitHub client
+    so that imports work without the GitHub REST API e.g. on air-gapped hosts.
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        owner: Optional[str] = None,
+        repo: Optional[str] = None,
+        branch: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        max_workers: int = 8,
+        debug: bool = False,
+    ):
+        """
+        Initialize the local repository.
+
+        Args:
+            repo_path: path of the working tree or bare repository
+            owner: Optional GitHub owner of the upstream repository - if given the file
+                urls are the same as for a GitHub import
+            repo: Optional repository name (default: name of the repo_path directory)
+            branch: Optional branch, tag or commit to read via git plumbing -
+                if None a working tree is walked directly and a bare repository uses HEAD
+            cache_dir: Optional directory for the import state (default: ~/.solutions/snapquery/local)
+            max_workers: maximum number of concurrent file reads
+            debug: if True show debug information
+        """
+        self.repo_path = Path(repo_path).expanduser().resolve()
+        if not self.repo_path.is_dir():
+            raise ValueError(f"local repository {self.repo_path} does not exist")
+        self.owner = owner
+        self.repo = repo or self.repo_path.name.removesuffix(".git")
+        self.branch = branch
+        self.max_workers = max_workers
+        self.debug = debug
+        if cache_dir is None:
+            cache_dir = Path.home() / ".solutions" / "snapquery" / "local"
+        self.cache_dir = Path(cache_dir)
+        self.is_bare = self.git("rev-parse", "--is-bare-repository", check=False).strip() == "true"
+        # a working tree is walked unless an explicit ref is requested
+        self.use_git = self.is_bare or branch is not None
+
+    @property
+    def ref(self) -> str:
+        return self.branch or "HEAD"
+
+    def git(self, *args: str, check: bool = True) -> str:
+        """
+        run a git command in my repository
+
+        Args:
+            args: the git arguments
+            check: if True raise an exception on failure
+
+        Returns:
+            str: the standard output
+        """
+        result = subprocess.run(
+            ["git", "-C", str(self.repo_path), *args],
+            capture_output=True,
+            text=True,
+            check=check,
+        )
+        return result.stdout
+
+    def file_url(self, path: str) -> str:
+        """
+        get the url of the file with the given repository path
+        """
+        if self.owner:
+            url = f"https://raw.githubusercontent.com/{self.owner}/{self.repo}/{self.ref}/{path}"
+        else:
+            url = (self.repo_path / path).as_uri()
+        return url
+
+    def file_info(self, path: str, sha: str, size: Optional[int]) -> Dict[str, Any]:
+        """
+        create a GitHub contents API like file item dict
+        """
+        file_info = {
+            "name": path.rsplit("/", 1)[-1],
+            "path": path,
+            "sha": sha,
+            "size": size,
+            "type": "file",
+            "download_url": self.file_url(path),
+        }
+        return file_info
+
+    def list_files_recursive(self, path: str = "", suffix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Recursively list files under a given path. Optionally filter by file suffix.
+
+        Args:
+            path: starting path within the repository
+            suffix: optional filename suffix filter, e.g., ".ttl"
+
+        Returns:
+            A flat list of GitHub content item like dicts for files.
+        """
+        path = path.strip("/")
+        if self.use_git:
+            files = self.list_files_via_git(path, suffix)
+        else:
+            files = self.list_files_via_walk(path, suffix)
+        files.sort(key=lambda file_info: file_info["path"])
+        return files
+
+    def list_files_via_git(self, path: str, suffix: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        list the blobs of my ref with git ls-tree
+        """
+        args = ["ls-tree", "-r", "-l", "-z", "--full-tree", self.ref]
+        if path:
+            args += ["--", path]
+        files = []
+        for entry in self.git(*args).split("\0"):
+            if not entry:
+                continue
+            meta, file_path = entry.split("\t", 1)
+            _mode, obj_type, sha, size = meta.split()
+            if obj_type != "blob":
+                continue
+            if suffix is None or file_path.endswith(suffix):
+                files.append(self.file_info(file_path, sha, int(size) if size.isdigit() else None))
+        return files
+
+    def list_files_via_walk(self, path: str, suffix: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        walk my working tree - the sha of a file is a size/modification time token
+        so that changed files are detected without reading them
+        """
+        files = []
+        start = self.repo_path / path
+        for dir_path, dir_names, file_names in os.walk(start):
+            dir_names[:] = [dir_name for dir_name in dir_names if dir_name != ".git"]
+            for file_name in file_names:
+                if suffix is not None and not file_name.endswith(suffix):
+                    continue
+                full_path = Path(dir_path) / file_name
+                stat = full_path.stat()
+                rel_path = full_path.relative_to(self.repo_path).as_posix()
+                sha = f"{stat.st_size}-{stat.st_mtime_ns}"
+                files.append(self.file_info(rel_path, sha, stat.st_size))
+        return files
+
+    def download_file(self, file_info: Dict[str, Any]) -> str:
+        """
+        Read the content of the given file item.
+        """
+        if self.use_git:
+            text = self.git("cat-file", "blob", file_info["sha"])
+        else:
+            text = (self.repo_path / file_info["path"]).read_text(encoding="utf-8")
+        return text
+
+    def download(self, download_url: str) -> str:
+        """
+        Read the content of the file with the given download url.
+        """
+        prefix = self.file_url("")
+        if not download_url.startswith(prefix):
+            raise ValueError(f"{download_url} is not a file of {self.repo_path}")
+        path = download_url[len(prefix) :]
+        if self.use_git:
+            text = self.git("show", f"{self.ref}:{path}")
+        else:
+            text = (self.repo_path / path).read_text(encoding="utf-8")
+        return text
+
+    def read_blobs(self, file_infos: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        read the given blobs with a single git cat-file --batch process
+        """
+        contents: Dict[str, str] = {}
+        if not file_infos:
+            return contents
+        shas = "".join(f"{file_info['sha']}\n" for file_info in file_infos)
+        result = subprocess.run(
+            ["git", "-C", str(self.repo_path), "cat-file", "--batch"],
+            input=shas.encode("utf-8"),
+            capture_output=True,
+            check=True,
+        )
+        output = result.stdout
+        pos = 0
+        for file_info in file_infos:
+            header_end = output.index(b"\n", pos)
+            header = output[pos:header_end].decode("utf-8").split()
+            pos = header_end + 1
+            if len(header) < 3 or header[1] == "missing":
+                continue
+            size = int(header[2])
+            contents[file_info["path"]] = output[pos : pos + size].decode("utf-8", errors="replace")
+            # content is followed by a newline
+            pos += size + 1
+        return contents
+
+    def download_all(
+        self,
+        file_infos: List[Dict[str, Any]],
+        on_error: Optional[Callable[[Dict[str, Any], Exception], None]] = None,
+        on_done: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, str]:
+        """
+        Read the given files - blobs in one git batch, working tree files in parallel.
+
+        Args:
+            file_infos: the file item dicts to read
+            on_error: optional callback for failed reads
+            on_done: optional callback after each read e.g. for progress
+
+        Returns:
+            a dict of the text contents by file path
+        """
+        if self.use_git:
+            contents = self.read_blobs(file_infos)
+            for file_info in file_infos:
+                if on_error and file_info["path"] not in contents:
+                    on_error(file_info, ValueError(f"blob {file_info['sha']} missing"))
+                if on_done:
+                    on_done(file_info)
+            return contents
+        contents = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.download_file, file_info): file_info for file_info in file_infos}
+            for future in as_completed(futures):
+                file_info = futures[future]
+                try:
+                    contents[file_info["path"]] = future.result()
+                except Exception as ex:
+                    if on_error:
+                        on_error(file_info, ex)
+                if on_done:
+                    on_done(file_info)
+        return contents
@@ -0,0 +1,170 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import csv
+import io
+import json
+import re
+from typing import Any, Dict, Generator, List, Optional, Tuple, Union
+
+from lodstorage.query import Query
+from lodstorage.sql import SQLDB
+
+
+class MetaQueryStream:
+    """
+    run a SQL meta query with limit and offset or keyset pagination pushed
+    into SQL and stream the result from a cursor so that memory stays bounded
+    """
+
+    KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+    def __init__(
+        self,
+        sql_db: SQLDB,
+        query: Query,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        key: Optional[str] = None,
+        after: Optional[str] = None,
+        batch_size: int = 1000,
+    ):
+        """
+        Constructor
+
+        Args:
+            sql_db: the database of the meta queries - streams use their own connection
+            query: the meta query
+            limit: the maximum number of records
+            offset: the number of records to skip
+            key: the column for keyset pagination - the result is ordered by it
+            after: only return records with a key greater than this value e.g. the key of the last record of the previous page
+            batch_size: the number of records to fetch per cursor round trip
+        """
+        if key is not None and not MetaQueryStream.KEY_PATTERN.match(key):
+            raise ValueError(f"invalid key column {key}")
+        if after is not None and key is None:
+            raise ValueError("after needs a key column")
+        self.sql_db = sql_db
+        self.query = query
+        self.limit = limit
+        self.offset = offset
+        self.key = key
+        self.after = after
+        self.batch_size = batch_size
+        self.stream_db: Optional[SQLDB] = None
+        self.cursor = None
+
+    @classmethod
+    def as_sql_value(cls, value: str) -> Union[int, float, str]:
+        """
+        convert the given query parameter to a number if possible since
+        SQLite orders all numbers before all texts
+        """
+        for convert in (int, float):
+            try:
+                return convert(value)
+            except ValueError:
+                pass
+        return value
+
+    def get_sql(self) -> Tuple[str, Tuple[Any, ...]]:
+        """
+        get the paginated SQL query and its parameters
+        """
+        sql = self.query.query.strip().rstrip(";")
+        params: List[Any] = []
+        if self.key is None and self.limit is None and self.offset is None:
+            return sql, tuple(params)
+        sql = f"SELECT * FROM (\n{sql}\n) AS meta_query"
+        if self.key is not None:
+            if self.after is not None:
+                sql += f'\nWHERE "{self.key}" > ?'
+                params.append(MetaQueryStream.as_sql_value(self.after))
+            sql += f'\nORDER BY "{self.key}"'
+        # SQLite needs a LIMIT for an OFFSET - -1 is unlimited
+        if self.limit is not None or self.offset is not None:
+            sql += "\nLIMIT ?"
+            params.append(self.limit if self.limit is not None else -1)
+        if self.offset is not None:
+            sql += " OFFSET ?"
+            params.append(self.offset)
+        return sql, tuple(params)
+
+    def open(self):
+        """
+        execute my query on a dedicated connection - errors surface here
+        before any record is streamed
+        """
+        sql, params = self.get_sql()
+        self.stream_db = SQLDB(dbname=self.sql_db.dbname, check_same_thread=False)
+        try:
+            self.cursor = self.stream_db.c.cursor()
+            self.cursor.execute(sql, params)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """
+        close my connection - may be called repeatedly e.g. by the generator
+        and by a background task of a response whose body was never iterated
+        """
+        if self.stream_db is not None:
+            self.stream_db.close()
+        self.stream_db = None
+        self.cursor = None
+
+    def records(self) -> Generator[Dict[str, Any], None, None]:
+        """
+        iterate over the records of my cursor in batches
+        """
+        if self.cursor is None:
+            self.open()
+        try:
+            columns = [description[0] for description in self.cursor.description]
+            while True:
+                rows = self.cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            self.close()
+
+    def get_lod(self) -> List[Dict[str, Any]]:
+        """
+        get the records as a list of dicts e.g. for the table formats
+        """
+        lod = list(self.records())
+        return lod
+
+    def json_chunks(self) -> Generator[str, None, None]:
+        """
+        stream the records as a JSON list
+        """
+        delim = "[\n"
+        for record in self.records():
+            yield delim + json.dumps(record, indent=2, sort_keys=True, default=str)
+            delim = ",\n"
+        yield "[]" if delim == "[\n" else "\n]"
+
+    def csv_chunks(self) -> Generator[str, None, None]:
+        """
+        stream the records as CSV with a header line
+        """
+        buffer = io.StringIO()
+        writer = None
+        for record in self.records():
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(record.keys()))
+                writer.writeheader()
+            writer.writerow(record)
+            if buffer.tell() > 65536:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
@@ -0,0 +1,339 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Generator, List, Optional, Sequence, Tuple
+
+from nicegui import run
+
+# latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# result size buckets in records
+SIZE_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+
+class Metric:
+    """
+    a metric family with labeled samples in the Prometheus text exposition format
+    """
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values: Dict[Tuple[str, ...], object] = {}
+
+    def label_key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        key = tuple(str(labels.get(labelname, "")) for labelname in self.labelnames)
+        return key
+
+    @classmethod
+    def escape(cls, value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    @classmethod
+    def format_value(cls, value: float) -> str:
+        if value == float("inf"):
+            return "+Inf"
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+    def format_labels(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        text = ",".join(f'{name}="{self.escape(value)}"' for name, value in pairs)
+        return "{" + text + "}"
+
+    def sample_lines(self) -> List[str]:
+        with self.lock:
+            lines = [
+                f"{self.name}{self.format_labels(key)} {self.format_value(value)}" for key, value in self.values.items()
+            ]
+        return lines
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self.sample_lines())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(self.label_key(labels), 0)
+
+
+class Gauge(Metric):
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self.label_key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        return self.values.get(self.label_key(labels), 0)
+
+
+class Histogram(Metric):
+    """
+    a histogram with cumulative buckets - observe is a bisect and three additions
+    """
+
+    metric_type = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self.label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                # per bucket counts, the +Inf bucket, the sum
+                counts = [0] * (len(self.buckets) + 1) + [0.0]
+                self.values[key] = counts
+            counts[index] += 1
+            counts[-1] += value
+
+    def get_count(self, **labels) -> int:
+        counts = self.values.get(self.label_key(labels))
+        return sum(counts[:-1]) if counts else 0
+
+    def sample_lines(self) -> List[str]:
+        lines = []
+        with self.lock:
+            items = [(key, list(counts)) for key, counts in self.values.items()]
+        for key, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts[:-1]):
+                cumulative += count
+                labels = self.format_labels(key, ("le", self.format_value(float(bound))))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = self.format_labels(key)
+            lines.append(f"{self.name}_sum{labels} {self.format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class TaskCounter:
+    """
+    count the queued and running tasks submitted to a thread pool
+    by wrapping the callables instead of reading the pool internals
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+
+    @contextmanager
+    def track(self, callback: Callable) -> Generator[Callable, None, None]:
+        """
+        count the given callback as queued until the wrapped callable yielded starts
+        and as running until it returns - a task cancelled before it started is uncounted on exit
+        """
+        state = {"started": False, "abandoned": False}
+
+        def task(*args, **kwargs):
+            with self.lock:
+                state["started"] = True
+                if not state["abandoned"]:
+                    self.queued -= 1
+                self.running += 1
+            try:
+                return callback(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.running -= 1
+
+        with self.lock:
+            self.queued += 1
+        try:
+            yield task
+        finally:
+            with self.lock:
+                if not state["started"] and not state["abandoned"]:
+                    state["abandoned"] = True
+                    self.queued -= 1
+
+
+class MetricsRegistry:
+    """
+    a registry of metrics rendered in the Prometheus text exposition format
+    """
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        text = "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+        return text
+
+
+class SnapQueryMetrics:
+    """
+    the operational metrics of snapquery
+    """
+
+    instance: Optional["SnapQueryMetrics"] = None
+
+    def __init__(self):
+        self.registry = MetricsRegistry()
+        r = self.registry
+        self.request_duration = r.register(
+            Histogram(
+                "snapquery_http_request_duration_seconds",
+                "web server request latency by route",
+                ["method", "route", "status"],
+            )
+        )
+        self.requests_in_flight = r.register(
+            Gauge("snapquery_http_requests_in_flight", "web server requests currently being handled")
+        )
+        self.sparql_duration = r.register(
+            Histogram("snapquery_sparql_duration_seconds", "upstream SPARQL query latency by endpoint", ["endpoint"])
+        )
+        self.sparql_records = r.register(
+            Histogram(
+                "snapquery_sparql_result_records",
+                "SPARQL result size in records by endpoint",
+                ["endpoint"],
+                buckets=SIZE_BUCKETS,
+            )
+        )
+        self.sparql_errors = r.register(
+            Counter(
+                "snapquery_sparql_errors_total",
+                "failed SPARQL queries by endpoint and ErrorFilter category",
+                ["endpoint", "category"],
+            )
+        )
+        self.cache_requests = r.register(
+            Counter("snapquery_cache_requests_total", "cache lookups by cache and result hit/miss", ["cache", "result"])
+        )
+        self.threadpool_threads = r.register(
+            Gauge("snapquery_threadpool_threads", "worker threads by pool and state busy/max", ["pool", "state"])
+        )
+        self.threadpool_queued = r.register(
+            Gauge("snapquery_threadpool_queued_tasks", "tasks waiting for a worker thread by pool", ["pool"])
+        )
+        self.sqlite_write_duration = r.register(
+            Histogram(
+                "snapquery_sqlite_write_duration_seconds",
+                "SQLite write latency by table",
+                ["table"],
+                buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+            )
+        )
+        # the tasks run via io_bound
+        self.io_bound_tasks = TaskCounter()
+
+    @classmethod
+    def get_instance(cls) -> "SnapQueryMetrics":
+        if cls.instance is None:
+            cls.instance = cls()
+        return cls.instance
+
+    def observe_query(self, stats):
+        """
+        observe the given QueryStats of an upstream SPARQL query
+        """
+        endpoint = stats.endpoint_name or ""
+        if stats.error_msg:
+            self.sparql_errors.inc(endpoint=endpoint, category=stats.error_category or "Other")
+        else:
+            if stats.duration is not None:
+                self.sparql_duration.observe(stats.duration, endpoint=endpoint)
+            if stats.records is not None and stats.records >= 0:
+                self.sparql_records.observe(stats.records, endpoint=endpoint)
+
+    def cache_lookup(self, cache: str, hit: bool, count: int = 1):
+        if count:
+            self.cache_requests.inc(count, cache=cache, result="hit" if hit else "miss")
+
+    def update_threadpool(self, pool: str, busy: int, max_threads: Optional[int] = None, queued: int = 0):
+        self.threadpool_threads.set(busy, pool=pool, state="busy")
+        if max_threads is not None:
+            self.threadpool_threads.set(max_threads, pool=pool, state="max")
+        self.threadpool_queued.set(queued, pool=pool)
+
+    async def io_bound(self, callback: Callable, *args, **kwargs):
+        """
+        run the given callback with nicegui's run.io_bound counted in my io_bound_tasks
+        """
+        with self.io_bound_tasks.track(callback) as task:
+            result = await run.io_bound(task, *args, **kwargs)
+        return result
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency of the http requests by route template
+    """
+
+    def __init__(self, app, metrics: Optional[SnapQueryMetrics] = None):
+        self.app = app
+        self.metrics = metrics or SnapQueryMetrics.get_instance()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        self.metrics.requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.requests_in_flight.dec()
+            # the router sets the matched route - the template keeps the label cardinality low
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            self.metrics.request_duration.observe(
+                time.perf_counter() - start, method=scope.get("method", ""), route=route_path, status=status["code"]
+            )
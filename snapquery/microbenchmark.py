@@ -0,0 +1,296 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import glob
+import os
+import statistics
+import time
+from dataclasses import asdict, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from basemkit.yamlable import lod_storable
+from lodstorage.query import Format, Query
+
+from snapquery.error_filter import ErrorFilter
+from snapquery.prefix_merger import QueryPrefixMerger
+from snapquery.query_fingerprint import QueryFingerprint
+from snapquery.snapquery_core import (
+    NamedQuery,
+    NamedQueryManager,
+    NamedQuerySet,
+    QueryBundle,
+    QueryDetails,
+    QueryName,
+    QueryStats,
+)
+from snapquery.sparql_analyzer import SparqlAnalyzer
+
+
+@lod_storable
+class BenchmarkResult:
+    """
+    the timing of a single microbenchmark - times are seconds per call
+    """
+
+    name: str
+    number: int  # calls per round
+    rounds: int
+    min: float
+    median: float
+    mean: float
+    stdev: float = 0.0
+
+    @classmethod
+    def from_timings(cls, name: str, number: int, timings: List[float]) -> "BenchmarkResult":
+        per_call = [timing / number for timing in timings]
+        result = cls(
+            name=name,
+            number=number,
+            rounds=len(per_call),
+            min=min(per_call),
+            median=statistics.median(per_call),
+            mean=statistics.mean(per_call),
+            stdev=statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        )
+        return result
+
+    def __str__(self) -> str:
+        text = f"{self.name:<32} {self.median * 1e6:12.1f} µs ±{self.stdev * 1e6:8.1f} µs"
+        text += f" ({self.rounds}x{self.number})"
+        return text
+
+
+@lod_storable
+class BenchmarkResults:
+    """
+    the results of a microbenchmark suite run
+    """
+
+    name: str
+    results: List[BenchmarkResult] = field(default_factory=list)
+
+    def by_name(self) -> Dict[str, BenchmarkResult]:
+        return {result.name: result for result in self.results}
+
+    def get_regressions(self, baseline: "BenchmarkResults", threshold: float = 1.5) -> List[str]:
+        """
+        compare my best times with the given baseline - the minimum is the least noisy estimate
+
+        Args:
+            baseline(BenchmarkResults): the stored baseline
+            threshold(float): the factor by which a best time may exceed its baseline
+
+        Returns:
+            List[str]: a message for each regression
+        """
+        regressions = []
+        baseline_results = baseline.by_name()
+        for result in self.results:
+            base = baseline_results.get(result.name)
+            if base and base.min > 0 and result.min > base.min * threshold:
+                factor = result.min / base.min
+                msg = f"{result.name}: {result.min * 1e6:.1f} µs is {factor:.1f}x"
+                msg += f" the baseline {base.min * 1e6:.1f} µs"
+                regressions.append(msg)
+        return regressions
+
+
+class MicrobenchmarkSuite:
+    """
+    a named set of microbenchmarks with per machine baselines
+    """
+
+    def __init__(self, name: str, baseline_dir: Optional[str] = None, min_time: float = 0.02):
+        """
+        Constructor
+
+        Args:
+            name(str): the name of the suite
+            baseline_dir(str): the directory of the baselines - default: ~/.solutions/snapquery/benchmarks
+            min_time(float): the minimum duration of a round in seconds for calibrating the calls per round
+        """
+        self.name = name
+        if baseline_dir is None:
+            baseline_dir = Path.home() / ".solutions" / "snapquery" / "benchmarks"
+        self.baseline_path = Path(baseline_dir) / f"{name}.yaml"
+        self.min_time = min_time
+        self.benchmarks: Dict[str, Callable[[], object]] = {}
+
+    def add(self, name: str, func: Callable[[], object]):
+        """
+        add a benchmark - func is called without arguments
+        """
+        self.benchmarks[name] = func
+
+    def calibrate(self, func: Callable[[], object]) -> int:
+        """
+        get the number of calls per round needed for a round of at least min_time
+        """
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.min_time or number >= 1 << 20:
+                return number
+            number *= 2 if elapsed <= 0 else max(2, min(10, int(self.min_time / elapsed) + 1))
+
+    def run(self, rounds: int = 5, names: Optional[List[str]] = None) -> BenchmarkResults:
+        """
+        run my benchmarks
+
+        Args:
+            rounds(int): the number of timed rounds per benchmark
+            names(List[str]): the benchmarks to run - default: all
+
+        Returns:
+            BenchmarkResults: the results
+        """
+        results = BenchmarkResults(name=self.name)
+        for name, func in self.benchmarks.items():
+            if names and name not in names:
+                continue
+            number = self.calibrate(func)
+            timings = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                for _ in range(number):
+                    func()
+                timings.append(time.perf_counter() - start)
+            results.results.append(BenchmarkResult.from_timings(name, number, timings))
+        return results
+
+    def load_baseline(self) -> Optional[BenchmarkResults]:
+        baseline = None
+        if self.baseline_path.exists():
+            baseline = BenchmarkResults.load_from_yaml_file(str(self.baseline_path))
+        return baseline
+
+    def save_baseline(self, results: BenchmarkResults):
+        self.baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        results.save_to_yaml_file(str(self.baseline_path))
+
+    def check(self, results: BenchmarkResults, threshold: float = 1.5, update: bool = False) -> List[str]:
+        """
+        check the given results against my stored baseline - the first run stores the baseline
+
+        Args:
+            results(BenchmarkResults): the results to check
+            threshold(float): the allowed factor over the best time of the baseline
+            update(bool): if True replace the baseline with the given results
+
+        Returns:
+            List[str]: the regressions
+        """
+        baseline = self.load_baseline()
+        regressions = []
+        if baseline is not None:
+            regressions = results.get_regressions(baseline, threshold)
+        if baseline is None or update:
+            self.save_baseline(results)
+        return regressions
+
+
+class SnapQueryBenchmarks:
+    """
+    the microbenchmarks of the snapquery hot paths over the bundled sample query sets
+    """
+
+    def __init__(self, nqm: NamedQueryManager, error_messages: Optional[List[str]] = None, max_queries: int = 10):
+        """
+        Constructor
+
+        Args:
+            nqm(NamedQueryManager): a manager on a scratch database - store_stats writes to it
+            error_messages(List[str]): raw endpoint error messages - default: the QueryStats samples
+            max_queries(int): the number of sample queries for the slower parsing benchmarks
+        """
+        self.nqm = nqm
+        self.queries: List[NamedQuery] = []
+        for json_file in sorted(glob.glob(os.path.join(nqm.samples_path, "*.json"))):
+            nq_set = NamedQuerySet.load_from_json_file(json_file)
+            self.queries.extend(nq for nq in nq_set.queries if nq.sparql)
+        self.parse_queries = self.queries[:max_queries]
+        if error_messages is None:
+            error_messages = [
+                stats.error_msg
+                for stats_list in QueryStats.get_samples().values()
+                for stats in stats_list
+                if stats.error_msg
+            ]
+        self.error_messages = error_messages
+        self.endpoint = nqm.endpoints["wikidata"]
+        self.query_names = [
+            QueryName(name=nq.name, namespace=nq.namespace, domain=nq.domain) for nq in self.queries[:max_queries]
+        ]
+        nqm.store(lod=[asdict(nq) for nq in self.queries[:max_queries]])
+        self.lod = [
+            {"item": f"http://www.wikidata.org/entity/Q{i}", "itemLabel": f"item {i}", "count": i, "ratio": i / 7}
+            for i in range(100)
+        ]
+        query = Query(name="benchmark", query="SELECT ?item ?itemLabel WHERE { ?item ?p ?itemLabel }", lang="sparql")
+        self.query_bundle = QueryBundle(named_query=self.queries[0], query=query)
+
+    def query_ids(self):
+        for nq in self.queries:
+            QueryName.get_query_id(nq.name, nq.namespace, nq.domain)
+
+    def merge_prefixes(self, merger: QueryPrefixMerger):
+        for nq in self.parse_queries:
+            query = Query(name=nq.name, query=nq.sparql, lang="sparql")
+            QueryPrefixMerger.merge_prefixes(query, self.endpoint, merger)
+
+    def add_missing_prefixes(self):
+        for nq in self.parse_queries:
+            SparqlAnalyzer.add_missing_prefixes(nq.sparql)
+
+    def error_filter(self):
+        for error_message in self.error_messages:
+            ErrorFilter(error_message).get_message(for_html=False)
+
+    def query_details(self):
+        for nq in self.queries:
+            QueryDetails.from_sparql(nq.query_id, nq.sparql, with_fingerprint=False)
+
+    def query_fingerprint(self):
+        for nq in self.queries:
+            QueryFingerprint.of(nq.sparql)
+
+    def lookup(self):
+        for query_name in self.query_names:
+            self.nqm.lookup(query_name)
+
+    def store_stats(self):
+        stats_list = []
+        for nq in self.parse_queries[:10]:
+            stats = QueryStats(query_id=nq.query_id, endpoint_name="wikidata", context="benchmark")
+            stats.records = 1
+            stats.done()
+            stats_list.append(stats)
+        self.nqm.store_stats(stats_list)
+
+    def get_suite(self, baseline_dir: Optional[str] = None, min_time: float = 0.02) -> MicrobenchmarkSuite:
+        """
+        get the suite of the hot path benchmarks
+        """
+        suite = MicrobenchmarkSuite("snapquery", baseline_dir=baseline_dir, min_time=min_time)
+        suite.add("query_id", self.query_ids)
+        for merger in [QueryPrefixMerger.SIMPLE_MERGER, QueryPrefixMerger.ANALYSIS_MERGER]:
+            suite.add(f"merge_prefixes_{merger.name.lower()}", lambda merger=merger: self.merge_prefixes(merger))
+        suite.add("add_missing_prefixes", self.add_missing_prefixes)
+        suite.add("error_filter", self.error_filter)
+        suite.add("query_details", self.query_details)
+        suite.add("query_fingerprint", self.query_fingerprint)
+        for r_format in [Format.csv, Format.json, Format.html, Format.latex, Format.mediawiki, Format.github]:
+            suite.add(
+                f"format_result_{r_format.value}",
+                lambda r_format=r_format: self.query_bundle.format_result(qlod=self.lod, r_format=r_format),
+            )
+        suite.add("lookup", self.lookup)
+        suite.add("store_stats", self.store_stats)
+        return suite
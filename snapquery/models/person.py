@@ -80,6 +80,19 @@ class Person(PersonName):
         """
         return any([self.wikidata_id, self.dblp_author_id, self.orcid_id])
 
+    @property
+    def pid_keys(self) -> List[str]:
+        """
+        the identifier keys of this person e.g. ["wikidata_id:Q80"]
+        for indexing persons by any of their identifiers
+        """
+        keys = []
+        for attr in ["wikidata_id", "dblp_author_id", "orcid_id"]:
+            value = getattr(self, attr)
+            if value:
+                keys.append(f"{attr}:{value}")
+        return keys
+
     def share_identifier(self, other: "Person") -> bool:
         """
         Check if the given person shares an identifier with this person.
@@ -0,0 +1,183 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import bisect
+import dataclasses
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from snapquery.query_name_index import QueryNameIndex
+
+
+class NamedQueryCatalog:
+    """
+    in memory catalog of all named queries
+
+    each query is kept as a compact tuple of its field values with interned
+    domains and namespaces - the query ids of each domain/namespace pair are kept
+    sorted by name so that the catalog answers lookup, get_all_queries and
+    get_unique_sets of the NamedQueryManager without SQL and stays consistent
+    by the write through of NamedQueryManager.store
+    """
+
+    key_fields = ("domain", "namespace", "name")
+
+    def __init__(self, record_class: Type):
+        """
+        Constructor
+
+        Args:
+            record_class: the dataclass of the records e.g. NamedQuery - all its fields are kept
+        """
+        # the key fields first so that entries can be indexed by position
+        self.fields = NamedQueryCatalog.key_fields + tuple(
+            field.name
+            for field in dataclasses.fields(record_class)
+            if field.name not in NamedQueryCatalog.key_fields and field.name != "query_id"
+        )
+        self.url_index = self.fields.index("url")
+        self.lock = threading.RLock()
+        # query_id → field values
+        self.entries: Dict[str, Tuple[Optional[str], ...]] = {}
+        # (domain, namespace) → sorted (name, query_id) pairs
+        self.keys: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+
+    @classmethod
+    def from_records(cls, record_class: Type, records: Iterable[Dict[str, Any]]) -> "NamedQueryCatalog":
+        """
+        create a catalog from the given records of the given dataclass
+        """
+        catalog = cls(record_class)
+        catalog.add_records(records)
+        return catalog
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.entries)
+
+    def add_records(self, records: Iterable[Dict[str, Any]]):
+        """
+        add or replace the given NamedQuery records
+        """
+        with self.lock:
+            for record in records:
+                self.add(record)
+
+    def add(self, record: Dict[str, Any]):
+        """
+        add or replace the given NamedQuery record
+        """
+        query_id = record["query_id"]
+        values = tuple(record.get(field) for field in self.fields)
+        domain, namespace = (sys.intern(value) if value else value for value in values[:2])
+        values = (domain, namespace) + values[2:]
+        with self.lock:
+            self.remove(query_id)
+            self.entries[query_id] = values
+            # NULL domains and namespaces never match a LIKE or = filter
+            if None not in values[:2]:
+                names = self.keys.setdefault((domain, namespace), [])
+                # NULL names come first like in ORDER BY name
+                bisect.insort(names, (values[2] or "", query_id))
+
+    def remove(self, query_id: str):
+        """
+        remove the query with the given id (if any)
+        """
+        with self.lock:
+            values = self.entries.pop(query_id, None)
+            if values is None or None in values[:2]:
+                return
+            key = values[:2]
+            names = self.keys.get(key, [])
+            pair = (values[2] or "", query_id)
+            i = bisect.bisect_left(names, pair)
+            if i < len(names) and names[i] == pair:
+                del names[i]
+            if not names:
+                self.keys.pop(key, None)
+
+    def get_record(self, query_id: str) -> Optional[Dict[str, Any]]:
+        """
+        get the record of the query with the given id
+
+        Returns:
+            dict: the record or None if the query is not known
+        """
+        with self.lock:
+            values = self.entries.get(query_id)
+        if values is None:
+            return None
+        record = dict(zip(self.fields, values))
+        record["query_id"] = query_id
+        return record
+
+    def get_records(self, domain: str = "", namespace: str = "", limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        get the records of the queries matching the given prefixes
+        ordered by domain, namespace and name - like SELECT * FROM NamedQuery WHERE domain LIKE 'domain%' ...
+        """
+        with self.lock:
+            keys = sorted(
+                key
+                for key in self.keys
+                if QueryNameIndex.matches(key[0], domain) and QueryNameIndex.matches(key[1], namespace)
+            )
+            query_ids = [query_id for key in keys for _name, query_id in self.keys[key]]
+        if limit is not None:
+            query_ids = query_ids[:limit]
+        records = [self.get_record(query_id) for query_id in query_ids]
+        return records
+
+    def get_unique_sets(self, domain: str, namespace: str) -> Tuple[Set[str], Set[str]]:
+        """
+        get the unique urls and names of the given domain and namespace
+        """
+        with self.lock:
+            query_ids = [query_id for _name, query_id in self.keys.get((domain, namespace), [])]
+            urls = {self.entries[query_id][self.url_index] for query_id in query_ids}
+            names = {self.entries[query_id][2] for query_id in query_ids}
+        return urls, names
+
+    def get_memory_report(self) -> Dict[str, Any]:
+        """
+        get an estimate of the memory used by the catalog
+
+        Returns:
+            dict: the number of queries and domain/namespace pairs, the bytes used by
+            the index structures and by each field and the total bytes per query
+        """
+        seen = set()
+
+        def size_of(value) -> int:
+            # shared e.g. interned objects are counted once
+            if value is None or id(value) in seen:
+                return 0
+            seen.add(id(value))
+            return sys.getsizeof(value)
+
+        with self.lock:
+            field_bytes = {field: 0 for field in self.fields}
+            index_bytes = sys.getsizeof(self.entries) + sys.getsizeof(self.keys)
+            for query_id, values in self.entries.items():
+                index_bytes += size_of(query_id) + sys.getsizeof(values)
+                for field, value in zip(self.fields, values):
+                    field_bytes[field] += size_of(value)
+            for names in self.keys.values():
+                index_bytes += sys.getsizeof(names) + sum(sys.getsizeof(pair) for pair in names)
+            count = len(self.entries)
+            key_count = len(self.keys)
+        total = index_bytes + sum(field_bytes.values())
+        report = {
+            "queries": count,
+            "namespaces": key_count,
+            "index_bytes": index_bytes,
+            **{f"{field}_bytes": size for field, size in field_bytes.items()},
+            "total_bytes": total,
+            "bytes_per_query": total / count if count else 0,
+        }
+        return report
@@ -11,9 +11,10 @@ from typing import Dict, List, Optional
 from ngwidgets.lod_grid import ListOfDictsGrid
 from ngwidgets.progress import NiceguiProgressbar
 from ngwidgets.webserver import WebSolution
-from nicegui import run, ui
+from nicegui import ui
 
 from snapquery.execution import Execution
+from snapquery.metrics import SnapQueryMetrics
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +65,7 @@ class NamespaceStatsView:
         domain = row_data["domain"]
         if endpoint_name in self.nqm.endpoints.keys():
             if self.solution.webserver.authenticated():
-                await run.io_bound(
+                await SnapQueryMetrics.get_instance().io_bound(
                     self.execute_queries,
                     namespace=namespace,
                     endpoint_name=endpoint_name,
@@ -79,7 +80,7 @@ class NamespaceStatsView:
     async def on_fetch_lod(self, _args=None):
         """Fetches data asynchronously and loads it into the grid upon successful retrieval."""
         try:
-            stats_lod = await run.io_bound(self.fetch_query_lod)
+            stats_lod = await SnapQueryMetrics.get_instance().io_bound(self.fetch_query_lod)
             processed_lod = self.process_stats_lod(stats_lod)
             with self.results_row:
                 self.lod_grid.load_lod(processed_lod)
@@ -0,0 +1,180 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from snapquery.metrics import SnapQueryMetrics
+
+
+class ParamTemplate:
+    """
+    a query with {{ param }} placeholders precompiled into literal segments and
+    parameter slots so that rendering is a single join - renders like
+    lodstorage Params.apply_parameters without rescanning the query
+    """
+
+    pattern = re.compile(r"{{\s*(\w+)\s*}}")
+    # see lodstorage Params
+    illegal_chars = """"[;<>&|]"'"""
+    type_patterns = {
+        "item": re.compile(r"Q[1-9]\d*"),
+        "property": re.compile(r"P[1-9]\d*"),
+        "integer": re.compile(r"-?\d+"),
+    }
+
+    def __init__(self, query: str):
+        self.query = query
+        # literal, name, literal, name, ..., literal
+        self.parts = ParamTemplate.pattern.split(query)
+        self.slots = self.parts[1::2]
+        # the placeholders as written in the query
+        self.placeholders = [match.group(0) for match in ParamTemplate.pattern.finditer(query)]
+        # the unique parameter names in order of first use
+        self.params = list(dict.fromkeys(self.slots))
+        self.has_params = len(self.params) > 0
+
+    @classmethod
+    def infer_type(cls, value: Optional[str]) -> Optional[str]:
+        """
+        infer the parameter type of the given (default) value
+        """
+        if value is None:
+            return None
+        value = str(value).strip()
+        for type_name, type_pattern in cls.type_patterns.items():
+            if type_pattern.fullmatch(value):
+                return type_name
+        return "string"
+
+    def validate(self, param_dict: Dict[str, Any], param_types: Optional[Dict[str, str]] = None) -> List[str]:
+        """
+        validate the given values of my parameters
+
+        Args:
+            param_dict(dict): the values by parameter name - values of unknown names are ignored
+            param_types(dict): the expected type by parameter name e.g. from QueryDetails.get_param_types
+
+        Returns:
+            List[str]: the problems found - empty if the values are valid
+        """
+        problems = []
+        param_types = param_types or {}
+        for param in self.params:
+            if param not in param_dict:
+                problems.append(f"missing parameter '{param}'")
+                continue
+            value = param_dict[param]
+            if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+                problems.append(f"parameter '{param}' has unsupported type {type(value).__name__}")
+                continue
+            value_str = str(value)
+            if any(char in value_str for char in ParamTemplate.illegal_chars):
+                problems.append(f"Potentially malicious value detected for parameter '{param}'")
+                continue
+            type_name = param_types.get(param)
+            type_pattern = ParamTemplate.type_patterns.get(type_name)
+            if type_pattern and not type_pattern.fullmatch(value_str.strip()):
+                problems.append(f"parameter '{param}' needs a value of type {type_name} but got '{value_str}'")
+        return problems
+
+    def check(self, param_dict: Dict[str, Any], param_types: Optional[Dict[str, str]] = None):
+        """
+        validate the given values
+
+        Raises:
+            ValueError: if the values are not valid
+        """
+        problems = self.validate(param_dict, param_types)
+        if problems:
+            raise ValueError("; ".join(problems))
+
+    def render(self, param_dict: Optional[Dict[str, Any]] = None) -> str:
+        """
+        render the query with the given values - placeholders of parameters
+        without value are kept like with lodstorage Params.apply_parameters
+
+        Raises:
+            ValueError: for potentially malicious values
+        """
+        if not self.has_params:
+            return self.query
+        param_dict = param_dict or {}
+        parts = self.parts.copy()
+        for i in range(1, len(parts), 2):
+            param = parts[i]
+            if param in param_dict:
+                value = param_dict[param]
+                if isinstance(value, str) and any(char in value for char in ParamTemplate.illegal_chars):
+                    raise ValueError(f"Potentially malicious value detected for parameter '{param}'")
+                parts[i] = str(value)
+            else:
+                parts[i] = self.placeholders[i // 2]
+        query = "".join(parts)
+        return query
+
+    def render_with_check(self, param_dict: Optional[Dict[str, Any]] = None) -> str:
+        """
+        render the query - like lodstorage Params.apply_parameters_with_check
+
+        Raises:
+            Exception: if the query has parameters but no values are given
+        """
+        if self.has_params and not param_dict:
+            displayed_params = ", ".join(self.params[:3]) + (", ..." if len(self.params) > 3 else "")
+            plural_suffix = "s" if len(self.params) > 1 else ""
+            raise Exception(f"Query needs {len(self.params)} parameter{plural_suffix}: {displayed_params}")
+        return self.render(param_dict)
+
+
+class ParamTemplateCache:
+    """
+    a bounded cache of compiled parameter templates keyed by the hash of the query
+    """
+
+    instance = None
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self.templates: OrderedDict[str, ParamTemplate] = OrderedDict()
+        self.lock = threading.Lock()
+        self.metrics = SnapQueryMetrics.get_instance()
+
+    @classmethod
+    def get_instance(cls) -> "ParamTemplateCache":
+        if cls.instance is None:
+            cls.instance = cls()
+        return cls.instance
+
+    @classmethod
+    def get_key(cls, query: str) -> str:
+        key = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        return key
+
+    def get(self, query: str) -> ParamTemplate:
+        """
+        get the compiled template of the given query
+        """
+        key = ParamTemplateCache.get_key(query)
+        with self.lock:
+            template = self.templates.get(key)
+            if template is not None:
+                self.templates.move_to_end(key)
+        self.metrics.cache_lookup("param_template", hit=template is not None)
+        if template is None:
+            template = ParamTemplate(query)
+            with self.lock:
+                self.templates[key] = template
+                while len(self.templates) > self.max_size:
+                    self.templates.popitem(last=False)
+        return template
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.templates)
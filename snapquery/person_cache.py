@@ -0,0 +1,385 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import bisect
+import copy
+import datetime
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import asdict
+from typing import Dict, List, Optional, Set
+
+from basemkit.yamlable import lod_storable
+from lodstorage.sql import SQLDB, EntityInfo
+
+from snapquery.metrics import SnapQueryMetrics
+from snapquery.models.person import Person
+from snapquery.snapquery_core import NamedQueryManager
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """
+    normalize the given name for matching - lower case, no accents, single blanks
+    """
+    if not name:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", name)
+    ascii_name = "".join(char for char in decomposed if not unicodedata.combining(char))
+    normalized = re.sub(r"[^\w]+", " ", ascii_name.lower()).strip()
+    return normalized
+
+
+@lod_storable
+class CachedPerson:
+    """
+    a person returned by any of the person lookups
+    """
+
+    person_key: str  # primary key e.g. wikidata_id:Q80
+    label: Optional[str] = None
+    given_name: Optional[str] = None
+    family_name: Optional[str] = None
+    wikidata_id: Optional[str] = None
+    dblp_author_id: Optional[str] = None
+    orcid_id: Optional[str] = None
+    image: Optional[str] = None
+
+    @classmethod
+    def from_person(cls, person_key: str, person: Person) -> "CachedPerson":
+        cached_person = cls(
+            person_key=person_key,
+            label=person.label,
+            given_name=person.given_name,
+            family_name=person.family_name,
+            wikidata_id=person.wikidata_id,
+            dblp_author_id=person.dblp_author_id,
+            orcid_id=person.orcid_id,
+            image=person.image,
+        )
+        return cached_person
+
+    def to_person(self) -> Person:
+        person = Person(
+            label=self.label,
+            given_name=self.given_name,
+            family_name=self.family_name,
+            wikidata_id=self.wikidata_id,
+            dblp_author_id=self.dblp_author_id,
+            orcid_id=self.orcid_id,
+            image=self.image,
+        )
+        return person
+
+    @classmethod
+    def get_samples(cls) -> dict[str, "CachedPerson"]:
+        samples = {
+            "persons": [
+                cls(
+                    person_key="wikidata_id:Q80",
+                    label="Tim Berners-Lee",
+                    given_name="Tim",
+                    family_name="Berners-Lee",
+                    wikidata_id="Q80",
+                    dblp_author_id="b/TimBernersLee",
+                    orcid_id="0000-0003-1279-3709",
+                    image="http://commons.wikimedia.org/wiki/Special:FilePath/Sir%20Tim%20Berners-Lee.jpg",
+                )
+            ]
+        }
+        return samples
+
+
+@lod_storable
+class PersonSearch:
+    """
+    the result of a remote person lookup for a normalized name prefix
+    """
+
+    search_key: str  # primary key source:prefix
+    source: str  # wikidata, orcid or dblp
+    prefix: str  # the normalized search name
+    max_results: int  # the limit of the lookup - fewer results mean the result is complete
+    person_keys: str  # json list of CachedPerson keys
+    time_stamp: Optional[datetime.datetime] = None
+
+    def __post_init__(self):
+        if self.time_stamp is None:
+            self.time_stamp = datetime.datetime.now()
+
+    @property
+    def keys(self) -> List[str]:
+        return json.loads(self.person_keys)
+
+    @property
+    def complete(self) -> bool:
+        """
+        True if the lookup returned all matches
+        """
+        return len(self.keys) < self.max_results
+
+    @classmethod
+    def get_samples(cls) -> dict[str, "PersonSearch"]:
+        samples = {
+            "searches": [
+                cls(
+                    search_key="wikidata:tim berners",
+                    source="wikidata",
+                    prefix="tim berners",
+                    max_results=10,
+                    person_keys=json.dumps(["wikidata_id:Q80"]),
+                    time_stamp=datetime.datetime(2026, 10, 19),
+                )
+            ]
+        }
+        return samples
+
+
+class PersonIndex:
+    """
+    in memory prefix and trigram index over person names
+    """
+
+    def __init__(self):
+        self.persons: Dict[str, Person] = {}
+        # identifier key → person key
+        self.pid_map: Dict[str, str] = {}
+        # sorted name tokens and the persons per token
+        self.tokens: List[str] = []
+        self.token_keys: Dict[str, Set[str]] = {}
+        self.trigram_keys: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.persons)
+
+    @classmethod
+    def trigrams(cls, text: str) -> Set[str]:
+        padded = f"  {text} "
+        trigrams = {padded[i : i + 3] for i in range(len(padded) - 2)}
+        return trigrams
+
+    @classmethod
+    def names(cls, person: Person) -> str:
+        names = normalize_name(" ".join(name for name in [person.label, person.given_name, person.family_name] if name))
+        return names
+
+    def key_for(self, person: Person) -> Optional[str]:
+        """
+        get the key of the given person - an already known key if it shares an identifier
+        """
+        pid_keys = person.pid_keys
+        for pid_key in pid_keys:
+            if pid_key in self.pid_map:
+                return self.pid_map[pid_key]
+        if pid_keys:
+            return pid_keys[0]
+        if person.label:
+            return f"label:{normalize_name(person.label)}"
+        return None
+
+    def add(self, person_key: str, person: Person):
+        """
+        add or merge the given person
+        """
+        existing = self.persons.get(person_key)
+        if existing is not None:
+            existing.merge_with(person)
+            person = existing
+        else:
+            self.persons[person_key] = person
+        for pid_key in person.pid_keys:
+            self.pid_map[pid_key] = person_key
+        names = PersonIndex.names(person)
+        for token in names.split():
+            if token not in self.token_keys:
+                bisect.insort(self.tokens, token)
+                self.token_keys[token] = set()
+            self.token_keys[token].add(person_key)
+        for trigram in PersonIndex.trigrams(names):
+            self.trigram_keys.setdefault(trigram, set()).add(person_key)
+
+    def prefix_keys(self, prefix: str) -> Set[str]:
+        """
+        get the keys of the persons with a name token starting with the given prefix
+        """
+        keys = set()
+        i = bisect.bisect_left(self.tokens, prefix)
+        while i < len(self.tokens) and self.tokens[i].startswith(prefix):
+            keys.update(self.token_keys[self.tokens[i]])
+            i += 1
+        return keys
+
+    def search(self, search_name: str, limit: int = 10, min_similarity: float = 0.5) -> List[Person]:
+        """
+        search persons by name - every search token must be a prefix of a name token,
+        trigram similarity is the fallback for misspellings
+
+        Args:
+            search_name: the name to search
+            limit: the maximum number of results
+            min_similarity: the minimum trigram similarity of a fallback match
+
+        Returns:
+            List[Person]: the matching persons
+        """
+        query = normalize_name(search_name)
+        if not query:
+            return []
+        keys = None
+        for token in query.split():
+            token_keys = self.prefix_keys(token)
+            keys = token_keys if keys is None else keys & token_keys
+            if not keys:
+                break
+        if keys:
+            ranked = sorted(keys, key=lambda key: PersonIndex.names(self.persons[key]))
+        else:
+            query_trigrams = PersonIndex.trigrams(query)
+            counts = Counter()
+            for trigram in query_trigrams:
+                counts.update(self.trigram_keys.get(trigram, ()))
+            min_count = min_similarity * len(query_trigrams)
+            ranked = [key for key, count in counts.most_common() if count >= min_count]
+        persons = [self.persons[key] for key in ranked[:limit]]
+        return persons
+
+
+class PersonCache:
+    """
+    persistent cache of person lookups by source and normalized name prefix
+    with a local autocomplete index over all persons ever returned
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_age: datetime.timedelta = datetime.timedelta(days=30),
+        debug: bool = False,
+    ):
+        """
+        Constructor
+
+        Args:
+            db_path(str): the path to the SQLite database - default: persons.db in the snapquery storage directory
+            max_age(timedelta): the age after which cached lookups are stale
+            debug(bool): if True show debug information
+        """
+        if db_path is None:
+            cache_dir = os.path.dirname(NamedQueryManager.get_cache_path())
+            db_path = os.path.join(cache_dir, "persons.db")
+        self.db_path = db_path
+        self.max_age = max_age
+        self.debug = debug
+        self.lock = threading.Lock()
+        self.sql_db = SQLDB(dbname=db_path, check_same_thread=False, debug=debug)
+        self.entity_infos = {}
+        for cls, primary_key in [(CachedPerson, "person_key"), (PersonSearch, "search_key")]:
+            entity_info = EntityInfo(
+                NamedQueryManager.get_sample_records(cls),
+                name=cls.__name__,
+                primaryKey=primary_key,
+                debug=debug,
+                quiet=not debug,
+            )
+            table_records = self.sql_db.query(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                (cls.__name__,),
+            )
+            if not table_records:
+                self.sql_db.createTable4EntityInfo(entityInfo=entity_info)
+            self.entity_infos[cls.__name__] = entity_info
+        self.index = PersonIndex()
+        for record in self.sql_db.query("SELECT * FROM CachedPerson"):
+            cached_person = CachedPerson(**record)
+            self.index.add(cached_person.person_key, cached_person.to_person())
+        if self.debug:
+            print(f"{len(self.index)} persons in local index")
+
+    def is_fresh(self, search: PersonSearch) -> bool:
+        fresh = search.time_stamp is not None and datetime.datetime.now() - search.time_stamp < self.max_age
+        return fresh
+
+    def lookup(self, source: str, search_name: str, limit: int = 10) -> Optional[List[Person]]:
+        """
+        lookup the persons for the given source and search name
+
+        a fresh lookup of the same name is a hit as well as a fresh
+        complete lookup of a shorter prefix which is filtered locally
+
+        Args:
+            source(str): the lookup source e.g. wikidata
+            search_name(str): the name searched for
+            limit(int): the maximum number of persons
+
+        Returns:
+            Optional[List[Person]]: the persons or None on a cache miss
+        """
+        prefix = normalize_name(search_name)
+        prefixes = [prefix[:i] for i in range(len(prefix), 3, -1)]
+        if not prefixes:
+            return None
+        placeholders = ",".join("?" for _ in prefixes)
+        sql_query = f"SELECT * FROM PersonSearch WHERE search_key IN ({placeholders})"
+        persons = None
+        with self.lock:
+            records = self.sql_db.query(sql_query, tuple(f"{source}:{p}" for p in prefixes))
+            searches = {record["prefix"]: PersonSearch(**record) for record in records}
+            for p in prefixes:
+                search = searches.get(p)
+                if search is None or not self.is_fresh(search):
+                    continue
+                if p == prefix and search.max_results >= limit:
+                    persons = [self.index.persons[key] for key in search.keys if key in self.index.persons]
+                    break
+                if search.complete:
+                    keys = set(search.keys)
+                    matches = self.index.search(search_name, limit=len(self.index))
+                    persons = [person for person in matches if self.index.key_for(person) in keys]
+                    break
+        SnapQueryMetrics.get_instance().cache_lookup("person", hit=persons is not None)
+        if persons is not None:
+            # copies - callers merge suggestions in place
+            persons = [copy.copy(person) for person in persons[:limit]]
+        return persons
+
+    def store(self, source: str, search_name: str, limit: int, persons: List[Person]):
+        """
+        store the result of a remote person lookup and add its persons to the local index
+        """
+        person_keys = []
+        cached_persons = []
+        with self.lock:
+            for person in persons:
+                person_key = self.index.key_for(person)
+                if person_key is None:
+                    continue
+                # the index keeps its own copies - merging must not change the caller's persons
+                self.index.add(person_key, copy.copy(person))
+                person_keys.append(person_key)
+                cached_persons.append(CachedPerson.from_person(person_key, self.index.persons[person_key]))
+            prefix = normalize_name(search_name)
+            search = PersonSearch(
+                search_key=f"{source}:{prefix}",
+                source=source,
+                prefix=prefix,
+                max_results=limit,
+                person_keys=json.dumps(list(dict.fromkeys(person_keys))),
+            )
+            if cached_persons:
+                lod = [asdict(cached_person) for cached_person in cached_persons]
+                self.sql_db.store(lod, self.entity_infos["CachedPerson"], executeMany=True, fixNone=True, replace=True)
+            self.sql_db.store([asdict(search)], self.entity_infos["PersonSearch"], fixNone=True, replace=True)
+
+    def search_local(self, search_name: str, limit: int = 10) -> List[Person]:
+        """
+        search the local index of all persons ever returned
+        """
+        with self.lock:
+            persons = [copy.copy(person) for person in self.index.search(search_name, limit=limit)]
+        return persons
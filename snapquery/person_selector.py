@@ -5,7 +5,7 @@ Created 2023
 """
 
 import asyncio
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set
 
 from ngwidgets.debouncer import DebouncerUI
 from ngwidgets.input_webserver import WebSolution
@@ -28,12 +28,18 @@ class PersonView(Element):
         self.pids = PIDs()
         self.pid_values = self._create_pid_values(person)
         super().__init__(tag="div")
+        self.render()
+
+    def render(self):
+        """
+        render the person
+        """
         with self:
             with ui.item() as self.person_card:
                 with ui.item_section().props("avatar"):
                     with ui.avatar():
-                        if person.image:
-                            ui.image(source=person.image)
+                        if self.person.image:
+                            ui.image(source=self.person.image)
                 with ui.item_section():
                     with ui.row():
                         self.person_label = ui.label(self.person.label)
@@ -42,6 +48,15 @@ class PersonView(Element):
                     with ui.row():
                         self._show_identifier()
 
+    def update_person(self, person: Person):
+        """
+        patch this view to show the given (merged) person
+        """
+        self.person = person
+        self.pid_values = self._create_pid_values(person)
+        self.clear()
+        self.render()
+
     def _create_pid_values(self, person: Person) -> List[PIDValue]:
         """
         Create PIDValue instances for the person's identifiers
@@ -79,8 +94,11 @@ class PersonSuggestion(PersonView):
     """
 
     def __init__(self, person: Person, on_select: Callable[[Person], Any]):
-        super().__init__(person=person)
         self._on_select_callback = on_select
+        super().__init__(person=person)
+
+    def render(self):
+        super().render()
         self.person_card.on_click(self.on_select)
 
     def on_select(self):
@@ -110,6 +128,11 @@ class PersonSelector:
         self.limit = limit
         # instance variables
         self.suggested_persons: List[Person] = []
+        # identifier key → position in suggested_persons
+        self.pid_index: Dict[str, int] = {}
+        self.suggestion_list: Optional[ui.list] = None
+        self.suggestion_cards: List[PersonSuggestion] = []
+        self.matches_label: Optional[ui.label] = None
         self.selected_person: Optional[Person] = None
         self.suggestion_view: Optional[ui.element] = None
         self.search_name = ""
@@ -152,6 +175,7 @@ class PersonSelector:
             with splitter.after:
                 with ui.element("column").classes(" w-full h-full gap-2"):
                     self.suggestion_view = ui.column().classes("rounded-md border-2 p-3")
+                    self.suggestion_list = None
 
     async def btn_selection_callback(self):
         person = Person()
@@ -174,6 +198,7 @@ class PersonSelector:
 
     def clear_suggested_persons(self):
         self.suggested_persons = []
+        self.pid_index = {}
         self.update_suggestions_view()
 
     async def suggest_persons(self):
@@ -195,55 +220,88 @@ class PersonSelector:
             return
         try:
             self.clear_suggested_persons()
+            # local suggestions first - the sources only query remotely on cache misses
+            local_persons = self.person_lookup.suggest_local(search_name, self.limit)
+            if local_persons:
+                changed = self.merge_and_update_suggestions(local_persons)
+                self.update_suggestions_view(changed)
             tasks = [
-                asyncio.to_thread(self.person_lookup.suggest_from_wikidata, search_name, self.limit),
-                asyncio.to_thread(self.person_lookup.suggest_from_orcid, search_name, self.limit),
-                asyncio.to_thread(self.person_lookup.suggest_from_dblp, search_name, self.limit),
+                asyncio.to_thread(self.person_lookup.suggest, source, search_name, self.limit)
+                for source in PersonLookup.SOURCES
             ]
             for future in asyncio.as_completed(tasks):
                 new_persons = await future
-                self.merge_and_update_suggestions(new_persons)
-                self.update_suggestions_view()
+                changed = self.merge_and_update_suggestions(new_persons)
+                self.update_suggestions_view(changed)
         except Exception as ex:
             self.solution.handle_exception(ex)
 
-    def merge_and_update_suggestions(self, new_persons: List[Person]):
+    def merge_and_update_suggestions(self, new_persons: List[Person]) -> Set[int]:
         """
         Merges new persons with existing ones based on shared identifiers or adds them if unique.
         Ensures no duplicates are present in the list of suggested persons.
 
         Args:
             new_persons (List[Person]): New person suggestions to be added or merged.
+
+        Returns:
+            Set[int]: the positions of the added or merged persons
         """
+        changed = set()
         for new_person in new_persons:
-            merged = False
-            for existing_person in self.suggested_persons:
-                if existing_person.share_identifier(new_person):
-                    existing_person.merge_with(new_person)
-                    merged = True
-                    break
-            if not merged:
+            pid_keys = new_person.pid_keys
+            position = next((self.pid_index[key] for key in pid_keys if key in self.pid_index), None)
+            if position is None:
+                position = len(self.suggested_persons)
                 self.suggested_persons.append(new_person)
+            else:
+                self.suggested_persons[position].merge_with(new_person)
+            # identifiers added by the merge point to the same person
+            for key in self.suggested_persons[position].pid_keys:
+                self.pid_index.setdefault(key, position)
+            changed.add(position)
+        return changed
 
-    def update_suggestions_view(self):
+    def update_suggestions_view(self, changed: Optional[Set[int]] = None):
         """
         update the suggestions view
+
+        Args:
+            changed: the positions of the added or merged persons - only these
+                cards are added or patched, None rebuilds the whole view
         """
-        if self.suggestion_view:
+        if not self.suggestion_view:
+            return
+        if changed is None or self.suggestion_list is None:
             self.suggestion_view.clear()
+            self.suggestion_cards = []
             with self.suggestion_view:
-                with ui.list().props("bordered separator"):
+                with ui.list().props("bordered separator") as self.suggestion_list:
                     ui.item_label("Suggestions").props("header").classes("text-bold")
                     ui.separator()
-                    for person in self.suggested_persons[: self.limit]:
-                        PersonSuggestion(person=person, on_select=self.selection_callback)
+                self.matches_label = ui.label()
+            changed = set(range(len(self.suggested_persons)))
+        for position in sorted(changed):
+            if position >= self.limit:
+                continue
+            person = self.suggested_persons[position]
+            if position < len(self.suggestion_cards):
+                self.suggestion_cards[position].update_person(person)
+            else:
+                self.suggestion_cards.append(self.create_suggestion_card(person))
+        total = len(self.suggested_persons)
+        matches_text = ""
+        if total > self.limit:
+            matches_text = f"{'>' if total >= 10000 else ''}{total} matches are available..."
+        self.matches_label.set_text(matches_text)
 
-                    if len(self.suggested_persons) > self.limit:
-                        with ui.item():
-                            ui.label(
-                                f"{'>' if len(self.suggested_persons) >= 10000 else ''}{len(self.suggested_persons)} matches are available..."
-                            )
-            return []
+    def create_suggestion_card(self, person: Person) -> PersonSuggestion:
+        """
+        add a card for the given person to the suggestion list
+        """
+        with self.suggestion_list:
+            card = PersonSuggestion(person=person, on_select=self.selection_callback)
+        return card
 
     def select_person_suggestion(self, person: Person):
         """
@@ -253,5 +311,7 @@ class PersonSelector:
         """
         self.selected_person = person
         self.person_selection.refresh()
-        self.suggested_persons = [person]
-        self.update_suggestions_list()
+        self.suggested_persons = []
+        self.pid_index = {}
+        changed = self.merge_and_update_suggestions([person])
+        self.update_suggestions_view(changed)
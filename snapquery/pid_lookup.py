@@ -3,13 +3,14 @@ Created on 2024-05-26
 @author: wf
 """
 
-from typing import List
+from typing import List, Optional
 
 from ez_wikidata.wdsearch import WikidataSearch
 
 from snapquery.dblp import DblpPersonLookup
 from snapquery.models.person import Person
 from snapquery.orcid import OrcidAuth, OrcidSearchParams
+from snapquery.person_cache import PersonCache
 from snapquery.pid import PIDs
 from snapquery.snapquery_core import NamedQuery, NamedQueryManager
 
@@ -20,17 +21,66 @@ class PersonLookup:
     databases such as Wikidata, ORCID, and DBLP.
     """
 
-    def __init__(self, nqm: NamedQueryManager):
+    SOURCES = ["wikidata", "orcid", "dblp"]
+
+    def __init__(
+        self,
+        nqm: NamedQueryManager,
+        person_cache: Optional[PersonCache] = None,
+        with_cache: bool = True,
+    ):
         """
         Initialize the PersonLookup with a Named Query Manager.
 
         Args:
             nqm (NamedQueryManager): The named query manager to execute SPARQL queries.
+            person_cache (PersonCache): the cache of lookups - default: the PersonCache in the snapquery storage directory
+            with_cache (bool): if False always do the remote lookups
         """
         self.pids = PIDs()
         self.nqm = nqm
         self.wikidata_search = WikidataSearch()
         self.dblp_person_lookup = DblpPersonLookup(self.nqm)
+        if person_cache is None and with_cache:
+            person_cache = PersonCache()
+        self.person_cache = person_cache
+
+    def suggest(self, source: str, search_name: str, limit: int = 10) -> List[Person]:
+        """
+        Suggest persons from the given source - remote lookups are only
+        done for cache misses or stale entries.
+
+        Args:
+            source (str): wikidata, orcid or dblp
+            search_name (str): The name to search for suggestions.
+            limit (int): The maximum number of results to return.
+
+        Returns:
+            List[Person]: A list of suggested persons.
+        """
+        persons = None
+        if self.person_cache:
+            persons = self.person_cache.lookup(source, search_name, limit)
+        if persons is None:
+            suggest_func = getattr(self, f"suggest_from_{source}")
+            persons = suggest_func(search_name, limit)
+            if self.person_cache:
+                self.person_cache.store(source, search_name, limit, persons)
+        return persons
+
+    def suggest_local(self, search_name: str, limit: int = 10) -> List[Person]:
+        """
+        Suggest persons from the local index of all persons ever returned.
+
+        Args:
+            search_name (str): The name to search for suggestions.
+            limit (int): The maximum number of results to return.
+
+        Returns:
+            List[Person]: A list of suggested persons.
+        """
+        persons = self.person_cache.search_local(search_name, limit) if self.person_cache else []
+        return persons
 
     def suggest_from_wikidata(self, search_name: str, limit: int = 10) -> List[Person]:
         """
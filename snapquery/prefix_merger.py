@@ -80,7 +80,7 @@ class QueryPrefixMerger(Enum):
         """
         prefixes_str = endpoint.get_prefixes(PrefixConfigs.get_instance())
         if not prefixes_str.strip():
-            return
+            return query_str
 
         merged_query = Prefixes.merge_prefixes(query_str, prefixes_str)
         return merged_query
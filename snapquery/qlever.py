@@ -4,13 +4,18 @@ Created on 2024-06-20
 @author: wf
 """
 
+import datetime
+import json
 import re
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional
 
 from bs4 import BeautifulSoup
 from osprojects.osproject import OsProject, Ticket
 from tqdm import tqdm
 
+from snapquery.short_url_resolver import ShortUrlCache, ShortUrlResolution
 from snapquery.snapquery_core import NamedQuery, NamedQuerySet
 from snapquery.wd_short_url import ShortUrl
 
@@ -50,6 +55,22 @@ class QLeverUrl(ShortUrl):
                 self.error = ex
         return self.sparql
 
+    def resolve(self) -> ShortUrlResolution:
+        """
+        Resolve my short URL to a cacheable resolution.
+
+        Returns:
+            ShortUrlResolution: the final url and SPARQL query or the error
+        """
+        self.read_query()
+        resolution = ShortUrlResolution(
+            short_url=self.short_url,
+            url=self.url,
+            sparql=self.sparql,
+            error=str(self.error) if self.error else None,
+        )
+        return resolution
+
 
 class QLever:
     """
@@ -61,13 +82,32 @@ class QLever:
         self,
         with_progress: bool = True,
         debug: bool = False,
+        link_cache: Optional[ShortUrlCache] = None,
+        with_cache: bool = True,
+        state_dir: Optional[str] = None,
+        max_workers: int = 8,
     ):
         """
         constructor
+
+        Args:
+            with_progress: if True show progress bars
+            debug: if True show debug information
+            link_cache: Optional cache of resolved QLever links - default: the ShortUrlCache in the snapquery storage directory
+            with_cache: if False do not cache resolved links
+            state_dir: Optional directory of the issue scan state (default: ~/.solutions/snapquery/qlever)
+            max_workers: maximum number of concurrent comment fetches and link resolutions
         """
         self.url = "https://github.com/ad-freiburg/qlever"
         self.with_progress = with_progress
         self.debug = debug
+        if link_cache is None and with_cache:
+            link_cache = ShortUrlCache(debug=debug)
+        self.link_cache = link_cache
+        if state_dir is None:
+            state_dir = Path.home() / ".solutions" / "snapquery" / "qlever"
+        self.state_dir = Path(state_dir)
+        self.max_workers = max_workers
         # Regex pattern to find URLs starting with the specified prefix
         self.wd_url_pattern = re.compile(r"https://(?:qlever\.cs\.uni-freiburg\.de|qlever\.dev)/wikidata/[A-Za-z0-9]+")
         self.osproject = OsProject.fromUrl(self.url)
@@ -95,39 +135,144 @@ class QLever:
         ticket_urls = list(set(extracted_urls))
         return ticket_urls
 
-    def get_issues_query_set(self, limit: int = None, progress: bool = False) -> NamedQuerySet:
+    def get_scan_state_path(self) -> Path:
+        """
+        get the path of the issue scan state file
+        """
+        state_path = self.state_dir / "issue_scan.json"
+        return state_path
+
+    def load_scan_state(self) -> Dict:
+        """
+        load the issue scan state with the last scan time
+        and the title, url and QLever urls found per ticket number
+        """
+        state_path = self.get_scan_state_path()
+        if state_path.exists():
+            try:
+                return json.loads(state_path.read_text())
+            except (json.JSONDecodeError, OSError):
+                pass
+        return {}
+
+    def save_scan_state(self, state: Dict):
+        """
+        save the given issue scan state
+        """
+        state_path = self.get_scan_state_path()
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        state_path.write_text(json.dumps(state, indent=2))
+
+    def wd_urls_for_tickets(self, tickets: List[Ticket], progress: bool = False) -> Dict[int, List[str]]:
+        """
+        fetch the comments of the given tickets concurrently and extract the QLever Wikidata urls
+
+        Args:
+            tickets: the tickets to scan
+            progress: Whether to show a CLI progress bar.
+
+        Returns:
+            Dict[int, List[str]]: the urls by ticket number
+        """
+        ticket_urls = {}
+        pbar = tqdm(total=len(tickets), desc="Scanning tickets for QLever URLs", unit="ticket", disable=not progress)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.wd_urls_for_ticket, ticket): ticket for ticket in tickets}
+            for future in as_completed(futures):
+                ticket = futures[future]
+                try:
+                    ticket_urls[ticket.number] = sorted(future.result())
+                except Exception as ex:
+                    # not recorded - the ticket is rescanned next time
+                    if self.debug:
+                        print(f"fetching comments for ticket #{ticket.number} failed: {ex}")
+                pbar.update(1)
+        pbar.close()
+        return ticket_urls
+
+    def resolve_urls(self, urls: List[str], progress: bool = False) -> Dict[str, ShortUrlResolution]:
+        """
+        resolve the given QLever short urls concurrently - known links are read from the cache
+
+        Args:
+            urls: the short urls to resolve
+            progress: Whether to show a CLI progress bar.
+
+        Returns:
+            Dict[str, ShortUrlResolution]: the resolutions by short url
+        """
+        urls = list(dict.fromkeys(urls))
+        resolutions = self.link_cache.lookup_all(urls) if self.link_cache else {}
+        missing = [url for url in urls if url not in resolutions]
+        if self.debug:
+            print(f"resolving {len(missing)} of {len(urls)} QLever urls - others cached")
+        pbar = tqdm(total=len(missing), desc="Resolving QLever URLs", unit="url", disable=not progress or not missing)
+        resolved = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(QLeverUrl(url).resolve) for url in missing]
+            for future in as_completed(futures):
+                resolution = future.result()
+                resolutions[resolution.short_url] = resolution
+                if resolution.cacheable:
+                    resolved.append(resolution)
+                pbar.update(1)
+        pbar.close()
+        if self.link_cache:
+            self.link_cache.store(resolved)
+        return resolutions
+
+    def get_issues_query_set(
+        self, limit: int = None, progress: bool = False, incremental: bool = False
+    ) -> NamedQuerySet:
         """
         Orchestrates the retrieval of tickets, extraction of URLs,
         resolving of SPARQL queries, and creation of a NamedQuerySet.
 
         Args:
-            limit (int): Max number of tickets to process.
+            limit (int): Max number of tickets to process - the most recent ones in both modes.
+                A limited scan is partial and therefore not saved as scan state.
             progress (bool): Whether to show a CLI progress bar.
+            incremental (bool): only list and rescan the tickets updated since the last scan -
+                the other tickets are taken from the scan state
 
         Returns:
             NamedQuerySet: The populated query set.
         """
-        # Get the full dictionary
-        tickets_map = self.osproject.getAllTickets(limit=limit)
-        items_iterable = tickets_map.items()
-
-        if progress:
-            iterator = tqdm(
-                items_iterable, total=len(tickets_map), desc="Scanning tickets for QLever URLs", unit="ticket"
-            )
+        scan_time = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        state = self.load_scan_state()
+        known: Dict[str, Dict] = state.get("tickets", {})
+        incremental = incremental and state.get("last_scan") is not None and len(known) > 0
+        if incremental:
+            # only the tickets updated since the last scan are listed - new comments update a ticket
+            to_scan = self.osproject.getIssues(state="all", since=state["last_scan"])
+            tickets = {
+                int(number): Ticket.init_from_dict(number=int(number), title=record["title"], url=record["url"])
+                for number, record in known.items()
+            }
         else:
-            iterator = items_iterable
-
-        ticket_dict = {}
+            known = {}
+            to_scan = list(self.osproject.getAllTickets(limit=limit).values())
+            tickets = {}
+        tickets.update({ticket.number: ticket for ticket in to_scan})
 
         # 1. Scan tickets for URLs
-        for i, (t_id, ticket) in enumerate(iterator):
-            msg = f"fetching short urls for ticket {i}:#{t_id} {ticket.title}"
-            if self.debug:
-                print(msg)
-            urls = self.wd_urls_for_ticket(ticket)
-            if urls:
-                ticket_dict[ticket] = urls
+        if self.debug:
+            print(f"scanning {len(to_scan)} of {len(tickets)} tickets")
+        ticket_urls = self.wd_urls_for_tickets(to_scan, progress=progress)
+        for number, urls in ticket_urls.items():
+            ticket = tickets[number]
+            known[str(number)] = {"title": ticket.title, "url": ticket.url, "urls": urls}
+        if len(ticket_urls) < len(to_scan):
+            # tickets whose comments could not be fetched are listed again next time
+            scan_time = state["last_scan"] if incremental else None
+        if not limit:
+            self.save_scan_state({"last_scan": scan_time, "tickets": known})
+
+        ticket_dict = {}
+        for number in sorted(tickets, reverse=True)[:limit]:
+            record = known.get(str(number))
+            if record and record["urls"]:
+                ticket_dict[tickets[number]] = record["urls"]
 
         # 2. Convert to NamedQuerySet
         # (This resolves the short URLs to actual SPARQL)
@@ -150,19 +295,13 @@ class QLever:
             target_graph_name="wikidata",
         )
 
-        total_urls = sum(len(urls) for urls in ticket_dict.values())
-
-        # We might want progress here if there are many URLs to resolve
-        if self.with_progress and total_urls > 0:
-            pbar = tqdm(total=total_urls, desc="Resolving QLever URLs", unit="url")
-        else:
-            pbar = None
+        all_urls = [url for urls in ticket_dict.values() for url in urls]
+        # Resolve the Short URLs concurrently
+        resolutions = self.resolve_urls(all_urls, progress=self.with_progress)
 
         for ticket, urls in ticket_dict.items():
             for i, url in enumerate(urls, 1):
-                # Resolve the Short URL
-                qlever_url = QLeverUrl(url)
-                sparql = qlever_url.read_query()
+                sparql = resolutions[url].sparql
 
                 if sparql:
                     # Construct the NamedQuery
@@ -178,10 +317,4 @@ class QLever:
                     )
                     named_query_set.queries.append(query)
 
-                if pbar:
-                    pbar.update(1)
-
-        if pbar:
-            pbar.close()
-
         return named_query_set
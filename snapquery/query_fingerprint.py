@@ -0,0 +1,151 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Set
+
+from snapquery.param_template import ParamTemplate
+from snapquery.sparql_analyzer import SparqlAnalyzer
+
+
+class QueryFingerprint:
+    """
+    canonical fingerprint of a SPARQL query computed from its token stream
+    so that whitespace, comments, prefix declarations, prefixed vs. full IRIs,
+    keyword case, the naming of variables and blank nodes and the naming of the
+    {{ param }} placeholders do not matter
+    """
+
+    token_pattern = re.compile(
+        r"""(?P<string>\"\"\"(?:[^"\\]|\\.|"(?!""))*\"\"\"|'''(?:[^'\\]|\\.|'(?!''))*'''"""
+        r"""|"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')"""
+        r"""|(?P<iri><[^<>"{}|^`\\\s]*>)"""
+        r"""|(?P<comment>\#[^\n]*)"""
+        r"""|(?P<variable>[?$][A-Za-z_0-9]\w*)"""
+        r"""|(?P<bnode>_:[\w.-]*\w)"""
+        r"""|(?P<pname>(?:[A-Za-z][\w.-]*)?:(?:[\w:%-]|\.(?=[\w:%-]))*)"""
+        r"""|(?P<word>[A-Za-z_]\w*)"""
+        # whitespace is skipped by not matching it
+        r"""|(?P<other>\S)"""
+    )
+    rdf_type = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
+    # a dot after the last triple pattern before these tokens is optional
+    pattern_starts = {"{", "}", "OPTIONAL", "FILTER", "SERVICE", "BIND", "VALUES", "MINUS", "GRAPH"}
+    # the label service binds ?xLabel, ?xAltLabel and ?xDescription by the name of ?x
+    label_suffixes = ("AltLabel", "Label", "Description")
+
+    def __init__(self, sparql: str):
+        """
+        constructor
+
+        Args:
+            sparql(str): the query to fingerprint
+        """
+        self.sparql = sparql
+        # original variable name → canonical variable name
+        self.variables: Dict[str, str] = {}
+        self.blank_nodes: Dict[str, str] = {}
+        self.canonical = " ".join(self.get_tokens(self.prepare(sparql)))
+        self.fingerprint = hashlib.sha256(self.canonical.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def of(cls, sparql: str) -> str:
+        """
+        get the fingerprint of the given query
+        """
+        return cls(sparql).fingerprint
+
+    @classmethod
+    def prepare(cls, sparql: str) -> str:
+        """
+        bind the parameters by position - Q00, Q01 ... are no valid Wikidata ids
+        """
+        template = ParamTemplate(sparql)
+        if template.has_params:
+            sparql = template.render({param: f"Q0{i}" for i, param in enumerate(template.params)})
+        return sparql
+
+    @classmethod
+    def rename(cls, names: Dict[str, str], name: str, prefix: str) -> str:
+        if name not in names:
+            names[name] = f"{prefix}{len(names)}"
+        return names[name]
+
+    def rename_variable(self, name: str, names: Set[str]) -> str:
+        """
+        get the canonical name of the given variable - label service variables
+        keep their suffix so that ?aLabel and ?bLabel stay distinguishable
+        """
+        if name not in self.variables:
+            for suffix in QueryFingerprint.label_suffixes:
+                base = name[: -len(suffix)]
+                if name.endswith(suffix) and base in names:
+                    self.variables[name] = self.rename_variable(base, names) + suffix
+                    break
+        return self.rename(self.variables, name, "?v")
+
+    def get_tokens(self, sparql: str) -> List[str]:
+        """
+        get the canonical tokens of the given query
+        """
+        prefixes = {}
+        luts = SparqlAnalyzer.get_prefix_luts()
+        tokens = []
+        names = {
+            match.group()[1:]
+            for match in QueryFingerprint.token_pattern.finditer(sparql)
+            if match.lastgroup == "variable"
+        }
+        # PREFIX and BASE declarations are consumed
+        declaration = None
+        for match in QueryFingerprint.token_pattern.finditer(sparql):
+            kind = match.lastgroup
+            token = match.group()
+            if kind == "comment":
+                continue
+            if declaration is not None:
+                declaration.append(token)
+                if kind == "iri":
+                    if len(declaration) == 3:
+                        prefixes[declaration[1][:-1]] = declaration[2][1:-1]
+                    declaration = None
+                continue
+            if kind == "word":
+                token = token.upper()
+                if token in ("PREFIX", "BASE"):
+                    declaration = [token]
+                    continue
+                if token == "A":
+                    token = QueryFingerprint.rdf_type
+            elif kind == "variable":
+                token = self.rename_variable(token[1:], names)
+            elif kind == "bnode":
+                token = self.rename(self.blank_nodes, token, "_:b")
+            elif kind == "pname":
+                prefix, local_name = token.split(":", 1)
+                namespace = prefixes.get(prefix, luts.get(prefix))
+                if namespace is not None:
+                    token = f"<{namespace}{local_name}>"
+            if token in QueryFingerprint.pattern_starts and tokens and tokens[-1] == ".":
+                tokens.pop()
+            tokens.append(token)
+        return tokens
+
+    def to_canonical_rows(self, lod: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        rename the keys of the given result rows to the canonical variable names
+        """
+        return [{self.variables.get(key, key): value for key, value in row.items()} for row in lod]
+
+    def from_canonical_rows(self, lod: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        rename the keys of the given canonical result rows to my variable names
+        """
+        if lod is None:
+            return None
+        names = {canonical: name for name, canonical in self.variables.items()}
+        return [{names.get(key, key): value for key, value in row.items()} for row in lod]
@@ -0,0 +1,166 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class QueryNameIndex:
+    """
+    in memory index of the domains, namespaces and names of all named queries
+
+    the names of each domain/namespace pair are kept in a sorted list so that
+    prefix lookups and prefix counts are two binary searches - this replaces
+    the domain_namespace_stats and get_all_queries SQL queries for the selector
+    and autocomplete and is kept in sync by NamedQueryManager.store
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        # (domain, namespace) → sorted names
+        self.names: Dict[Tuple[str, str], List[str]] = {}
+        # query_id → (domain, namespace, name) to move renamed queries
+        self.query_keys: Dict[str, Tuple[str, str, str]] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, str]]) -> "QueryNameIndex":
+        """
+        create an index from domain, namespace, name and optional query_id records
+        """
+        index = cls()
+        names: Dict[Tuple[str, str], Set[str]] = {}
+        for record in records:
+            # NULL values never match a LIKE filter
+            if None in (record["domain"], record["namespace"], record["name"]):
+                continue
+            names.setdefault((record["domain"], record["namespace"]), set()).add(record["name"])
+            if record.get("query_id"):
+                index.query_keys[record["query_id"]] = (record["domain"], record["namespace"], record["name"])
+        index.names = {key: sorted(key_names) for key, key_names in names.items()}
+        return index
+
+    def __len__(self) -> int:
+        with self.lock:
+            return sum(len(names) for names in self.names.values())
+
+    def add(self, domain: str, namespace: str, name: str, query_id: Optional[str] = None):
+        """
+        add the given query name - known and incomplete names are ignored,
+        the previous name of a query stored again under a new domain, namespace or name is removed
+        """
+        with self.lock:
+            if query_id is not None:
+                old_key = self.query_keys.pop(query_id, None)
+                if old_key is not None and old_key != (domain, namespace, name):
+                    self.remove(*old_key)
+            if None in (domain, namespace, name):
+                return
+            if query_id is not None:
+                self.query_keys[query_id] = (domain, namespace, name)
+            names = self.names.setdefault((domain, namespace), [])
+            i = bisect.bisect_left(names, name)
+            if i == len(names) or names[i] != name:
+                names.insert(i, name)
+
+    def add_records(self, records: Iterable[Dict[str, str]]):
+        """
+        add the given NamedQuery records
+        """
+        for record in records:
+            self.add(record.get("domain"), record.get("namespace"), record.get("name"), record.get("query_id"))
+
+    def remove(self, domain: str, namespace: str, name: str):
+        """
+        remove the given query name
+        """
+        with self.lock:
+            names = self.names.get((domain, namespace), [])
+            i = bisect.bisect_left(names, name)
+            if i < len(names) and names[i] == name:
+                del names[i]
+            if not names:
+                self.names.pop((domain, namespace), None)
+
+    @classmethod
+    def matches(cls, value: Optional[str], prefix: str) -> bool:
+        """
+        case insensitive prefix match like SQL LIKE 'prefix%'
+        """
+        match = (value or "").lower().startswith(prefix.lower())
+        return match
+
+    @classmethod
+    def prefix_range(cls, names: List[str], prefix: str) -> Tuple[int, int]:
+        """
+        get the index range of the names starting with the given prefix
+        """
+        start = bisect.bisect_left(names, prefix)
+        end = bisect.bisect_left(names, prefix + "\U0010ffff")
+        return start, end
+
+    def matching_keys(self, domain: str = "", namespace: str = "") -> List[Tuple[str, str]]:
+        """
+        get the sorted domain/namespace pairs matching the given prefixes
+        """
+        with self.lock:
+            keys = sorted(
+                key
+                for key in self.names
+                if QueryNameIndex.matches(key[0], domain) and QueryNameIndex.matches(key[1], namespace)
+            )
+        return keys
+
+    def count(self, domain: str = "", namespace: str = "", name: str = "") -> int:
+        """
+        count the queries matching the given prefixes
+        """
+        total = 0
+        with self.lock:
+            for key in self.matching_keys(domain, namespace):
+                start, end = QueryNameIndex.prefix_range(self.names[key], name)
+                total += end - start
+        return total
+
+    def stats(self, domain: str = "", namespace: str = "") -> List[Dict[str, object]]:
+        """
+        get the query counts per domain and namespace - like the domain_namespace_stats meta query
+        """
+        with self.lock:
+            records = [
+                {"domain": key[0], "namespace": key[1], "query_count": len(self.names[key])}
+                for key in self.matching_keys(domain, namespace)
+            ]
+        records.sort(key=lambda record: -record["query_count"])
+        return records
+
+    def complete(
+        self, domain: str = "", namespace: str = "", name: str = "", limit: Optional[int] = None
+    ) -> List[Tuple[str, str, str]]:
+        """
+        get the domain, namespace, name triples matching the given prefixes
+        ordered by domain, namespace and name
+
+        Args:
+            domain: domain prefix
+            namespace: namespace prefix
+            name: name prefix - case sensitive
+            limit: the maximum number of results
+
+        Returns:
+            List[Tuple[str, str, str]]: the matching query names
+        """
+        results = []
+        with self.lock:
+            for key in self.matching_keys(domain, namespace):
+                names = self.names[key]
+                start, end = QueryNameIndex.prefix_range(names, name)
+                if limit is not None:
+                    end = min(end, start + limit - len(results))
+                results.extend((key[0], key[1], names[i]) for i in range(start, end))
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
@@ -0,0 +1,277 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import hashlib
+import json
+import re
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from ngwidgets.llm import LLM
+from tqdm import tqdm
+
+from snapquery.snapquery_core import NamedQuery
+
+
+class NamingBackend(ABC):
+    """
+    a backend that proposes name, title and description for SPARQL queries
+    """
+
+    @abstractmethod
+    def name_queries(self, sparqls: List[str]) -> List[Optional[Dict[str, str]]]:
+        """
+        propose names for the given queries
+
+        Args:
+            sparqls: the SPARQL queries
+
+        Returns:
+            List[Optional[Dict[str, str]]]: a dict with name, title and description per query
+            - None if no proper naming could be determined
+        """
+
+
+class LLMNamingBackend(NamingBackend):
+    """
+    name a batch of queries with a single large language model request
+    """
+
+    def __init__(self, llm: LLM):
+        self.llm = llm
+
+    @classmethod
+    def get_prompt_text(cls, sparqls: List[str]) -> str:
+        queries_text = "\n".join(f"QUERY {i}:\n{sparql}\n" for i, sparql in enumerate(sparqls))
+        prompt_text = f"""give an english name, title and description in json
+for cut &paste for each of the {len(sparqls)} SPARQL queries below - the name should be less than 60 chars be a proper identifier which has no special chars so it can be used in an url without escaping. The title should be less than 80 chars and the
+description not more than three lines of 80 chars.
+Return a json list with one entry per query in the given order. A valid example result for two queries would be e.g.
+[
+  {{
+    "index": 0,
+    "name": "Locations_in_Rennes_with_French_Wikipedia_Article",
+    "title": "Locations in Rennes with a French Wikipedia Article",
+    "description": "Maps locations in Rennes linked to French Wikipedia articles. It displays entities within 10 km of Rennes' center, showing their names, coordinates, and linked Wikipedia pages."
+  }},
+  {{ "index": 1 }}
+]
+
+The example is just an example - do not use it's content if it does not match.
+Avoid  hallucinating and stick to the facts.
+If the you can not determine a proper name, title and description for a query return only its index.
+{queries_text}"""
+        return prompt_text
+
+    @classmethod
+    def parse_response(cls, llm_response: str, count: int) -> List[Optional[Dict[str, str]]]:
+        """
+        parse the json list of the given llm response
+        """
+        namings: List[Optional[Dict[str, str]]] = [None] * count
+        if not llm_response:
+            return namings
+        # remove markdown code fences
+        json_text = re.sub(r"^```(?:json)?|```$", "", llm_response.strip(), flags=re.MULTILINE)
+        records = json.loads(json_text)
+        for i, record in enumerate(records):
+            index = record.get("index", i)
+            if isinstance(index, int) and 0 <= index < count and record.get("name"):
+                namings[index] = {
+                    "name": record["name"],
+                    "title": record.get("title", ""),
+                    "description": record.get("description", ""),
+                }
+        return namings
+
+    def name_queries(self, sparqls: List[str]) -> List[Optional[Dict[str, str]]]:
+        llm_response = self.llm.ask(LLMNamingBackend.get_prompt_text(sparqls))
+        namings = LLMNamingBackend.parse_response(llm_response, len(sparqls))
+        return namings
+
+
+class HeuristicNamingBackend(NamingBackend):
+    """
+    deterministic local namer deriving names from the projection
+    and the Wikidata properties of a query - e.g. for offline tests
+    """
+
+    def name_query(self, sparql: str) -> Optional[Dict[str, str]]:
+        """
+        derive a naming for the given query
+        """
+        select_match = re.search(r"SELECT\s+(?:DISTINCT\s+|REDUCED\s+)?(.*?)\s*(?:WHERE|FROM|\{)", sparql, re.I | re.S)
+        if not select_match:
+            return None
+        variables = list(dict.fromkeys(re.findall(r"\?(\w+)", select_match.group(1))))
+        if not variables:
+            variables = list(dict.fromkeys(re.findall(r"\?(\w+)", sparql)))
+        props = list(dict.fromkeys(re.findall(r"\bwdt:(P\d+)", sparql)))
+        parts = ["Select"] + variables[:3]
+        if props:
+            parts += ["by"] + props[:2]
+        name = "_".join(parts)[:50]
+        title = f"Select {', '.join(variables[:5]) or 'all'}"
+        if props:
+            title += f" using {', '.join(props[:5])}"
+        description = f"Query for {', '.join(variables) or 'all variables'}"
+        if props:
+            description += f" with the Wikidata properties {', '.join(props)}"
+        naming = {"name": name, "title": title[:80], "description": description}
+        return naming
+
+    def name_queries(self, sparqls: List[str]) -> List[Optional[Dict[str, str]]]:
+        namings = [self.name_query(sparql) for sparql in sparqls]
+        return namings
+
+
+class QueryNamer:
+    """
+    batch naming stage for imported queries
+
+    sends batches of queries per backend request concurrently,
+    caches the namings by query hash and resolves name collisions locally
+    - queries that could not be named are not cached but retried next time
+    """
+
+    def __init__(
+        self,
+        backend: NamingBackend,
+        batch_size: int = 10,
+        max_workers: int = 4,
+        cache_path: Optional[str] = None,
+        with_cache: bool = True,
+        debug: bool = False,
+    ):
+        """
+        Constructor
+
+        Args:
+            backend: the naming backend e.g. an LLMNamingBackend or HeuristicNamingBackend
+            batch_size: number of queries per backend request
+            max_workers: number of concurrent backend requests
+            cache_path: path of the naming cache (default: ~/.solutions/snapquery/naming/{backend}.json)
+            with_cache: if False do not cache namings
+            debug: if True show debug information
+        """
+        self.backend = backend
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.debug = debug
+        self.cache_path = None
+        if with_cache:
+            if cache_path is None:
+                cache_path = Path.home() / ".solutions" / "snapquery" / "naming" / f"{type(backend).__name__}.json"
+            self.cache_path = Path(cache_path)
+        self.cache: Dict[str, Dict[str, str]] = self.load_cache()
+
+    @classmethod
+    def query_hash(cls, sparql: str) -> str:
+        query_hash = hashlib.sha256(sparql.strip().encode("utf-8")).hexdigest()
+        return query_hash
+
+    def load_cache(self) -> Dict[str, Dict[str, str]]:
+        """
+        load the namings by query hash
+        """
+        if self.cache_path and self.cache_path.exists():
+            try:
+                cache = json.loads(self.cache_path.read_text())
+                return {query_hash: naming for query_hash, naming in cache.items() if naming}
+            except (json.JSONDecodeError, OSError):
+                pass
+        return {}
+
+    def save_cache(self):
+        """
+        save the namings by query hash
+        """
+        if self.cache_path:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_path.write_text(json.dumps(self.cache, indent=2))
+
+    @classmethod
+    def unique_name(cls, name: str, unique_names: Set[str]) -> str:
+        """
+        get a variant of the given name that is not in unique_names
+        """
+        unique_name = name
+        i = 2
+        while unique_name in unique_names:
+            unique_name = f"{name}_{i}"
+            i += 1
+        return unique_name
+
+    def get_namings(self, sparqls: List[str], show_progress: bool = False) -> Dict[str, Dict[str, str]]:
+        """
+        get the namings of the given queries - unknown ones are requested from the backend
+
+        Args:
+            sparqls: the SPARQL queries
+            show_progress: if True show a progress bar
+
+        Returns:
+            Dict[str, Dict[str, str]]: the namings by query hash - queries that could not be named are missing
+        """
+        todo = {}
+        for sparql in sparqls:
+            query_hash = QueryNamer.query_hash(sparql)
+            if query_hash not in self.cache:
+                todo[query_hash] = sparql
+        hashes = list(todo.keys())
+        batches = [hashes[i : i + self.batch_size] for i in range(0, len(hashes), self.batch_size)]
+        if self.debug:
+            print(f"naming {len(todo)} queries in {len(batches)} batches - {len(sparqls)-len(todo)} cached")
+        pbar = tqdm(total=len(hashes), desc="Naming queries", disable=not show_progress or not hashes)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.backend.name_queries, [todo[query_hash] for query_hash in batch]): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    for query_hash, naming in zip(batch, future.result()):
+                        if naming:
+                            self.cache[query_hash] = naming
+                except Exception as ex:
+                    # not cached - retried next time
+                    if self.debug:
+                        print(f"naming batch failed: {ex}")
+                pbar.update(len(batch))
+        pbar.close()
+        self.save_cache()
+        return self.cache
+
+    def name_queries(
+        self, nqs: List[NamedQuery], unique_names: Set[str], show_progress: bool = False
+    ) -> List[NamedQuery]:
+        """
+        add name, title and description to the given queries
+
+        Args:
+            nqs: the named queries to name
+            unique_names: the names already in use e.g. from nqm.get_unique_sets - extended with the new names
+            show_progress: if True show a progress bar
+
+        Returns:
+            List[NamedQuery]: the queries that could be named
+        """
+        namings = self.get_namings([nq.sparql for nq in nqs], show_progress=show_progress)
+        named = []
+        for nq in nqs:
+            naming = namings.get(QueryNamer.query_hash(nq.sparql))
+            if not naming:
+                continue
+            nq.name = QueryNamer.unique_name(naming["name"], unique_names)
+            nq.title = naming.get("title", "")
+            nq.description = naming.get("description", "")
+            nq.update_query_id()
+            unique_names.add(nq.name)
+            named.append(nq)
+        return named
@@ -8,7 +8,9 @@ from argparse import ArgumentParser, Namespace
 import sys
 
 from basemkit.base_cmd import BaseCmd
+from snapquery.local_repository import LocalRepository
 from snapquery.qlever import QLever
+from snapquery.query_namer import HeuristicNamingBackend, LLMNamingBackend, QueryNamer
 from snapquery.query_set_tool import QuerySetTool
 from snapquery.scholia import ScholiaQueries, GitHubQueries
 from snapquery.sib_sparql_examples import SibSparqlExamples
@@ -95,13 +97,18 @@ class QuerySetCmd(BaseCmd):
             action="store_true",
             help="Enable LLM enrichment",
         )
+        parser.add_argument(
+            "--namer",
+            choices=["llm", "heuristic"],
+            help="Name random short url queries in batches with the given backend - heuristic works offline, --llm implies llm.",
+        )
         parser.add_argument(
             "--github",
             help="Extract queries from a specific GitHub repository (format: owner/repo).",
         )
         parser.add_argument(
             "--branch",
-            help="GitHub branch or ref (optional for --github).",
+            help="GitHub branch or ref (optional for --github; with --local-repo the ref to read instead of the checkout).",
         )
         parser.add_argument(
             "--github-path",
@@ -114,6 +121,10 @@ class QuerySetCmd(BaseCmd):
             default=".rq",
             help="File extension to filter for when using --github (default: .rq).",
         )
+        parser.add_argument(
+            "--local-repo",
+            help="Path of a local git checkout or bare repository to read instead of the GitHub API (for --github, --scholia, --scholia-qlever and --sib-examples).",
+        )
 
         # Scholia options
         parser.add_argument(
@@ -145,6 +156,12 @@ class QuerySetCmd(BaseCmd):
             action="store_true",
             help="Extract QLever Issues from GitHub to generate a NamedQuerySet.",
         )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only extract what changed since the last incremental run "
+            "(for --github, --scholia, --scholia-qlever and --qlever-issues).",
+        )
         # Random short urls
         parser.add_argument(
             "--random-short-urls",
@@ -243,6 +260,28 @@ class QuerySetCmd(BaseCmd):
 
         self._output_dataset(nq_set, args)
 
+    def _local_repository(self, args: Namespace, owner: str, repo: str, branch: str = None):
+        """
+        get a LocalRepository for the --local-repo option if given
+
+        Returns:
+            LocalRepository or None to use the GitHub API
+        """
+        local_repo = None
+        if args.local_repo:
+            local_repo = LocalRepository(args.local_repo, owner=owner, repo=repo, branch=branch, debug=args.debug)
+        return local_repo
+
+    def _extract_github_queries(self, gh_queries: GitHubQueries, args: Namespace) -> None:
+        """
+        extract and output the queries of a repository - with --incremental only the files
+        changed since the last incremental run are extracted and their blob SHAs are remembered
+        """
+        gh_queries.extract_queries(limit=args.limit, show_progress=args.progress, only_changed=args.incremental)
+        self._output_dataset(gh_queries.named_query_set, args)
+        if args.incremental:
+            gh_queries.save_import_state()
+
     def _handle_github(self, args: Namespace) -> None:
         """
         Handle scraping a custom GitHub repository.
@@ -263,11 +302,11 @@ class QuerySetCmd(BaseCmd):
             extension=args.github_extension,
             domain=args.domain,
             namespace=args.namespace,
+            github=self._local_repository(args, owner, repo, args.branch),
             debug=args.debug
         )
 
-        gh_queries.extract_queries(limit=args.limit, show_progress=args.progress)
-        self._output_dataset(gh_queries.named_query_set, args)
+        self._extract_github_queries(gh_queries, args)
 
 
     def _handle_scholia(self, args: Namespace) -> None:
@@ -276,9 +315,10 @@ class QuerySetCmd(BaseCmd):
         """
         nqm = NamedQueryManager.from_samples()
         # Uses defaults defined in ScholiaQueries __init__
-        scholia_queries = ScholiaQueries(nqm, debug=args.debug)
-        scholia_queries.extract_queries(limit=args.limit, show_progress=args.progress)
-        self._output_dataset(scholia_queries.named_query_set, args)
+        scholia_queries = ScholiaQueries(
+            nqm, github=self._local_repository(args, "WDscholia", "scholia", args.branch), debug=args.debug
+        )
+        self._extract_github_queries(scholia_queries, args)
 
     def _handle_scholia_qlever(self, args: Namespace) -> None:
         """
@@ -292,10 +332,11 @@ class QuerySetCmd(BaseCmd):
             repo="scholia",
             branch="qlever",
             namespace="named_queries_qlever",
+            # a local checkout is read as-is unless --branch names a ref explicitly
+            github=self._local_repository(args, "ad-freiburg", "scholia", args.branch),
             debug=args.debug
         )
-        scholia_qlever.extract_queries(limit=args.limit, show_progress=args.progress)
-        self._output_dataset(scholia_qlever.named_query_set, args)
+        self._extract_github_queries(scholia_qlever, args)
 
 
     def _handle_wikidata_examples(self, args: Namespace) -> None:
@@ -348,7 +389,9 @@ class QuerySetCmd(BaseCmd):
         show_progress = args.progress
         # Initialize NamedQueryManager
         nqm = NamedQueryManager.from_samples()
-        sib_fetcher = SibSparqlExamples(nqm, debug=debug)
+        sib_fetcher = SibSparqlExamples(
+            nqm, github=self._local_repository(args, "sib-swiss", "sparql-examples", args.branch), debug=debug
+        )
         if debug:
             print(f"Fetching SIB examples (limit={limit})...")
         _loaded_queries = sib_fetcher.extract_queries(limit=limit, debug_print=debug, show_progress=show_progress)
@@ -365,7 +408,7 @@ class QuerySetCmd(BaseCmd):
             print(f"Fetching QLever tickets from GitHub API (limit={args.limit})...")
 
         # 2. Execute extraction
-        nq_set = qlever.get_issues_query_set(limit=args.limit, progress=args.progress)
+        nq_set = qlever.get_issues_query_set(limit=args.limit, progress=args.progress, incremental=args.incremental)
 
         if args.debug:
             print(f"Extracted {len(nq_set.queries)} named queries.")
@@ -390,14 +433,20 @@ class QuerySetCmd(BaseCmd):
         if args.debug or args.progress:
             print(f"Extracting {count} random short URLs from Wikidata...")
 
+        namer = None
+        if args.namer == "heuristic":
+            namer = QueryNamer(HeuristicNamingBackend(), debug=args.debug)
+        elif args.namer == "llm" or args.llm:
+            namer = QueryNamer(LLMNamingBackend(ShortUrl.get_llm()), debug=args.debug)
+
         # Get random query set
         nq_set = ShortUrl.get_random_query_list(
             nqm=nqm,
             namespace=namespace,
             count=count,
-            with_llm=args.llm,
             with_progress=args.progress,
             debug=args.debug,
+            namer=namer,
         )
 
         if args.debug:
@@ -8,8 +8,8 @@ import glob
 import os
 from typing import List, Optional
 
-from tqdm import tqdm
-
+from snapquery.bulk_import import BulkImporter, BulkImportStats
+from snapquery.short_url_resolver import ShortUrlResolver
 from snapquery.snapquery_core import NamedQuery, NamedQueryManager, NamedQuerySet
 from snapquery.wd_short_url import ShortUrl
 
@@ -30,6 +30,8 @@ class QuerySetTool:
             nqm (NamedQueryManager, optional): The NamedQueryManager to use for storing queries.
         """
         self.nqm = nqm
+        # statistics of the bulk imports done so far
+        self.import_stats: List[BulkImportStats] = []
 
     def infer_format(self, source: str, input_format: str = "auto") -> str:
         """
@@ -111,12 +113,20 @@ class QuerySetTool:
         Returns:
             NamedQuerySet: The resulting set.
         """
+        resolver = ShortUrlResolver()
+        resolutions = resolver.resolve_all(short_urls)
         queries = []
         for url in short_urls:
-            su = ShortUrl(url)
-            nq = self.read_from_short_url(short_url=su, domain=domain, namespace=namespace)
-            if nq is None:
+            resolution = resolutions.get(url)
+            if resolution is None or not resolution.sparql:
                 raise ValueError(f"Failed to fetch/parse short URL: {url}")
+            nq = NamedQuery(
+                domain=domain,
+                name=ShortUrl(url).name,
+                namespace=namespace,
+                url=url,
+                sparql=resolution.sparql,
+            )
             queries.append(nq)
 
         nq_set = NamedQuerySet(domain=domain, namespace=namespace, target_graph_name=target_graph_name, queries=queries)
@@ -150,33 +160,36 @@ class QuerySetTool:
 
         Args:
             json_file (str): Path to the JSON file.
-            with_store (bool): If True, store the results in the NamedQueryManager.
+            with_store (bool): If True, bulk store the results in the NamedQueryManager.
             show_progress (bool): If True, show a progress bar during the import.
 
         Returns:
             NamedQuerySet: A NamedQuerySet object containing the imported NamedQuery objects.
         """
         nq_set = NamedQuerySet.load_from_json_file(json_file)  # @UndefinedVariable
-        iterable = (
-            tqdm(
-                nq_set.queries,
-                desc=f"Importing Namespace {nq_set.namespace}@{nq_set.domain}",
-            )
-            if show_progress
-            else nq_set.queries
-        )
-
-        for nq in iterable:
+        # resolve all short urls of queries without sparql concurrently and cached
+        short_urls = [
+            nq.url for nq in nq_set.queries if not nq.sparql and nq.url and nq.url.startswith("https://w.wiki/")
+        ]
+        resolutions = {}
+        if short_urls:
+            resolver = ShortUrlResolver()
+            resolutions = resolver.resolve_all(short_urls, show_progress=show_progress)
+
+        for nq in nq_set.queries:
             if not nq.sparql:
-                if nq.url and nq.url.startswith("https://w.wiki/"):
-                    short_url = ShortUrl(nq.url)
-                    nq.sparql = short_url.read_query()
+                if nq.url in resolutions:
+                    nq.sparql = resolutions[nq.url].sparql
                 else:
                     raise Exception(f"invalid named query with no url: {nq}")
                     # what now?
                     continue
-            if with_store and self.nqm:
-                self.nqm.add_and_store(nq)
+        if with_store and self.nqm:
+            bulk_importer = BulkImporter(self.nqm)
+            stats = bulk_importer.import_query_set(nq_set, show_progress=show_progress)
+            self.import_stats.append(stats)
+            if show_progress:
+                print(stats)
         return nq_set
 
     def read_from_short_url(
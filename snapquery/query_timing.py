@@ -0,0 +1,147 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import http.client
+import socket
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+
+import SPARQLWrapper.Wrapper
+
+
+class TimedHTTPResponse(http.client.HTTPResponse):
+    """
+    a response that adds the time and size of its body reads to the recorded stats
+    """
+
+    def read(self, amt=None):
+        start = time.perf_counter()
+        data = super().read(amt)
+        stats = QueryTiming.current()
+        if stats is not None:
+            stats.add_time("transfer", time.perf_counter() - start)
+            stats.bytes_received = (stats.bytes_received or 0) + len(data)
+        return data
+
+
+class TimedConnectionMixin:
+    """
+    record the connect time and the time to the first byte of the response
+    """
+
+    response_class = TimedHTTPResponse
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        self.connect_time = time.perf_counter() - start
+        stats = QueryTiming.current()
+        if stats is not None:
+            stats.add_time("connect", self.connect_time)
+
+    def request(self, *args, **kwargs):
+        # the connection is opened lazily when the request is sent
+        self.request_start = time.perf_counter()
+        self.connect_time = 0.0
+        super().request(*args, **kwargs)
+
+    def getresponse(self):
+        response = super().getresponse()
+        stats = QueryTiming.current()
+        if stats is not None:
+            stats.add_time("first_byte", time.perf_counter() - self.request_start - self.connect_time)
+        return response
+
+
+class TimedHTTPConnection(TimedConnectionMixin, http.client.HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, http.client.HTTPSConnection):
+    pass
+
+
+class TimedHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(TimedHTTPConnection, req)
+
+
+class TimedHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(TimedHTTPSConnection, req, context=self._context)
+
+
+class QueryTiming:
+    """
+    record the network stages of the SPARQL queries of a thread in a QueryStats
+
+    SPARQLWrapper opens its requests via its module level urlopener which
+    is replaced by an opener with timed connections - requests of threads
+    that are not recording are passed to the original urlopener
+    """
+
+    local = threading.local()
+    lock = threading.Lock()
+    opener = None
+    original_urlopener = None
+    network_stages = ["queue", "connect", "first_byte", "transfer"]
+
+    @classmethod
+    def current(cls):
+        """
+        get the stats recorded by the current thread (if any)
+        """
+        return getattr(cls.local, "stats", None)
+
+    @classmethod
+    def install(cls):
+        """
+        install the timed urlopener for SPARQLWrapper - idempotent
+        """
+        with cls.lock:
+            if cls.opener is None:
+                cls.original_urlopener = SPARQLWrapper.Wrapper.urlopener
+                SPARQLWrapper.Wrapper.urlopener = cls.urlopen
+                cls.opener = urllib.request.build_opener(TimedHTTPHandler, TimedHTTPSHandler)
+
+    @classmethod
+    def urlopen(cls, request, timeout=socket._GLOBAL_DEFAULT_TIMEOUT):
+        stats = cls.current()
+        if stats is None:
+            return cls.original_urlopener(request, timeout=timeout)
+        queued = getattr(cls.local, "queued", None)
+        if queued is not None:
+            # the time since the query was issued is spent in the rate limiter
+            stats.add_time("queue", time.perf_counter() - queued)
+            cls.local.queued = None
+        return cls.opener.open(request, timeout=timeout)
+
+    @classmethod
+    def network_time(cls, stats) -> float:
+        network_time = sum(getattr(stats, f"{stage}_time") or 0.0 for stage in cls.network_stages)
+        return network_time
+
+    @classmethod
+    @contextmanager
+    def recording(cls, stats):
+        """
+        record the network stages of the queries issued in the with block in the given stats
+        the remaining time of a successful block is the parse time of the response
+        """
+        cls.install()
+        network_before = cls.network_time(stats)
+        start = time.perf_counter()
+        cls.local.stats = stats
+        cls.local.queued = start
+        try:
+            yield stats
+        finally:
+            cls.local.stats = None
+            cls.local.queued = None
+        network_time = cls.network_time(stats) - network_before
+        stats.add_time("parse", max(0.0, time.perf_counter() - start - network_time))
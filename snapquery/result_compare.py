@@ -0,0 +1,293 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import hashlib
+import heapq
+import itertools
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from snapquery.param_template import ParamTemplateCache
+from snapquery.snapquery_core import NamedQuery, NamedQueryManager, QueryPrefixMerger
+from snapquery.snapshot_store import SnapshotStore
+
+
+@dataclass
+class EndpointResult:
+    """
+    the hashed result rows of a query on one endpoint
+    """
+
+    endpoint_name: str
+    rows: int = 0
+    duration: Optional[float] = None
+    error_msg: Optional[str] = None
+    # the 64 bit hashes of the distinct canonical rows
+    hashes: Set[int] = field(default_factory=set, repr=False)
+    # path of the spill file with the rows for the sampling pass
+    spill_path: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def distinct(self) -> int:
+        return len(self.hashes)
+
+    def as_record(self) -> Dict[str, Any]:
+        record = {
+            "endpoint_name": self.endpoint_name,
+            "rows": self.rows,
+            "distinct": self.distinct,
+            "duration": self.duration,
+            "error_msg": self.error_msg,
+        }
+        return record
+
+
+@dataclass
+class PairComparison:
+    """
+    the set difference of the result rows of two endpoints
+    """
+
+    endpoint_a: str
+    endpoint_b: str
+    common: int
+    only_a: int
+    only_b: int
+    samples_a: List[Dict[str, Any]] = field(default_factory=list)
+    samples_b: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def overlap(self) -> float:
+        """
+        the Jaccard overlap of the distinct rows - 1.0 for identical results
+        """
+        union = self.common + self.only_a + self.only_b
+        overlap = self.common / union if union else 1.0
+        return overlap
+
+    def as_record(self) -> Dict[str, Any]:
+        record = {
+            "endpoint_a": self.endpoint_a,
+            "endpoint_b": self.endpoint_b,
+            "common": self.common,
+            "only_a": self.only_a,
+            "only_b": self.only_b,
+            "overlap": round(self.overlap, 4),
+            "samples_a": self.samples_a,
+            "samples_b": self.samples_b,
+        }
+        return record
+
+
+@dataclass
+class ResultComparison:
+    """
+    the comparison of the results of a query on several endpoints
+    """
+
+    query_id: str
+    results: Dict[str, EndpointResult] = field(default_factory=dict)
+    pairs: List[PairComparison] = field(default_factory=list)
+
+    @property
+    def identical(self) -> bool:
+        identical = all(pair.overlap == 1.0 for pair in self.pairs) and not any(
+            result.error_msg for result in self.results.values()
+        )
+        return identical
+
+    def as_record(self) -> Dict[str, Any]:
+        record = {
+            "query_id": self.query_id,
+            "identical": self.identical,
+            "endpoints": [result.as_record() for result in self.results.values()],
+            "pairs": [pair.as_record() for pair in self.pairs],
+        }
+        return record
+
+    def to_json(self, indent: int = 2) -> str:
+        return json.dumps(self.as_record(), indent=indent, default=str)
+
+
+class ResultComparator:
+    """
+    compare the result rows of a query on several endpoints
+
+    the rows of all endpoints are streamed concurrently and reduced to
+    64 bit hashes of their order independent canonical form - only the
+    hash sets are kept in memory while the rows are spilled to temporary
+    files which are read once more to pick the sample differing rows
+    """
+
+    def __init__(
+        self,
+        nqm: NamedQueryManager,
+        sample_size: int = 5,
+        timeout: float = 60.0,
+        max_workers: Optional[int] = None,
+        debug: bool = False,
+    ):
+        """
+        Constructor
+
+        Args:
+            nqm(NamedQueryManager): the manager of the queries and endpoints
+            sample_size(int): the maximum number of differing rows to report per endpoint pair and side
+            timeout(float): the connect and read timeout per endpoint in seconds
+            max_workers(int): the maximum number of concurrent endpoint queries - default: one per endpoint
+            debug(bool): if True show debug information
+        """
+        self.nqm = nqm
+        self.sample_size = sample_size
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.debug = debug
+
+    @classmethod
+    def row_hash(cls, canonical: str) -> int:
+        """
+        get the 64 bit hash of the given canonical row
+        """
+        digest = hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def hash_records(self, endpoint_name: str, records: Iterable[Dict[str, Any]], spill_dir: str) -> EndpointResult:
+        """
+        reduce the given records to a hash set and spill them for the sampling pass
+
+        Args:
+            endpoint_name(str): the endpoint the records are from
+            records(Iterable): the records - consumed lazily
+            spill_dir(str): the directory for the spill file
+
+        Returns:
+            EndpointResult: the hashed result
+        """
+        result = EndpointResult(endpoint_name=endpoint_name)
+        start_time = time.time()
+        with tempfile.NamedTemporaryFile(
+            "w", dir=spill_dir, suffix=".jsonl", encoding="utf-8", delete=False
+        ) as spill_file:
+            result.spill_path = spill_file.name
+            try:
+                for record in records:
+                    canonical = SnapshotStore.canonical_record(record)
+                    row_hash = ResultComparator.row_hash(canonical)
+                    result.rows += 1
+                    if row_hash not in result.hashes:
+                        result.hashes.add(row_hash)
+                        spill_file.write(f"{row_hash}\t{canonical}\n")
+            except Exception as ex:
+                result.error_msg = str(ex)
+        result.duration = time.time() - start_time
+        return result
+
+    def sample_rows(self, result: EndpointResult, wanted: Dict[int, List[Dict[str, Any]]]):
+        """
+        read the spilled rows of the given result once and fill the wanted samples
+
+        Args:
+            result(EndpointResult): the hashed result
+            wanted(Dict[int, List]): the rows to collect by hash - the lists are filled in place
+        """
+        if not wanted or not result.spill_path:
+            return
+        with open(result.spill_path, encoding="utf-8") as spill_file:
+            for line in spill_file:
+                row_hash, canonical = line.rstrip("\n").split("\t", 1)
+                rows = wanted.get(int(row_hash))
+                if rows is not None:
+                    rows.append(json.loads(canonical))
+
+    def compare_records(
+        self, query_id: str, records_by_endpoint: Dict[str, Iterable[Dict[str, Any]]]
+    ) -> ResultComparison:
+        """
+        compare the given record streams concurrently
+
+        Args:
+            query_id(str): the id of the compared query
+            records_by_endpoint(Dict[str, Iterable]): the record stream of each endpoint
+
+        Returns:
+            ResultComparison: the overlap and sample differences for each endpoint pair
+        """
+        comparison = ResultComparison(query_id=query_id)
+        max_workers = self.max_workers or max(1, len(records_by_endpoint))
+        with tempfile.TemporaryDirectory(prefix="snapquery-compare-") as spill_dir:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    endpoint_name: executor.submit(self.hash_records, endpoint_name, records, spill_dir)
+                    for endpoint_name, records in records_by_endpoint.items()
+                }
+                for endpoint_name, future in futures.items():
+                    comparison.results[endpoint_name] = future.result()
+            # the sample hashes of each endpoint over all pairs - one read per spill file
+            wanted: Dict[str, Dict[int, List[Dict[str, Any]]]] = {name: {} for name in comparison.results}
+            pair_samples = []
+            for result_a, result_b in itertools.combinations(comparison.results.values(), 2):
+                only_a = result_a.hashes - result_b.hashes
+                only_b = result_b.hashes - result_a.hashes
+                pair = PairComparison(
+                    endpoint_a=result_a.endpoint_name,
+                    endpoint_b=result_b.endpoint_name,
+                    common=len(result_a.hashes) - len(only_a),
+                    only_a=len(only_a),
+                    only_b=len(only_b),
+                )
+                # the smallest hashes are a deterministic pseudo random sample
+                sample_a = heapq.nsmallest(self.sample_size, only_a)
+                sample_b = heapq.nsmallest(self.sample_size, only_b)
+                for name, sample in [(pair.endpoint_a, sample_a), (pair.endpoint_b, sample_b)]:
+                    for row_hash in sample:
+                        wanted[name].setdefault(row_hash, [])
+                pair_samples.append((pair, sample_a, sample_b))
+                comparison.pairs.append(pair)
+            for name, result in comparison.results.items():
+                self.sample_rows(result, wanted[name])
+            for pair, sample_a, sample_b in pair_samples:
+                pair.samples_a = [row for row_hash in sample_a for row in wanted[pair.endpoint_a][row_hash]]
+                pair.samples_b = [row for row_hash in sample_b for row in wanted[pair.endpoint_b][row_hash]]
+        if self.debug:
+            print(comparison.to_json())
+        return comparison
+
+    def compare(
+        self,
+        named_query: NamedQuery,
+        endpoint_names: List[str],
+        params_dict: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        prefix_merger: QueryPrefixMerger = QueryPrefixMerger.SIMPLE_MERGER,
+    ) -> ResultComparison:
+        """
+        run the given named query on the given endpoints concurrently and compare the results
+
+        Args:
+            named_query(NamedQuery): the query to compare
+            endpoint_names(List[str]): the endpoints to compare - at least two
+            params_dict(Dict): the query parameters to apply (if any)
+            limit(int): the record limit for the results (if any)
+            prefix_merger: prefix merger to use
+
+        Returns:
+            ResultComparison: the comparison
+        """
+        if len(endpoint_names) < 2:
+            raise ValueError("a comparison needs at least two endpoints")
+        records_by_endpoint = {}
+        for endpoint_name in endpoint_names:
+            query_bundle = self.nqm.as_query_bundle(named_query, endpoint_name, limit, prefix_merger)
+            template = ParamTemplateCache.get_instance().get(query_bundle.query.query)
+            if template.has_params:
+                query_bundle.query.query = template.render(params_dict)
+            records_by_endpoint[endpoint_name] = query_bundle.iter_records(timeout=self.timeout)
+        comparison = self.compare_records(named_query.query_id, records_by_endpoint)
+        return comparison
@@ -5,11 +5,12 @@ Created on 2024-05-04
 
 @author: wf
 """
-import requests
 from tqdm import tqdm
-from typing import Optional
+from typing import Optional, Union
 
+from snapquery.bulk_import import BulkImporter
 from snapquery.github_access import GitHub
+from snapquery.local_repository import LocalRepository
 from snapquery.snapquery_core import NamedQuery, NamedQueryManager, NamedQuerySet
 
 class GitHubQueries:
@@ -29,10 +30,15 @@ class GitHubQueries:
         domain: Optional[str] = None,
         namespace: Optional[str] = None,
         target_graph: str = "wikidata",
+        github: Optional[Union[GitHub, LocalRepository]] = None,
         debug: bool = False
     ):
         """
         Constructor
+
+        Args:
+            github: Optional source of the repository files e.g. a LocalRepository
+                for a cloned checkout - default: the GitHub REST API
         """
         self.nqm = nqm
         self.owner = owner
@@ -50,7 +56,27 @@ class GitHubQueries:
             namespace=self.namespace,
             target_graph_name=target_graph,
         )
-        self.github = GitHub(owner=owner, repo=repo, branch=branch)
+        self.github = github or GitHub(owner=owner, repo=repo, branch=branch)
+        # blob SHAs of the extracted files by path
+        self.file_shas = {}
+
+    def create_named_query(self, file_info: dict, query_str: str) -> NamedQuery:
+        """
+        Create a named query for the given file information and content.
+        """
+        file_name = file_info.get("name")
+        name = file_name[: -len(self.extension)]
+        named_query = NamedQuery(
+            domain=self.named_query_set.domain,
+            namespace=self.named_query_set.namespace,
+            name=name,
+            url=file_info.get("download_url"),
+            title=name,
+            description=f"Imported from {self.owner}/{self.repo}",
+            comment=f"Path: {file_info.get('path')}",
+            sparql=query_str,
+        )
+        return named_query
 
     def extract_query(self, file_info: dict) -> Optional[NamedQuery]:
         """
@@ -60,69 +86,87 @@ class GitHubQueries:
         file_name = file_info.get("name")
 
         if file_name and file_name.endswith(self.extension):
-            file_url = file_info.get("download_url")
-            if file_url:
+            if file_info.get("download_url"):
                 try:
-                    response = requests.get(file_url)
-                    response.raise_for_status()
-                    query_str = response.text
-
-                    name = file_name[: -len(self.extension)]
-
-                    named_query = NamedQuery(
-                        domain=self.named_query_set.domain,
-                        namespace=self.named_query_set.namespace,
-                        name=name,
-                        url=file_url,
-                        title=name,
-                        description=f"Imported from {self.owner}/{self.repo}",
-                        comment=f"Path: {file_info.get('path')}",
-                        sparql=query_str,
-                    )
+                    query_str = self.github.download_file(file_info)
+                    named_query = self.create_named_query(file_info, query_str)
                 except Exception as e:
                     if self.debug:
                         print(f"Failed to extract query from {file_name}: {e}")
 
         return named_query
 
-    def extract_queries(self, limit: int = None, show_progress: bool = False):
+    def extract_queries(self, limit: int = None, show_progress: bool = False, only_changed: bool = False):
         """
         Extract queries from the GitHub repository recursively matching the configuration.
+
+        The file list is retrieved with a single git trees call and the files are downloaded concurrently.
+
+        Args:
+            limit(int): maximum number of queries to extract
+            show_progress(bool): if True show a progress bar
+            only_changed(bool): if True skip files whose blob SHA is unchanged since the last stored import
         """
         if self.debug:
             branch_info = f" branch '{self.branch}'" if self.branch else ""
             print(f"Fetching file list from {self.owner}/{self.repo}{branch_info} path: '{self.path}'...")
 
         file_list = self.github.list_files_recursive(self.path, suffix=self.extension)
+        file_list = [
+            file_info
+            for file_info in file_list
+            if file_info.get("name", "").endswith(self.extension) and file_info.get("download_url")
+        ]
+        if only_changed:
+            known_shas = self.github.load_import_state(self.path)
+            file_list = [
+                file_info for file_info in file_list if known_shas.get(file_info["path"]) != file_info.get("sha")
+            ]
+            if self.debug:
+                print(f"{len(file_list)} changed files since the last import")
+        if limit:
+            file_list = file_list[:limit]
+
+        pbar = tqdm(
+            total=len(file_list),
+            desc=f"Extracting {self.extension} files",
+            unit="file",
+            disable=not show_progress,
+        )
 
-        if show_progress:
-            iterator = tqdm(file_list, desc=f"Extracting {self.extension} files", unit="file")
-        else:
-            iterator = file_list
-
-        count = 0
-        for i, file_info in enumerate(iterator, start=1):
-            named_query = self.extract_query(file_info)
-            if named_query:
-                self.named_query_set.queries.append(named_query)
-                count += 1
+        def on_error(file_info: dict, ex: Exception):
+            if self.debug:
+                print(f"Failed to extract query from {file_info.get('name')}: {ex}")
 
-                if self.debug and not show_progress:
-                    if i % 80 == 0:
-                        print(f"{i}")
-                    print(".", end="", flush=True)
+        contents = self.github.download_all(file_list, on_error=on_error, on_done=lambda _file_info: pbar.update(1))
+        pbar.close()
 
-                if limit and count >= limit:
-                    break
+        for file_info in file_list:
+            query_str = contents.get(file_info["path"])
+            if query_str is None:
+                continue
+            named_query = self.create_named_query(file_info, query_str)
+            self.named_query_set.queries.append(named_query)
+            self.file_shas[file_info["path"]] = file_info.get("sha")
 
         if self.debug:
             print(f"\nFound {len(self.named_query_set.queries)} queries in {self.owner}/{self.repo}")
 
     def store_queries(self):
         """
-        Store the named queries into the database.
+        Store the named queries and their details into the database.
+        """
+        bulk_importer = BulkImporter(self.nqm, debug=self.debug)
+        bulk_importer.import_query_set(self.named_query_set)
+        self.save_import_state()
+
+    def save_import_state(self):
+        """
+        remember the blob SHAs of the extracted files for incremental imports
         """
-        self.nqm.store_named_query_list(self.named_query_set)
+        known_shas = self.github.load_import_state(self.path)
+        known_shas.update(self.file_shas)
+        self.github.save_import_state(known_shas, self.path)
 
     def save_to_json(self, file_path: str = "/tmp/scholia-queries.json"):
         """
@@ -146,6 +190,7 @@ class ScholiaQueries(GitHubQueries):
         branch: Optional[str] = None,
         domain: str = "scholia.toolforge.org",
         namespace: str = "named_queries",
+        github: Optional[Union[GitHub, LocalRepository]] = None,
         debug: bool = False
     ):
         super().__init__(
@@ -157,5 +202,6 @@ class ScholiaQueries(GitHubQueries):
             extension=".sparql",
             domain=domain,
             namespace=namespace,
+            github=github,
             debug=debug
         )
\ No newline at end of file
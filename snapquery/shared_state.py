@@ -0,0 +1,218 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from lodstorage.sql import SQLDB
+
+from snapquery.metrics import SnapQueryMetrics
+
+
+class ThreadLocalSQLDB(SQLDB):
+    """
+    a SQLDB with a connection per thread to a WAL mode database so that
+    the threads of several worker processes can read concurrently while
+    writers wait for the busy timeout instead of failing immediately
+    """
+
+    def __init__(self, dbname: str = SQLDB.RAM, timeout: float = 30.0, debug: bool = False):
+        """
+        constructor
+
+        Args:
+            dbname(str): the path of the database - a RAM database shares a single connection
+            timeout(float): the busy timeout in seconds to wait for locks held by other connections
+            debug(bool): if True switch on debug
+        """
+        self.local = threading.local()
+        self.shared_connection = None
+        self.timeout = timeout
+        super().__init__(dbname=dbname, check_same_thread=dbname != SQLDB.RAM, timeout=timeout, debug=debug)
+        if dbname != SQLDB.RAM:
+            # the journal mode is persistent in the database file
+            self.c.execute("PRAGMA journal_mode=WAL")
+
+    @property
+    def c(self) -> sqlite3.Connection:
+        """
+        the connection of the current thread - created on first use
+        """
+        if self.shared_connection is not None:
+            return self.shared_connection
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.connect()
+            self.local.connection = connection
+        return connection
+
+    @c.setter
+    def c(self, connection: sqlite3.Connection):
+        if self.dbname == SQLDB.RAM:
+            self.shared_connection = connection
+        else:
+            self.local.connection = connection
+            self.configure(connection)
+
+    def connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.dbname,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            timeout=self.timeout,
+        )
+        self.configure(connection)
+        return connection
+
+    def configure(self, connection: sqlite3.Connection):
+        # WAL is durable with synchronous NORMAL except for the last transactions on power loss
+        connection.execute("PRAGMA synchronous=NORMAL")
+
+    def close(self):
+        """
+        close the connection of the current thread - connections of other threads
+        are closed when their thread ends
+        """
+        if self.shared_connection is not None:
+            self.shared_connection.close()
+            self.shared_connection = None
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+
+class SharedCache:
+    """
+    a key value cache with expiry in a WAL mode SQLite database
+    shared by all worker processes on a node
+    """
+
+    def __init__(self, db_path: str, debug: bool = False):
+        self.sql_db = ThreadLocalSQLDB(db_path, debug=debug)
+        self.sql_db.execute("""CREATE TABLE IF NOT EXISTS SharedCache (
+  namespace TEXT NOT NULL,
+  key TEXT NOT NULL,
+  value TEXT,
+  expires REAL,
+  PRIMARY KEY (namespace, key)
+)""")
+        self.metrics = SnapQueryMetrics.get_instance()
+
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        """
+        get the cached value for the given key
+
+        Returns:
+            str: the value or None if it is missing or expired
+        """
+        records = self.sql_db.query(
+            "SELECT value FROM SharedCache WHERE namespace=? AND key=? AND (expires IS NULL OR expires>?)",
+            (namespace, key, time.time()),
+        )
+        value = records[0]["value"] if records else None
+        self.metrics.cache_lookup(namespace, hit=value is not None)
+        return value
+
+    def put(self, namespace: str, key: str, value: str, ttl: Optional[float] = None):
+        """
+        put the given value
+
+        Args:
+            ttl(float): the time to live in seconds - None for no expiry
+        """
+        expires = time.time() + ttl if ttl else None
+        with self.sql_db.c as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO SharedCache (namespace, key, value, expires) VALUES (?,?,?,?)",
+                (namespace, key, value, expires),
+            )
+
+    def clear(self, namespace: Optional[str] = None):
+        """
+        clear the given namespace or the whole cache
+        """
+        with self.sql_db.c as connection:
+            if namespace:
+                connection.execute("DELETE FROM SharedCache WHERE namespace=?", (namespace,))
+            else:
+                connection.execute("DELETE FROM SharedCache")
+
+    def purge(self) -> int:
+        """
+        remove the expired entries
+
+        Returns:
+            int: the number of removed entries
+        """
+        with self.sql_db.c as connection:
+            cursor = connection.execute("DELETE FROM SharedCache WHERE expires<=?", (time.time(),))
+        return cursor.rowcount
+
+
+class ChangeNotifier:
+    """
+    notify the worker processes sharing a database about changes
+    via version counters per topic e.g. "config" or "NamedQuery"
+    """
+
+    def __init__(self, sql_db: SQLDB, check_interval: float = 1.0):
+        """
+        constructor
+
+        Args:
+            sql_db(SQLDB): the shared database
+            check_interval(float): the minimum number of seconds between two checks for changes
+        """
+        self.sql_db = sql_db
+        self.check_interval = check_interval
+        self.sql_db.execute("CREATE TABLE IF NOT EXISTS StateVersion (topic TEXT PRIMARY KEY, version INTEGER)")
+        self.lock = threading.Lock()
+        self.seen = self.get_versions()
+        self.last_check = time.monotonic()
+
+    def get_versions(self) -> Dict[str, int]:
+        records = self.sql_db.query("SELECT topic, version FROM StateVersion")
+        versions = {record["topic"]: record["version"] for record in records}
+        return versions
+
+    def notify(self, topic: str):
+        """
+        notify the other workers about a change of the given topic
+        """
+        with self.sql_db.c as connection:
+            connection.execute(
+                """INSERT INTO StateVersion (topic, version) VALUES (?, 1)
+ON CONFLICT(topic) DO UPDATE SET version=version+1""",
+                (topic,),
+            )
+            version = connection.execute("SELECT version FROM StateVersion WHERE topic=?", (topic,)).fetchone()[0]
+        with self.lock:
+            # my own change is known already - unless other workers changed the topic
+            # since my last check, then the topic stays unseen so that get_changes reports it
+            if self.seen.get(topic, 0) == version - 1:
+                self.seen[topic] = version
+
+    def get_changes(self, force: bool = False) -> List[str]:
+        """
+        get the topics changed by other workers since the last check
+
+        Args:
+            force(bool): if True check even if the check interval has not passed yet
+
+        Returns:
+            List[str]: the changed topics
+        """
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.last_check < self.check_interval:
+                return []
+            self.last_check = now
+            versions = self.get_versions()
+            changed = [topic for topic, version in versions.items() if self.seen.get(topic) != version]
+            self.seen = versions
+        return changed
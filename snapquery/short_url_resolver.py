@@ -0,0 +1,303 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import datetime
+import os
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from basemkit.yamlable import lod_storable
+from lodstorage.sql import SQLDB, EntityInfo
+from ratelimit import limits, sleep_and_retry
+from tqdm import tqdm
+
+from snapquery.metrics import SnapQueryMetrics
+from snapquery.snapquery_core import NamedQueryManager
+from snapquery.wd_short_url import ShortUrl, Wikidata
+
+
+@lod_storable
+class ShortUrlResolution:
+    """
+    the resolution of a short URL e.g. https://w.wiki/6UCU
+    """
+
+    short_url: str  # primary key
+    url: Optional[str] = None  # the final URL the short URL redirects to
+    sparql: Optional[str] = None  # the SPARQL query extracted from the final URL
+    status_code: Optional[int] = None  # the last HTTP status code
+    error: Optional[str] = None
+    time_stamp: Optional[datetime.datetime] = None
+
+    def __post_init__(self):
+        if self.time_stamp is None:
+            self.time_stamp = datetime.datetime.now()
+
+    @property
+    def cacheable(self) -> bool:
+        """
+        True if this resolution is definitive and may be persisted
+        transient errors such as timeouts, 429 or 5xx responses are not
+        """
+        if self.sparql is not None:
+            return True
+        if self.status_code in (404, 410):
+            return True
+        return self.url is not None and self.error is None
+
+    @classmethod
+    def get_samples(cls) -> dict[str, "ShortUrlResolution"]:
+        """
+        get samples for ShortUrlResolution
+        """
+        samples = {
+            "short-urls": [
+                cls(
+                    short_url="https://w.wiki/6UCU",
+                    url="https://query.wikidata.org/#SELECT%20%3Fitem%20WHERE%20%7B%20%3Fitem%20wdt%3AP31%20wd%3AQ146%20%7D",
+                    sparql="SELECT ?item WHERE { ?item wdt:P31 wd:Q146 }",
+                    status_code=301,
+                    error="",
+                    time_stamp=datetime.datetime(2026, 10, 19),
+                )
+            ]
+        }
+        return samples
+
+
+class ShortUrlCache:
+    """
+    persistent SQLite cache of short URL resolutions
+    """
+
+    def __init__(self, db_path: Optional[str] = None, debug: bool = False):
+        """
+        Constructor
+
+        Args:
+            db_path(str): the path to the SQLite database - default: short_urls.db in the snapquery storage directory
+            debug(bool): if True show debug information
+        """
+        if db_path is None:
+            cache_dir = os.path.dirname(NamedQueryManager.get_cache_path())
+            db_path = os.path.join(cache_dir, "short_urls.db")
+        self.db_path = db_path
+        self.debug = debug
+        self.lock = threading.Lock()
+        self.sql_db = SQLDB(dbname=db_path, check_same_thread=False, debug=debug)
+        sample_records = NamedQueryManager.get_sample_records(ShortUrlResolution)
+        self.table_name = ShortUrlResolution.__name__
+        self.entity_info = EntityInfo(
+            sample_records,
+            name=self.table_name,
+            primaryKey="short_url",
+            debug=debug,
+            quiet=not debug,
+        )
+        table_records = self.sql_db.query(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+            (self.table_name,),
+        )
+        if not table_records:
+            self.sql_db.createTable4EntityInfo(entityInfo=self.entity_info)
+
+    def lookup_all(self, short_urls: List[str], chunk_size: int = 500) -> Dict[str, ShortUrlResolution]:
+        """
+        lookup the known resolutions of the given short urls
+
+        Args:
+            short_urls(List[str]): the short urls to lookup
+            chunk_size(int): the maximum number of urls per SQL query
+
+        Returns:
+            Dict[str, ShortUrlResolution]: the known resolutions by short url
+        """
+        resolutions = {}
+        with self.lock:
+            for i in range(0, len(short_urls), chunk_size):
+                chunk = short_urls[i : i + chunk_size]
+                placeholders = ",".join("?" for _ in chunk)
+                sql_query = f"SELECT * FROM {self.table_name} WHERE short_url IN ({placeholders})"
+                for record in self.sql_db.query(sql_query, tuple(chunk)):
+                    resolution = ShortUrlResolution(**record)
+                    resolutions[resolution.short_url] = resolution
+        metrics = SnapQueryMetrics.get_instance()
+        metrics.cache_lookup("short_url", hit=True, count=len(resolutions))
+        metrics.cache_lookup("short_url", hit=False, count=len(short_urls) - len(resolutions))
+        return resolutions
+
+    def get_probed(self, prefix: str) -> Dict[str, bool]:
+        """
+        get all known short urls with the given prefix
+
+        Args:
+            prefix(str): the url prefix e.g. https://w.wiki/
+
+        Returns:
+            Dict[str, bool]: True for hits with a SPARQL query, False for misses by short url
+        """
+        sql_query = f"SELECT short_url, sparql IS NOT NULL AS hit FROM {self.table_name} WHERE short_url LIKE ?"
+        with self.lock:
+            probed = {
+                record["short_url"]: bool(record["hit"]) for record in self.sql_db.query(sql_query, (f"{prefix}%",))
+            }
+        return probed
+
+    def lookup(self, short_url: str) -> Optional[ShortUrlResolution]:
+        """
+        lookup the known resolution of the given short url
+        """
+        resolution = self.lookup_all([short_url]).get(short_url)
+        return resolution
+
+    def store(self, resolutions: List[ShortUrlResolution]):
+        """
+        store the given resolutions in a single transaction
+        """
+        if resolutions:
+            lod = [asdict(resolution) for resolution in resolutions]
+            with self.lock:
+                self.sql_db.store(lod, self.entity_info, executeMany=True, fixNone=True, replace=True)
+
+
+class ShortUrlResolver(Wikidata):
+    """
+    resolve Wikidata short URLs concurrently with deduplication,
+    rate limiting and a persistent resolution cache
+    """
+
+    MAX_HOPS = 5
+
+    def __init__(
+        self,
+        cache: Optional[ShortUrlCache] = None,
+        with_cache: bool = True,
+        max_workers: int = 4,
+        timeout: float = 10.0,
+        scheme: str = "https",
+        netloc: str = "query.wikidata.org",
+        debug: bool = False,
+    ):
+        """
+        Constructor
+
+        Args:
+            cache(ShortUrlCache): the cache to use - default: the ShortUrlCache in the snapquery storage directory
+            with_cache(bool): if False do not use any cache
+            max_workers(int): maximum number of concurrent requests
+            timeout(float): the request timeout in seconds
+            scheme(str): the scheme of the final query URL
+            netloc(str): the network location of the final query URL
+            debug(bool): if True show debug information
+        """
+        super().__init__()
+        if cache is None and with_cache:
+            cache = ShortUrlCache(debug=debug)
+        self.cache = cache
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.scheme = scheme
+        self.netloc = netloc
+        self.debug = debug
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = self.user_agent
+
+    @sleep_and_retry
+    @limits(calls=Wikidata.CALLS_PER_MINUTE, period=Wikidata.ONE_MINUTE)
+    def head(self, url: str) -> requests.Response:
+        """
+        rate limited HEAD request that does not follow redirects
+        """
+        response = self.session.head(url, allow_redirects=False, timeout=self.timeout)
+        return response
+
+    def resolve_uncached(self, short_url: str) -> ShortUrlResolution:
+        """
+        resolve the given short url by following its redirects with HEAD requests
+        without fetching the final target
+
+        Args:
+            short_url(str): the short url to resolve
+
+        Returns:
+            ShortUrlResolution: the resolution
+        """
+        resolution = ShortUrlResolution(short_url=short_url)
+        short_netloc = urllib.parse.urlparse(short_url).netloc
+        url = short_url
+        try:
+            for _hop in range(self.MAX_HOPS):
+                response = self.head(url)
+                resolution.status_code = response.status_code
+                if not response.is_redirect:
+                    response.raise_for_status()
+                    break
+                url = urllib.parse.urljoin(url, response.headers["Location"])
+                # never fetch the body of the final redirect target
+                if urllib.parse.urlparse(url).netloc != short_netloc:
+                    break
+            resolution.url = url
+            short_url_parser = ShortUrl(short_url, scheme=self.scheme, netloc=self.netloc)
+            resolution.sparql = short_url_parser.sparql_from_url(url)
+        except Exception as ex:
+            resolution.error = str(ex)
+            if self.debug:
+                print(f"resolving {short_url} failed: {ex}")
+        return resolution
+
+    def resolve_all(self, short_urls: Iterable[str], show_progress: bool = False) -> Dict[str, ShortUrlResolution]:
+        """
+        resolve the given short urls
+
+        duplicates are resolved once, known urls are taken from the cache
+        and the remaining ones are resolved concurrently
+
+        Args:
+            short_urls(Iterable[str]): the short urls to resolve
+            show_progress(bool): if True show a tqdm progress bar
+
+        Returns:
+            Dict[str, ShortUrlResolution]: the resolutions by short url
+        """
+        unique_urls = list(dict.fromkeys(url for url in short_urls if url))
+        resolutions = self.cache.lookup_all(unique_urls) if self.cache else {}
+        todo = [url for url in unique_urls if url not in resolutions]
+        if self.debug:
+            print(f"{len(unique_urls)-len(todo)}/{len(unique_urls)} short urls already known")
+        new_resolutions = []
+        pbar = tqdm(total=len(todo), desc="Resolving short urls", disable=not show_progress or not todo)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.resolve_uncached, url) for url in todo]
+            for future in as_completed(futures):
+                resolution = future.result()
+                resolutions[resolution.short_url] = resolution
+                if self.cache and resolution.cacheable:
+                    new_resolutions.append(resolution)
+                    if len(new_resolutions) >= 50:
+                        self.cache.store(new_resolutions)
+                        new_resolutions = []
+                pbar.update(1)
+        pbar.close()
+        if self.cache:
+            self.cache.store(new_resolutions)
+        return resolutions
+
+    def resolve(self, short_url: str) -> ShortUrlResolution:
+        """
+        resolve a single short url
+
+        Args:
+            short_url(str): the short url to resolve
+
+        Returns:
+            ShortUrlResolution: the resolution
+        """
+        resolution = self.resolve_all([short_url])[short_url]
+        return resolution
@@ -0,0 +1,193 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import random
+from typing import List, Optional, Set
+
+from tqdm import tqdm
+
+from snapquery.query_namer import QueryNamer
+from snapquery.short_url_resolver import ShortUrlCache, ShortUrlResolver
+from snapquery.snapquery_core import NamedQuery, NamedQueryManager, NamedQuerySet
+from snapquery.wd_short_url import ShortIds
+
+
+class ShortUrlSampler:
+    """
+    sample random Wikidata short urls
+
+    probes random ids concurrently up to the permitted rate and keeps
+    every probed id as hit or miss in the persistent short url cache
+    so that misses are never probed again and new probes are drawn
+    from the unprobed id space only
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://w.wiki/",
+        max_postfix: str = "9pfu",
+        k: int = 4,
+        resolver: Optional[ShortUrlResolver] = None,
+        cache: Optional[ShortUrlCache] = None,
+        max_workers: int = 8,
+        debug: bool = False,
+    ):
+        """
+        Constructor
+
+        Args:
+            base_url(str): the url prefix of the short urls
+            max_postfix(str): the maximum ID to try
+            k(int): the length of the short ids
+            resolver(ShortUrlResolver): the resolver to use - default: a resolver on the given cache
+            cache(ShortUrlCache): the cache of probed ids - default: the ShortUrlCache in the snapquery storage directory
+            max_workers(int): maximum number of concurrent probes
+            debug(bool): if True show debug information
+        """
+        self.base_url = base_url
+        self.k = k
+        self.short_ids = ShortIds()
+        self.max_short_int = self.short_ids.id_to_int(max_postfix)
+        if resolver is None:
+            if cache is None:
+                cache = ShortUrlCache(debug=debug)
+            resolver = ShortUrlResolver(cache=cache, max_workers=max_workers, debug=debug)
+        self.resolver = resolver
+        self.debug = debug
+        # the probed short urls: True for hits, False for misses
+        self.probed = self.resolver.cache.get_probed(base_url) if self.resolver.cache else {}
+
+    @property
+    def hits(self) -> List[str]:
+        """
+        the known short urls with a SPARQL query
+        """
+        hits = [short_url for short_url, hit in self.probed.items() if hit]
+        return hits
+
+    def sample_unprobed(self, n: int) -> List[str]:
+        """
+        draw up to n distinct short urls from the unprobed id space
+
+        Args:
+            n(int): the number of short urls to draw
+
+        Returns:
+            List[str]: the short urls - fewer than n if the id space is exhausted
+        """
+        space_size = self.max_short_int + 1
+        n = min(n, space_size - len(self.probed))
+        sample: Set[str] = set()
+        # rejection sampling - the probed ids are a small part of the id space
+        attempts = 0
+        while len(sample) < n and attempts < n * 100:
+            attempts += 1
+            short_url = f"{self.base_url}{self.short_ids.int_to_id(random.randrange(space_size), self.k)}"
+            if short_url not in self.probed:
+                sample.add(short_url)
+        return list(sample)
+
+    def probe(self, short_urls: List[str], show_progress: bool = False) -> List[str]:
+        """
+        probe the given short urls concurrently
+
+        Args:
+            short_urls(List[str]): the short urls to probe
+            show_progress(bool): if True show a progress bar
+
+        Returns:
+            List[str]: the short urls with a SPARQL query
+        """
+        resolutions = self.resolver.resolve_all(short_urls, show_progress=show_progress)
+        hits = []
+        for short_url, resolution in resolutions.items():
+            # transient errors are not remembered and may be probed again
+            if resolution.cacheable:
+                self.probed[short_url] = resolution.sparql is not None
+            if resolution.sparql:
+                hits.append(short_url)
+        return hits
+
+    def get_query_set(
+        self,
+        namespace: str,
+        count: int,
+        nqm: Optional[NamedQueryManager] = None,
+        namer: Optional[QueryNamer] = None,
+        with_known: bool = True,
+        max_probes: Optional[int] = None,
+        with_progress: bool = False,
+    ) -> NamedQuerySet:
+        """
+        get a query set of random short url queries
+
+        Args:
+            namespace(str): the namespace of the query set
+            count(int): the number of queries
+            nqm(NamedQueryManager): optional NamedQueryManager to avoid already stored urls and names
+            namer(QueryNamer): optional batch namer e.g. with an LLM backend - queries it can not name are skipped
+            with_known(bool): if True use known hits from earlier runs first
+            max_probes(int): the maximum number of new probes - default: count * 15
+            with_progress(bool): if True show progress
+
+        Returns:
+            NamedQuerySet: the query set
+        """
+        domain = "wikidata.org"
+        if nqm is None:
+            unique_urls, unique_names = set(), set()
+        else:
+            unique_urls, unique_names = nqm.get_unique_sets(namespace=namespace, domain=domain)
+        nq_set = NamedQuerySet(domain=domain, namespace=namespace, target_graph_name="wikidata")
+        if max_probes is None:
+            # heuristic factor for probability that a short url points to a wikidata entry
+            max_probes = count * 15
+        candidates = []
+        if with_known:
+            candidates = [short_url for short_url in self.hits if short_url not in unique_urls]
+            random.shuffle(candidates)
+        pbar = tqdm(total=count, disable=not with_progress, desc="Fetching queries")
+        while len(nq_set.queries) < count:
+            needed = count - len(nq_set.queries)
+            if not candidates:
+                if max_probes <= 0:
+                    break
+                # about every 14th id is a query - probe enough ids for the missing ones
+                batch = self.sample_unprobed(min(max_probes, max(needed * 15, self.resolver.max_workers)))
+                if not batch:
+                    break
+                max_probes -= len(batch)
+                candidates = [short_url for short_url in self.probe(batch) if short_url not in unique_urls]
+                if self.debug:
+                    print(f"{len(candidates)} hits in {len(batch)} probes")
+                continue
+            pending = [self.as_named_query(candidates.pop(), nq_set) for _ in range(min(needed, len(candidates)))]
+            if namer:
+                pending = namer.name_queries(pending, unique_names)
+            for nq in pending:
+                nq_set.queries.append(nq)
+                unique_urls.add(nq.url)
+                unique_names.add(nq.name)
+                if self.debug:
+                    print(nq)
+            pbar.update(len(pending))
+        pbar.close()
+        return nq_set
+
+    def as_named_query(self, short_url: str, nq_set: NamedQuerySet) -> NamedQuery:
+        """
+        create a named query for the given hit named by its short id
+        """
+        resolution = self.resolver.resolve(short_url)
+        postfix = short_url[len(self.base_url) :]
+        nq = NamedQuery(
+            domain=nq_set.domain,
+            name=postfix,
+            namespace=nq_set.namespace,
+            url=short_url,
+            sparql=resolution.sparql,
+        )
+        return nq
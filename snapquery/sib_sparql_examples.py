@@ -9,15 +9,107 @@ Exports to YAML (user request).
 Modified: 2025-12-02 by wf
 """
 
+import hashlib
+import json
 import os
-from typing import Any, Dict, List, Optional, Set
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 import rdflib
 from tqdm import tqdm
 
+from snapquery.bulk_import import BulkImporter
 from snapquery.github_access import GitHub
+from snapquery.local_repository import LocalRepository
 from snapquery.snapquery_core import NamedQuery, NamedQueryManager, NamedQuerySet
 
+SHACL_NAMESPACE = "http://www.w3.org/ns/shacl#"
+
+SHACL_SELECT_QUERY = """
+PREFIX sh: <http://www.w3.org/ns/shacl#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX schema: <http://schema.org/>
+
+SELECT ?s ?query ?comment ?label WHERE {
+  ?s a sh:SPARQLSelectExecutable ;
+     sh:select ?query .
+  OPTIONAL { ?s rdfs:comment ?comment }
+  OPTIONAL { ?s rdfs:label ?label }
+  OPTIONAL { ?s schema:name ?label }  # Fallback label
+}
+"""
+
+
+def parse_ttl_records(ttl_job: Tuple[str, str, str, bool]) -> List[Dict[str, str]]:
+    """
+    Parse a SIB TTL file to named query records using rdflib + SHACL shapes.
+
+    module level function so that it can be used in a process pool
+
+    Args:
+        ttl_job: tuple of TTL content, TTL path, GitHub html url and debug flag
+
+    Returns:
+        List[Dict[str, str]]: the name, url, title, description and sparql of each query
+    """
+    ttl_content, ttl_path, html_url, debug = ttl_job
+    records: List[Dict[str, str]] = []
+    # cheap streaming scan - files not using the SHACL namespace need no rdflib parsing
+    # the prefix name is arbitrary but the namespace IRI has to be spelled out
+    if SHACL_NAMESPACE not in ttl_content:
+        if debug:
+            print(f"No SHACL queries in {ttl_path}")
+        return records
+    try:
+        g = rdflib.Graph()
+        g.parse(data=ttl_content, format="turtle")
+
+        # path e.g. "examples/Bgee/001.ttl" → endpoint_path="Bgee/001"
+        endpoint_path = ttl_path.replace("examples/", "").rstrip(".ttl")
+
+        # Fixed SPARQL: direct sh:select on sh:SPARQLSelectExecutable (matches sample)
+        rows = list(g.query(SHACL_SELECT_QUERY))
+        if not rows:
+            if debug:
+                print(f"No SHACL queries in {ttl_path}")
+            return records
+
+        seen_queries: Set[str] = set()
+        fallback_title = endpoint_path.split("/")[-1].replace("_", " ").title()
+
+        for i, row in enumerate(rows):
+            query_str = str(row.query)
+            if not query_str or query_str in seen_queries:
+                continue
+            seen_queries.add(query_str)
+
+            comment = str(row.comment) if row.comment else ""
+            label = str(row.label) if row.label else fallback_title
+
+            title = label
+            description = comment or f"SIB example: {endpoint_path} ({title})"
+
+            # Name: "Bgee:001" → slugify to "bgee-001"
+            name_suffix = f"_{i+1}" if len(rows) > 1 else ""
+            sub_name = endpoint_path.replace("/", ":") + name_suffix
+            name = sub_name  # No duplicate prefix!
+
+            records.append(
+                {
+                    "name": name,
+                    "url": html_url,  # GitHub source
+                    "title": title,
+                    "description": description,
+                    "sparql": query_str,
+                }
+            )
+
+    except Exception as e:
+        if debug:
+            print(f"Error parsing {ttl_path}: {e}")
+    return records
+
 
 class SibSparqlExamples:
     """
@@ -27,9 +119,25 @@ class SibSparqlExamples:
     def __init__(
         self,
         nqm: NamedQueryManager,
-        github: Optional[GitHub] = None,
+        github: Optional[Union[GitHub, LocalRepository]] = None,
+        cache_dir: Optional[str] = None,
+        with_parse_cache: bool = True,
+        max_workers: Optional[int] = None,
+        min_parallel: int = 50,
         debug: bool = False,
     ):
+        """
+        Constructor
+
+        Args:
+            nqm: the NamedQueryManager to store the queries with
+            github: Optional source of the TTL files - default: the GitHub REST API
+            cache_dir: directory of the content hash parse cache (default: ~/.solutions/snapquery/sib)
+            with_parse_cache: if False always parse all TTL files
+            max_workers: number of processes for parsing - default: cpu count
+            min_parallel: minimum number of TTL files to parse for which a process pool is used
+            debug: if True show debug information
+        """
         self.nqm = nqm
         self.github = github or GitHub(owner="sib-swiss", repo="sparql-examples", token=os.getenv("GITHUB_TOKEN"))
         self.named_query_set = NamedQuerySet(
@@ -40,6 +148,13 @@ class SibSparqlExamples:
         self.debug = debug
         self.cache: Dict[str, str] = {}  # TTL content cache
         self.stored_queries: List[NamedQuery] = []
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_parallel = min_parallel
+        self.parse_cache_path = None
+        if with_parse_cache:
+            if cache_dir is None:
+                cache_dir = Path.home() / ".solutions" / "snapquery" / "sib"
+            self.parse_cache_path = Path(cache_dir) / "ttl_parse_cache.json"
 
     def collect_ttl_items(self, path: str = "examples") -> List[Dict[str, Any]]:
         """Recursively collect all .ttl file items under given path using GitHub client."""
@@ -54,6 +169,13 @@ class SibSparqlExamples:
         self.cache[download_url] = content
         return content
 
+    def get_item_content(self, item: Dict[str, Any]) -> str:
+        """Fetch TTL content of the given file item (blob cached by sha), with cache."""
+        download_url = item["download_url"]
+        if download_url not in self.cache:
+            self.cache[download_url] = self.github.download_file(item)
+        return self.cache[download_url]
+
     def get_html_url(self, file_path: str) -> str:
         """
         Construct GitHub HTML URL for a file path.
@@ -72,98 +194,117 @@ class SibSparqlExamples:
         Parse TTL → NamedQuery using rdflib + SHACL shapes.
         Matches your Bgee sample exactly.
         """
-        parsed_queries: List[NamedQuery] = []
-        try:
-            g = rdflib.Graph()
-            g.parse(data=ttl_content, format="turtle")
-
-            # path e.g. "examples/Bgee/001.ttl" → endpoint_path="Bgee/001"
-            endpoint_path = ttl_path.replace("examples/", "").rstrip(".ttl")
-            html_url = self.get_html_url(ttl_path)
-
-            # Fixed SPARQL: direct sh:select on sh:SPARQLSelectExecutable (matches sample)
-            qtext = """
-            PREFIX sh: <http://www.w3.org/ns/shacl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            PREFIX schema: <http://schema.org/>
-
-            SELECT ?s ?query ?comment ?label WHERE {
-              ?s a sh:SPARQLSelectExecutable ;
-                 sh:select ?query .
-              OPTIONAL { ?s rdfs:comment ?comment }
-              OPTIONAL { ?s rdfs:label ?label }
-              OPTIONAL { ?s schema:name ?label }  # Fallback label
-            }
-            """
-
-            rows = list(g.query(qtext))
-            if not rows:
-                if self.debug:
-                    print(f"No SHACL queries in {ttl_path}")
-                return []
-
-            seen_queries: Set[str] = set()
-            fallback_title = endpoint_path.split("/")[-1].replace("_", " ").title()
-
-            for i, row in enumerate(rows):
-                query_str = str(row.query)
-                if not query_str or query_str in seen_queries:
-                    continue
-                seen_queries.add(query_str)
-
-                comment = str(row.comment) if row.comment else ""
-                label = str(row.label) if row.label else fallback_title
-
-                title = label
-                description = comment or f"SIB example: {endpoint_path} ({title})"
-
-                # Name: "Bgee:001" → slugify to "bgee-001"
-                name_suffix = f"_{i+1}" if len(rows) > 1 else ""
-                sub_name = endpoint_path.replace("/", ":") + name_suffix
-                name = sub_name  # No duplicate prefix!
-
-                base_url = f"https://sparql-examples.sib.swiss/{endpoint_path.replace('/', '/')}{name_suffix}"
-
-                nq = NamedQuery(
-                    domain=self.named_query_set.domain,
-                    namespace=self.named_query_set.namespace,
-                    name=name,
-                    url=html_url,  # GitHub source
-                    title=title,
-                    description=description,
-                    sparql=query_str,
-                )
-                parsed_queries.append(nq)
-
-        except Exception as e:
-            if self.debug:
-                print(f"Error parsing {ttl_path}: {e}")
+        html_url = self.get_html_url(ttl_path)
+        records = parse_ttl_records((ttl_content, ttl_path, html_url, self.debug))
+        parsed_queries = [self.as_named_query(record) for record in records]
         return parsed_queries
 
+    def as_named_query(self, record: Dict[str, str]) -> NamedQuery:
+        """
+        create a NamedQuery in my namespace from a parsed TTL record
+        """
+        nq = NamedQuery(
+            domain=self.named_query_set.domain,
+            namespace=self.named_query_set.namespace,
+            **record,
+        )
+        return nq
+
+    def get_parse_key(self, ttl_content: str, ttl_path: str) -> str:
+        """
+        get the content hash key of the parse cache for the given TTL file
+        """
+        key = hashlib.sha256(f"{ttl_path}\n{ttl_content}".encode("utf-8")).hexdigest()
+        return key
+
+    def load_parse_cache(self) -> Dict[str, List[Dict[str, str]]]:
+        """
+        load the parsed query records by content hash
+        """
+        if self.parse_cache_path and self.parse_cache_path.exists():
+            try:
+                return json.loads(self.parse_cache_path.read_text())
+            except (json.JSONDecodeError, OSError):
+                pass
+        return {}
+
+    def save_parse_cache(self, parse_cache: Dict[str, List[Dict[str, str]]]):
+        """
+        save the parsed query records by content hash
+        """
+        if self.parse_cache_path:
+            self.parse_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.parse_cache_path.write_text(json.dumps(parse_cache))
+
+    def parse_all(self, jobs: List[Tuple[str, str, str, bool]]) -> List[List[Dict[str, str]]]:
+        """
+        parse the given TTL jobs - in a process pool for larger numbers of files
+        """
+        if len(jobs) < self.min_parallel or self.max_workers < 2:
+            results = [parse_ttl_records(job) for job in jobs]
+        else:
+            chunksize = max(1, len(jobs) // (self.max_workers * 4))
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(parse_ttl_records, jobs, chunksize=chunksize))
+        return results
+
     def extract_queries(
         self, limit: Optional[int] = None, debug_print: bool = False, show_progress: bool = False
     ) -> List[NamedQuery]:
         """
         Main: Fetch/parse/store all TTL → NamedQuery/DB/Set.
+
+        Pipeline: concurrent download, content hash cache lookup,
+        parallel parsing of the changed files and a single bulk store.
         """
         self.stored_queries.clear()
         ttl_items = self.collect_ttl_items("examples")
         if limit:
             ttl_items = ttl_items[:limit]
 
-        iterator = ttl_items
-        if show_progress:
-            iterator = tqdm(ttl_items)
-
-        for item in iterator:
-            if debug_print:
-                print(f"Processing {item['path']}...")
-            content = self.get_ttl_content(item["download_url"])
-            nqs = self.parse_ttl_to_namedqueries(content, item["path"])
-            for nq in nqs:
-                self.nqm.add_and_store(nq)  # FIXED: stores to DB + QueryDetails
+        pbar = tqdm(total=len(ttl_items), desc="Fetching TTL files", disable=not show_progress)
+
+        def on_error(item: Dict[str, Any], ex: Exception):
+            if self.debug:
+                print(f"Error fetching {item['path']}: {ex}")
+
+        contents = self.github.download_all(ttl_items, on_error=on_error, on_done=lambda _item: pbar.update(1))
+        pbar.close()
+
+        parse_cache = self.load_parse_cache()
+        keys = {}
+        jobs = []
+        for item in ttl_items:
+            content = contents.get(item["path"])
+            if content is None:
+                continue
+            self.cache[item["download_url"]] = content
+            key = self.get_parse_key(content, item["path"])
+            keys[item["path"]] = key
+            if key not in parse_cache:
+                if debug_print:
+                    print(f"Processing {item['path']}...")
+                jobs.append((content, item["path"], self.get_html_url(item["path"]), self.debug))
+        if self.debug:
+            print(f"parsing {len(jobs)} of {len(keys)} TTL files - others unchanged")
+        for job, records in zip(jobs, self.parse_all(jobs)):
+            parse_cache[self.get_parse_key(job[0], job[1])] = records
+        if not limit:
+            # forget the entries of changed and removed files
+            parse_cache = {key: parse_cache[key] for key in keys.values()}
+        self.save_parse_cache(parse_cache)
+
+        for item in ttl_items:
+            key = keys.get(item["path"])
+            if key is None:
+                continue
+            for record in parse_cache[key]:
+                nq = self.as_named_query(record)
                 self.named_query_set.add(nq)  # FIXED: add (not add_query)
                 self.stored_queries.append(nq)
+        # stores to DB + QueryDetails in batched transactions
+        bulk_importer = BulkImporter(self.nqm, debug=self.debug)
+        bulk_importer.import_queries(self.stored_queries, name=self.named_query_set.namespace)
         return self.stored_queries
 
     def save_to_yaml(self, filepath: str) -> Dict[str, Any]:
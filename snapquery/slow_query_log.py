@@ -0,0 +1,145 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import datetime
+import logging
+from typing import Dict, Optional
+
+from basemkit.yamlable import lod_storable
+
+from snapquery.sparql_analyzer import SparqlAnalyzer
+
+logger = logging.getLogger(__name__)
+
+
+@lod_storable
+class SlowQuery:
+    """
+    a query execution that exceeded the slow query threshold of its endpoint
+    with a structural summary of the executed SPARQL - the stage timings
+    are available via the QueryStats with the same stats_id
+    """
+
+    stats_id: str  # foreign key and primary key
+    query_id: str  # foreign key
+    endpoint_name: str  # foreign key
+    time_stamp: datetime.datetime
+    duration: Optional[float] = None  # duration in seconds
+    threshold: Optional[float] = None  # the threshold in seconds that has been exceeded
+    error_category: Optional[str] = None  # e.g. Timeout
+    sparql: Optional[str] = None  # the final SPARQL as sent to the endpoint
+    # structural summary - see SparqlAnalyzer.get_structure
+    triple_patterns: Optional[int] = None
+    optionals: Optional[int] = None
+    unions: Optional[int] = None
+    property_paths: Optional[int] = None
+    services: Optional[int] = None
+    subqueries: Optional[int] = None
+    filters: Optional[int] = None
+    group_by: Optional[int] = None
+    order_by: Optional[int] = None
+    parse_error: Optional[str] = None
+
+    @classmethod
+    def get_samples(cls) -> dict[str, "SlowQuery"]:
+        """
+        get samples for SlowQuery
+        """
+        samples = {
+            "snapquery-examples": [
+                cls(
+                    stats_id="9a3b5f0e-5d7c-4f43-9d6c-2f1f4c7d8e21",
+                    query_id="horses--snapquery-examples@wikidata.org",
+                    endpoint_name="wikidata",
+                    time_stamp=datetime.datetime(2026, 10, 19, 12, 0, 0),
+                    duration=61.5,
+                    threshold=10.0,
+                    error_category="Timeout",
+                    sparql="SELECT ?horse WHERE { ?horse wdt:P31/wdt:P279* wd:Q726 . }",
+                    triple_patterns=1,
+                    optionals=0,
+                    unions=0,
+                    property_paths=1,
+                    services=0,
+                    subqueries=0,
+                    filters=0,
+                    group_by=0,
+                    order_by=0,
+                    parse_error="",
+                )
+            ]
+        }
+        return samples
+
+    def analyze(self):
+        """
+        derive my structural summary from my sparql
+        """
+        try:
+            structure = SparqlAnalyzer.get_structure(self.sparql)
+            for key, count in structure.items():
+                setattr(self, key, count)
+        except Exception as ex:
+            logger.debug(f"structural analysis of {self.query_id} failed: {ex}")
+            self.parse_error = str(ex)
+
+
+class SlowQueryLog:
+    """
+    log query executions that exceed a per endpoint threshold
+    """
+
+    def __init__(self, thresholds: Dict[str, float] = None, default_threshold: float = 10.0):
+        """
+        constructor
+
+        Args:
+            thresholds(Dict[str, float]): the thresholds in seconds by endpoint name
+            default_threshold(float): the threshold in seconds for all other endpoints
+        """
+        self.thresholds = thresholds if thresholds is not None else {}
+        self.default_threshold = default_threshold
+
+    def get_threshold(self, endpoint_name: str) -> float:
+        threshold = self.thresholds.get(endpoint_name, self.default_threshold)
+        return threshold
+
+    def check(self, stats, sparql: Optional[str] = None) -> Optional[SlowQuery]:
+        """
+        check the given QueryStats against the threshold of its endpoint
+
+        Args:
+            stats(QueryStats): the statistics of a query execution
+            sparql(str): the executed SPARQL - default: the sparql recorded with the stats
+
+        Returns:
+            SlowQuery: the analyzed slow query or None if the execution was not slow
+        """
+        duration = stats.duration
+        if stats.error_msg:
+            if stats.error_category != "Timeout":
+                return None
+            # timeouts are always slow - failed queries have no duration so use the time spent so far
+            stage_times = [seconds for seconds in stats.get_stage_times().values() if seconds]
+            duration = sum(stage_times) if stage_times else None
+        elif duration is None:
+            return None
+        threshold = self.get_threshold(stats.endpoint_name)
+        if not stats.error_msg and duration < threshold:
+            return None
+        slow_query = SlowQuery(
+            stats_id=stats.stats_id,
+            query_id=stats.query_id,
+            endpoint_name=stats.endpoint_name,
+            time_stamp=stats.time_stamp,
+            duration=duration,
+            threshold=threshold,
+            error_category=stats.error_category,
+            sparql=sparql if sparql is not None else getattr(stats, "sparql", None),
+        )
+        if slow_query.sparql:
+            slow_query.analyze()
+        return slow_query
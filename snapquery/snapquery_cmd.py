@@ -9,13 +9,16 @@ import sys
 from argparse import ArgumentParser
 from typing import Optional
 
-from lodstorage.params import Params, StoreDictKeyPair
+from lodstorage.params import StoreDictKeyPair
 from lodstorage.query import Format
 from ngwidgets.cmd import WebserverCmd
 from tqdm import tqdm
 
+from snapquery.endpoint_benchmark import EndpointBenchmark
 from snapquery.execution import Execution
+from snapquery.param_template import ParamTemplateCache
 from snapquery.query_set_tool import QuerySetTool
+from snapquery.result_compare import ResultComparator
 from snapquery.snapquery_core import NamedQueryManager, QueryName, QueryPrefixMerger
 from snapquery.snapquery_webserver import SnapQueryWebServer
 
@@ -137,6 +140,70 @@ class SnapQueryCmd(WebserverCmd):
             choices=[merger.name for merger in QueryPrefixMerger],
             help="query prefix merger to use",
         )
+        parser.add_argument(
+            "--compare",
+            nargs="+",
+            metavar="ENDPOINT",
+            help="compare the result rows of the query on the given endpoints",
+        )
+        parser.add_argument(
+            "--snapshot",
+            action="store_true",
+            help="keep content addressed snapshots of the query results for change detection",
+        )
+        parser.add_argument(
+            "--benchmark",
+            nargs="+",
+            metavar="ENDPOINT",
+            help="benchmark the queries of --domain/--namespace on the given endpoints",
+        )
+        parser.add_argument("--warmup", type=int, default=1, help="untimed runs per query for --benchmark")
+        parser.add_argument("--repetitions", type=int, default=5, help="timed runs per query for --benchmark")
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            nargs="+",
+            default=[1],
+            help="numbers of concurrent clients for --benchmark",
+        )
+        parser.add_argument(
+            "--cooldown",
+            type=float,
+            default=1.0,
+            help="pause in seconds between the benchmarked queries",
+        )
+        parser.add_argument(
+            "--order",
+            choices=["shortest", "longest"],
+            default=None,
+            help="order the queries for --testQueries by their predicted duration",
+        )
+        parser.add_argument(
+            "--adaptiveTimeout",
+            action="store_true",
+            help="derive the request timeouts for --testQueries from the predicted durations",
+        )
+        parser.add_argument(
+            "--catalogMemory",
+            action="store_true",
+            help="show the memory used by the in memory catalog of the named queries",
+        )
+        parser.add_argument(
+            "--duplicates",
+            action="store_true",
+            help="list the groups of named queries with the same normalized query fingerprint",
+        )
+        parser.add_argument(
+            "--notifyConfigChange",
+            action="store_true",
+            help="let the running webserver workers reload the endpoints, meta queries and graphs",
+        )
+        parser.add_argument(
+            "--resultCacheTtl",
+            type=float,
+            default=0.0,
+            help="seconds to cache the API query results for all webserver workers - 0 for no caching",
+        )
         return parser
 
     def cmd_parse(self, argv: Optional[list] = None):
@@ -178,8 +245,11 @@ class SnapQueryCmd(WebserverCmd):
         endpoint_iter = tqdm(endpoint_names, desc="Testing endpoints") if self.args.progress else endpoint_names
         for endpoint_name in endpoint_iter:
             # Inner loop: queries
+            endpoint_queries = execution.order_queries(queries, endpoint_name, self.args.order)
             query_iter = (
-                tqdm(queries, desc=f"Queries for {endpoint_name}", leave=False) if self.args.progress else queries
+                tqdm(endpoint_queries, desc=f"Queries for {endpoint_name}", leave=False)
+                if self.args.progress
+                else endpoint_queries
             )
             for i, nq in enumerate(query_iter, start=1):
                 execution.execute(
@@ -188,8 +258,31 @@ class SnapQueryCmd(WebserverCmd):
                     context=self.args.context,
                     title=f"{endpoint_name}::query {i:3}/{len(queries)}",
                     prefix_merger=QueryPrefixMerger.get_by_name(self.args.prefix_merger),
+                    with_snapshot=self.args.snapshot,
+                    adaptive_timeout=self.args.adaptiveTimeout,
                 )
 
+    def handle_benchmark(self):
+        """
+        Handle the --benchmark option by benchmarking the queries on the given endpoints
+        and printing the comparison report
+        """
+        queries = self.nqm.get_all_queries(domain=self.args.domain, namespace=self.args.namespace)
+        benchmark = EndpointBenchmark(
+            self.nqm,
+            endpoint_names=self.args.benchmark,
+            warmup=self.args.warmup,
+            repetitions=self.args.repetitions,
+            concurrency_levels=self.args.concurrency,
+            cooldown=self.args.cooldown,
+            limit=self.args.limit,
+            prefix_merger=QueryPrefixMerger.get_by_name(self.args.prefix_merger),
+            debug=self.args.debug,
+        )
+        results = benchmark.run(queries, with_progress=self.args.progress)
+        tablefmt = str(self.args.format) if self.args.format else "github"
+        print(EndpointBenchmark.get_report(results, tablefmt=tablefmt))
+
     def handle_test_queries_no_progress_version(self):
         if self.args.endpointName:
             endpoint_names = [self.args.endpointName]
@@ -206,6 +299,7 @@ class SnapQueryCmd(WebserverCmd):
                     context=self.args.context,
                     title=f"query {i:3}/{len(queries)}::{endpoint_name}",
                     prefix_merger=QueryPrefixMerger.get_by_name(self.args.prefix_merger),
+                    with_snapshot=self.args.snapshot,
                 )
 
     def handle_args(self, args) -> bool:
@@ -232,6 +326,18 @@ class SnapQueryCmd(WebserverCmd):
             for name, query in meta_qm.queriesByName.items():
                 print(f"{name}:{query.title}")
             handled = True
+        elif self.args.catalogMemory:
+            report = self.nqm.get_catalog().get_memory_report()
+            for key, value in report.items():
+                print(f"{key}:{value:.0f}" if isinstance(value, float) else f"{key}:{value}")
+            handled = True
+        elif self.args.duplicates:
+            for record in self.nqm.get_duplicates():
+                print(f"{record['fingerprint'][:12]}:{record['count']}:{record['query_ids']}")
+            handled = True
+        elif self.args.notifyConfigChange:
+            self.nqm.notify_config_change()
+            handled = True
         elif self.args.listNamespaces:
             namespaces = self.nqm.get_namespaces()
             for namespace, count in namespaces.items():
@@ -240,6 +346,9 @@ class SnapQueryCmd(WebserverCmd):
         elif self.args.testQueries:
             self.handle_test_queries()
             handled = True
+        elif self.args.benchmark:
+            self.handle_benchmark()
+            handled = True
         elif self.args.queryName is not None or self.args.query_id is not None:
             if self.args.query_id is not None:
                 query_name = QueryName.from_query_id(self.args.query_id)
@@ -249,18 +358,21 @@ class SnapQueryCmd(WebserverCmd):
                     namespace=self.args.namespace,
                     domain=self.args.domain,
                 )
+            if self.args.compare:
+                self.handle_compare(query_name)
+                return True
             endpoint_name = self.args.endpointName
             r_format = self.args.format
             limit = self.args.limit
             qb = nqm.get_query(query_name=query_name, endpoint_name=endpoint_name, limit=limit)
             query = qb.query
-            params = Params(query.query)
-            if params.has_params:
+            template = ParamTemplateCache.get_instance().get(query.query)
+            if template.has_params:
                 if not self.args.params:
                     raise Exception(f"{query.name} needs parameters")
                 else:
-                    params.set(self.args.params)
-                    query.query = params.apply_parameters()
+                    nqm.check_params(qb, self.args.params)
+                    query.query = template.render(self.args.params)
             if r_format == Format.raw:
                 formatted_result = qb.raw_query()
             else:
@@ -272,6 +384,24 @@ class SnapQueryCmd(WebserverCmd):
             handled = True
         return handled
 
+    def handle_compare(self, query_name: QueryName):
+        """
+        compare the result rows of the given query on the --compare endpoints
+
+        Args:
+            query_name (QueryName): the query to compare
+        """
+        nq = self.nqm.lookup(query_name=query_name)
+        comparator = ResultComparator(self.nqm, debug=self.debug)
+        comparison = comparator.compare(
+            nq,
+            endpoint_names=self.args.compare,
+            params_dict=self.args.params,
+            limit=self.args.limit,
+            prefix_merger=QueryPrefixMerger.get_by_name(self.args.prefix_merger),
+        )
+        print(comparison.to_json())
+
     def handle_import(self, json_file: str):
         """
         Handle the import of named queries from a JSON file.
@@ -4,30 +4,47 @@ Created on 2024-05-03
 @author: wf
 """
 
+import csv
 import datetime
+import hashlib
+import io
 import json
 import logging
+import math
 import os
 import re
+import time
 import urllib.parse
 import uuid
+from contextlib import contextmanager
 from dataclasses import asdict, dataclass, field, fields, is_dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type, Union
+from typing import Any, Dict, Generator, List, Optional, Tuple, Type, Union
 
 import requests
 from basemkit.yamlable import lod_storable
+from lodstorage.lod import LOD
 from lodstorage.lod_csv import CSV
-from lodstorage.params import Params
 from lodstorage.query import Endpoint, EndpointManager, Format, Query, QueryManager
 from lodstorage.sparql import SPARQL
 from lodstorage.sql import SQLDB, EntityInfo
 from ngwidgets.widgets import Link
 from slugify import slugify
 
+from snapquery.duration_predictor import DurationPrediction, DurationPredictor
+from snapquery.endpoint_benchmark_result import EndpointBenchmarkResult
 from snapquery.error_filter import ErrorFilter
 from snapquery.graph import Graph, GraphManager
+from snapquery.metrics import SnapQueryMetrics
+from snapquery.named_query_catalog import NamedQueryCatalog
+from snapquery.param_template import ParamTemplate, ParamTemplateCache
 from snapquery.prefix_merger import QueryPrefixMerger
+from snapquery.query_fingerprint import QueryFingerprint
+from snapquery.query_name_index import QueryNameIndex
+from snapquery.query_timing import QueryTiming
+from snapquery.shared_state import ChangeNotifier, SharedCache, ThreadLocalSQLDB
+from snapquery.slow_query_log import SlowQuery, SlowQueryLog
+from snapquery.snapshot_store import SnapshotStore
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +67,22 @@ class QueryStats:
     error_category: Optional[str] = None
 
     filtered_msg: Optional[str] = None
+    # content hash of the result snapshot (if any) - see SnapshotStore
+    snapshot_hash: Optional[str] = None
+    # the monotonic per stage timings in seconds - see QueryTiming
+    stages = ["prepare", "queue", "connect", "first_byte", "transfer", "parse", "format", "snapshot", "store"]
+    prepare_time: Optional[float] = None  # prefix merging and parameter binding
+    queue_time: Optional[float] = None  # waiting for the rate limiter
+    connect_time: Optional[float] = None
+    first_byte_time: Optional[float] = None  # from sending the request to the response headers
+    transfer_time: Optional[float] = None
+    parse_time: Optional[float] = None
+    format_time: Optional[float] = None
+    snapshot_time: Optional[float] = None  # saving the result snapshot
+    # upserting the stats row itself - only known after the write and therefore not in the stored row
+    # see the sqlite_write_duration metric for the persisted write latencies
+    store_time: Optional[float] = None
+    bytes_received: Optional[int] = None
 
     def __post_init__(self):
         """
@@ -58,12 +91,40 @@ class QueryStats:
         """
         self.stats_id = str(uuid.uuid4())
         self.time_stamp = datetime.datetime.now()
+        self._start = time.perf_counter()
+        # the final SPARQL of the execution (if known) - not stored see SlowQueryLog
+        self.sparql = None
 
     def done(self):
         """
-        Set the duration by calculating the elapsed time since the `time_stamp`.
+        Set the duration by calculating the elapsed monotonic time since my creation.
         """
-        self.duration = (datetime.datetime.now() - self.time_stamp).total_seconds()
+        self.duration = time.perf_counter() - self._start
+
+    def add_time(self, stage: str, seconds: float):
+        """
+        add the given seconds to the time of the given stage e.g. "connect"
+        """
+        attr = f"{stage}_time"
+        setattr(self, attr, (getattr(self, attr) or 0.0) + seconds)
+
+    @contextmanager
+    def timed(self, stage: str):
+        """
+        add the time of the with block to the given stage
+        """
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def get_stage_times(self) -> Dict[str, Optional[float]]:
+        """
+        get my per stage timings
+        """
+        stage_times = {name: getattr(self, f"{name}_time") for name in self.stages}
+        return stage_times
 
     def apply_error_filter(self, for_html: bool = False) -> ErrorFilter:
         """
@@ -101,10 +162,14 @@ class QueryStats:
             error_msg=record.get("error_msg", None),
             error_category=record.get("error_category", None),
             filtered_msg=record.get("filtered_msg", None),
+            snapshot_hash=record.get("snapshot_hash", None),
         )
         stat.stats_id = record.get("stats_id", stat.stats_id)
         stat.time_stamp = record.get("time_stamp", stat.time_stamp)
         stat.duration = record.get("duration", None)
+        for stage in cls.stages:
+            setattr(stat, f"{stage}_time", record.get(f"{stage}_time", None))
+        stat.bytes_received = record.get("bytes_received", None)
         return stat
 
     def as_record(self) -> Dict:
@@ -143,6 +208,16 @@ class QueryStats:
                     error_msg="",
                     error_category=None,
                     filtered_msg="",
+                    snapshot_hash="6f1ed002ab5595859014ebf0951522d9f7c4c2b4fb5dd1dda2b6f59e0d5c9e1a",
+                    prepare_time=0.002,
+                    queue_time=0.0,
+                    connect_time=0.03,
+                    first_byte_time=0.41,
+                    transfer_time=0.04,
+                    parse_time=0.015,
+                    format_time=0.003,
+                    snapshot_time=0.004,
+                    bytes_received=38212,
                 ),
             ]
         }
@@ -180,6 +255,12 @@ class QueryName:
     query_id: str = field(init=False)
 
     def __post_init__(self):
+        self.update_query_id()
+
+    def update_query_id(self):
+        """
+        recompute my query_id e.g. after renaming
+        """
         self.query_id = self.get_query_id(self.name, self.namespace, self.domain)
 
     @classmethod
@@ -351,6 +432,7 @@ ORDER BY ?horse
             url=record.get("url"),
             description=record.get("description"),
             sparql=record.get("sparql"),
+            comment=record.get("comment"),
         )
 
     def as_record(self) -> Dict:
@@ -393,9 +475,10 @@ class QueryDetails:
     param_count: int
     lines: int
     size: int
+    fingerprint: Optional[str] = None  # see QueryFingerprint - equal for duplicate queries
 
     @classmethod
-    def from_sparql(cls, query_id: str, sparql: str) -> "QueryDetails":
+    def from_sparql(cls, query_id: str, sparql: str, with_fingerprint: bool = True) -> "QueryDetails":
         """
         Creates an instance of QueryDetails from a SPARQL query string.
 
@@ -405,6 +488,7 @@ class QueryDetails:
         Args:
             query_id (str): The identifier of the query.
             sparql (str): The SPARQL query string from which to generate the query details.
+            with_fingerprint (bool): if True compute the fingerprint from the parsed query
 
         Returns:
             QueryDetails: An instance containing details about the SPARQL query.
@@ -413,15 +497,14 @@ class QueryDetails:
         lines = sparql.count("\n") + 1
         size = len(sparql.encode("utf-8"))
 
-        # Example to extract parameters - this may need to be replaced with actual parameter extraction logic
-        sparql_params = Params(
-            query=sparql
-        )  # Assuming Params is a class that can parse SPARQL queries to extract parameters
-        params = ",".join(sparql_params.params) if sparql_params.params else None
-        param_count = len(sparql_params.params)
+        # the parameter slots in order of use
+        slots = ParamTemplateCache.get_instance().get(sparql).slots
+        params = ",".join(slots) if slots else None
+        param_count = len(slots)
         # @TODO get parameters
         default_params = None
         default_param_types = None
+        fingerprint = QueryFingerprint.of(sparql) if with_fingerprint else None
         # Create and return the QueryDetails instance
         return cls(
             query_id=query_id,
@@ -431,8 +514,35 @@ class QueryDetails:
             param_count=param_count,
             lines=lines,
             size=size,
+            fingerprint=fingerprint,
         )
 
+    def get_param_types(self) -> Dict[str, str]:
+        """
+        get the expected types of my parameters inferred from the default parameter
+        types and values e.g. "item" for a parameter with a Wikidata class as type
+
+        Returns:
+            Dict[str, str]: the type name by parameter name for the parameters with known type
+        """
+        param_types = {}
+        if not self.params:
+            return param_types
+
+        def split(value: Optional[str]) -> List[str]:
+            return [part.strip() for part in value.split(",")] if value else []
+
+        names = list(dict.fromkeys(split(self.params)))
+        types = split(self.default_param_types)
+        defaults = split(self.default_params)
+        for i, name in enumerate(names):
+            if i < len(types) and types[i]:
+                # the default param types are the Wikidata classes of item parameters
+                param_types[name] = "item"
+            elif i < len(defaults) and defaults[i]:
+                param_types[name] = ParamTemplate.infer_type(defaults[i])
+        return param_types
+
     @classmethod
     def get_samples(cls) -> dict[str, "QueryDetails"]:
         """
@@ -448,6 +558,7 @@ class QueryDetails:
                     param_count=1,
                     lines=1,
                     size=50,
+                    fingerprint="9f3c0b5d2e4a6c8b0d1f3e5a7c9b1d3f5e7a9c1b3d5f7e9a1c3b5d7f9e1a3c5b",
                 )
             ]
         }
@@ -534,6 +645,12 @@ class QueryBundle:
         if endpoint:
             self.sparql = SPARQL(endpoint.endpoint, method=self.endpoint.method)
 
+    def set_timeout(self, timeout: float):
+        """
+        set the timeout in seconds of the SPARQL requests
+        """
+        self.sparql.sparql.setTimeout(math.ceil(timeout))
+
     def raw_query(self, resultFormat, mime_type: str = None, timeout: float = 10.0):
         """
         returns raw result of the endpoint
@@ -564,6 +681,38 @@ class QueryBundle:
         )
         return response.text
 
+    def iter_records(self, timeout: float = 60.0) -> Generator[Dict[str, str], None, None]:
+        """
+        stream the result records of the stored query using the SPARQL 1.1 CSV results format
+
+        the values are the plain lexical forms so that the records of
+        different endpoints are comparable - see ResultComparator
+
+        Args:
+            timeout (float): connect and read timeout in seconds
+
+        Yields:
+            Dict[str, str]: the records as they are received
+        """
+        method = self.endpoint.method or "POST"
+        # POST sends the query form encoded - long queries do not fit into the url
+        query_arg = "data" if method.upper() == "POST" else "params"
+        with requests.request(
+            method,
+            self.endpoint.endpoint,
+            headers={"Accept": "text/csv"},
+            timeout=timeout,
+            stream=True,
+            **{query_arg: {"query": self.query.query}},
+        ) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            # keep the raw stream open at its end for the text wrapper
+            response.raw.auto_close = False
+            text = io.TextIOWrapper(response.raw, encoding="utf-8", newline="")
+            for record in csv.DictReader(text):
+                yield record
+
     def get_lod(self, *, param_dict=None) -> List[dict]:
         """
         Executes the stored query using the SPARQL service and returns the results as a list of dictionaries.
@@ -571,32 +720,57 @@ class QueryBundle:
         Returns:
             List[dict]: A list where each dictionary represents a row of results from the SPARQL query.
         """
-        lod = self.sparql.queryAsListOfDicts(self.query.query, param_dict=param_dict)
+        query = self.get_bound_query(param_dict)
+        lod = self.sparql.queryAsListOfDicts(query)
         return lod
 
-    def get_lod_with_stats(self, *, param_dict=None) -> tuple[list[dict], QueryStats]:
+    def get_bound_query(self, param_dict=None) -> str:
+        """
+        get my query with the given parameters applied via the precompiled template of the query
+
+        Raises:
+            Exception: if the query has parameters but no values are given
+        """
+        template = ParamTemplateCache.get_instance().get(self.query.query)
+        query = template.render_with_check(param_dict)
+        return query
+
+    def get_lod_with_stats(
+        self, *, param_dict=None, query_stat: Optional[QueryStats] = None
+    ) -> tuple[list[dict], QueryStats]:
         """
         Executes the stored query using the SPARQL service and returns the results as a list of dictionaries.
 
+        Args:
+            param_dict (dict): the query parameters to apply (if any)
+            query_stat (QueryStats): the stats to record the execution in - default: new stats
+
         Returns:
             List[dict]: A list where each dictionary represents a row of results from the SPARQL query.
         """
         logger.info(f"Querying {self.endpoint.name} with query {self.named_query.name}")
-        query_stat = QueryStats(query_id=self.named_query.query_id, endpoint_name=self.endpoint.name)
+        if query_stat is None:
+            query_stat = QueryStats(query_id=self.named_query.query_id, endpoint_name=self.endpoint.name)
+        query_stat.sparql = self.query.query
         try:
-            lod = self.sparql.queryAsListOfDicts(self.query.query, param_dict=param_dict)
+            query = self.get_bound_query(param_dict)
+            query_stat.sparql = query
+            with QueryTiming.recording(query_stat):
+                lod = self.sparql.queryAsListOfDicts(query)
             query_stat.records = len(lod) if lod else -1
             query_stat.done()
         except Exception as ex:
             lod = []
             logger.debug(f"Execution of query failed: {ex}")
             query_stat.error(ex)
+        SnapQueryMetrics.get_instance().observe_query(query_stat)
         return (lod, query_stat)
 
     def format_result(
         self,
         qlod: List[Dict[str, Any]] = None,
         r_format: Format = Format.json,
+        query_stat: Optional[QueryStats] = None,
     ) -> Optional[str]:
         """
         Formats the query results based on the specified format and prints them.
@@ -605,23 +779,27 @@ class QueryBundle:
             qlod (List[Dict[str, Any]]): The list of dictionaries that represent the query results.
             query (Query): The query object which contains details like the endpoint and the database.
             r_format (Format): The format in which to print the results.
+            query_stat (QueryStats): the stats to add the format time to (if any)
 
         Returns:
             Optional[str]: The formatted string representation of the query results, or None if printed directly.
         """
         if qlod is None:
             qlod = self.get_lod()
+        start = time.perf_counter()
         if r_format is None:
             r_format = Format.json
+        formatted = None  # In case no format is matched or needed
         if r_format == Format.csv:
-            csv_output = CSV.toCSV(qlod)
-            return csv_output
+            formatted = CSV.get_instance().toCSV(qlod)
         elif r_format in [Format.latex, Format.github, Format.mediawiki, Format.html]:
             doc = self.query.documentQueryResult(qlod, tablefmt=str(r_format), floatfmt=".1f")
-            return doc.asText()
+            formatted = doc.asText()
         elif r_format == Format.json:
-            return json.dumps(qlod, indent=2, sort_keys=True, default=str)
-        return None  # In case no format is matched or needed
+            formatted = json.dumps(qlod, indent=2, sort_keys=True, default=str)
+        if query_stat is not None:
+            query_stat.add_time("format", time.perf_counter() - start)
+        return formatted
 
     def set_limit(self, limit: int = None):
         """
@@ -663,25 +841,117 @@ class NamedQueryManager:
         if db_path is None:
             db_path = NamedQueryManager.get_cache_path()
         self.debug = debug
-        self.sql_db = SQLDB(dbname=db_path, check_same_thread=False, debug=debug)
+        # WAL mode with a connection per thread - the database may be shared by several worker processes
+        self.sql_db = ThreadLocalSQLDB(dbname=db_path, debug=debug)
         # Get the path of the yaml_file relative to the current Python module
         self.samples_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples")
-        endpoints_path = os.path.join(self.samples_path, "endpoints.yaml")
-        self.endpoints = EndpointManager.getEndpoints(endpointPath=endpoints_path, lang="sparql", with_default=False)
-        yaml_path = os.path.join(self.samples_path, "meta_query.yaml")
-        self.meta_qm = QueryManager(queriesPath=yaml_path, with_default=False, lang="sql")
-        # Graph Manager
-        gm_yaml_path = GraphManager.get_yaml_path()
-        self.gm = GraphManager.load_from_yaml_file(gm_yaml_path)  # @UndefinedVariable
+        self.load_config()
         # SQL meta data handling
         # primary keys
         self.primary_keys = {
             QueryStats: "stats_id",
             NamedQuery: "query_id",
             QueryDetails: "query_id",
+            SlowQuery: "stats_id",
+            EndpointBenchmarkResult: "result_id",
+        }
+        # indexed columns
+        self.indexes = {
+            QueryDetails: ["fingerprint"],
         }
         self.entity_infos = {}
-        pass
+        # in memory index of the query names - built on first use
+        self.name_index: Optional[QueryNameIndex] = None
+        # in memory catalog of the named queries - loaded on first use
+        self.catalog: Optional[NamedQueryCatalog] = None
+        # result snapshots - created on first use
+        self.snapshot_store: Optional[SnapshotStore] = None
+        # executions above the per endpoint thresholds are logged with a structural analysis
+        self.slow_query_log = SlowQueryLog()
+        # predicts durations from the QueryStats history - loaded on first use
+        self.duration_predictor: Optional[DurationPredictor] = None
+        # changes of other worker processes - see sync
+        self.notifier = ChangeNotifier(self.sql_db)
+        # results and compiled queries shared by the worker processes - created on first use
+        self.shared_cache: Optional[SharedCache] = None
+        # seconds to keep API query results in the shared cache - 0 to always query the endpoint
+        self.result_cache_ttl = 0.0
+        # expected parameter types by query_id - see get_param_types
+        self.param_types: Dict[str, Dict[str, str]] = {}
+        # fingerprints of the named queries by query_id - see get_fingerprint
+        self.fingerprints: Dict[str, QueryFingerprint] = {}
+        # seconds of the last QueryStats insert - recorded one write late by store_stats
+
+    def load_config(self):
+        """
+        load the endpoints, meta queries and graphs from their yaml files
+        """
+        endpoints_path = os.path.join(self.samples_path, "endpoints.yaml")
+        self.endpoints = EndpointManager.getEndpoints(endpointPath=endpoints_path, lang="sparql", with_default=False)
+        yaml_path = os.path.join(self.samples_path, "meta_query.yaml")
+        self.meta_qm = QueryManager(queriesPath=yaml_path, with_default=False, lang="sql")
+        # Graph Manager
+        gm_yaml_path = GraphManager.get_yaml_path()
+        self.gm = GraphManager.load_from_yaml_file(gm_yaml_path)  # @UndefinedVariable
+
+    def notify_config_change(self):
+        """
+        reload my configuration and let the other worker processes reload theirs
+        """
+        self.load_config()
+        self.get_shared_cache().clear()
+        self.notifier.notify("config")
+
+    def sync(self, force: bool = False):
+        """
+        apply the changes of other worker processes - checked at most once per check interval
+
+        Args:
+            force(bool): if True check immediately
+        """
+        changes = self.notifier.get_changes(force=force)
+        if "config" in changes:
+            self.load_config()
+            self.entity_infos = {}
+        if "config" in changes or "NamedQuery" in changes:
+            self.name_index = None
+            self.catalog = None
+            self.param_types = {}
+            self.fingerprints = {}
+
+    def get_shared_cache(self) -> SharedCache:
+        """
+        get the cache shared by the worker processes - a sibling of my database
+        """
+        if self.shared_cache is None:
+            if self.sql_db.dbname == SQLDB.RAM:
+                cache_path = SQLDB.RAM
+            else:
+                cache_path = f"{os.path.splitext(self.sql_db.dbname)[0]}_cache.db"
+            self.shared_cache = SharedCache(cache_path, debug=self.debug)
+        return self.shared_cache
+
+    def get_name_index(self) -> QueryNameIndex:
+        """
+        get the in memory index of the domains, namespaces and names of all named queries
+        which is kept in sync by my store method and the change notifications of other workers
+        """
+        self.sync()
+        if self.name_index is None:
+            records = self.sql_db.queryGen("SELECT query_id, domain, namespace, name FROM NamedQuery")
+            self.name_index = QueryNameIndex.from_records(records)
+        return self.name_index
+
+    def get_catalog(self) -> NamedQueryCatalog:
+        """
+        get the in memory catalog of all named queries
+        which is kept in sync by my store method and the change notifications of other workers
+        """
+        self.sync()
+        if self.catalog is None:
+            records = self.sql_db.queryGen("SELECT * FROM NamedQuery")
+            self.catalog = NamedQueryCatalog.from_records(NamedQuery, records)
+        return self.catalog
 
     @classmethod
     def get_cache_path(cls) -> str:
@@ -723,8 +993,9 @@ class NamedQueryManager:
                 backup_path = path_obj.with_name(f"{path_obj.stem}-{timestamp}{path_obj.suffix}")
                 path_obj.rename(backup_path)  # Move the existing file to backup
 
+        needs_init = force_init or not path_obj.exists() or path_obj.stat().st_size == 0
         nqm = NamedQueryManager(db_path=db_path, debug=debug)
-        if force_init or not path_obj.exists() or path_obj.stat().st_size == 0:
+        if needs_init:
             for source_class, pk in [
                 (NamedQuery, "query_id"),
                 (QueryStats, "stats_id"),
@@ -737,7 +1008,7 @@ class NamedQueryManager:
                 entityInfo = EntityInfo(sample_records, name=source_class.__name__, primaryKey=pk, quiet=not debug)
 
                 # Create and populate the table specific to each class
-                nqm.sql_db.createTable(sample_records, source_class.__name__, withDrop=True)
+                nqm.sql_db.createTable4EntityInfo(entityInfo, withDrop=True)
                 nqm.sql_db.store(sample_records, entityInfo, fixNone=True, replace=True)
             # store yaml defined entities to SQL database
             nqm.store_endpoints()
@@ -756,7 +1027,7 @@ class NamedQueryManager:
             lod.append(asdict(nq))
         self.store(lod=lod)
 
-    def store_query_details_list(self, qd_list: List[QueryDetails]):
+    def store_query_details_list(self, qd_list: List[QueryDetails]) -> Dict[str, List[str]]:
         """
         Stores a list of QueryDetails instances into the database. This function converts
         each QueryDetails instance into a dictionary and then stores the entire list of dictionaries.
@@ -765,20 +1036,91 @@ class NamedQueryManager:
 
         Args:
             qd_list (List[QueryDetails]): List of QueryDetails instances to be stored.
+
+        Returns:
+            Dict[str, List[str]]: the duplicates found - see find_duplicates
         """
         qd_lod = []
         for qd in qd_list:
             qd_lod.append(asdict(qd))
         self.store(lod=qd_lod, source_class=QueryDetails)
+        duplicates = self.find_duplicates(qd_lod)
+        for query_id, others in duplicates.items():
+            logger.warning(f"query {query_id} duplicates {', '.join(others)}")
+        return duplicates
+
+    def find_duplicates(self, qd_lod: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """
+        find the stored queries with the same fingerprint as the given QueryDetails records
+
+        Args:
+            qd_lod(List[Dict[str, Any]]): the QueryDetails records e.g. of an import
+
+        Returns:
+            Dict[str, List[str]]: the ids of the other queries with the same fingerprint by query_id
+        """
+        query_ids_by_fingerprint = {}
+        for record in qd_lod:
+            if record.get("fingerprint"):
+                query_ids_by_fingerprint.setdefault(record["fingerprint"], []).append(record["query_id"])
+        fingerprints = list(query_ids_by_fingerprint)
+        stored = {}
+        # stay below the SQLite limit for the number of host parameters
+        for i in range(0, len(fingerprints), 500):
+            chunk = fingerprints[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            sql_query = f"SELECT query_id, fingerprint FROM QueryDetails WHERE fingerprint IN ({placeholders})"
+            for record in self.sql_db.query(sql_query, tuple(chunk)):
+                stored.setdefault(record["fingerprint"], []).append(record["query_id"])
+        duplicates = {}
+        for fingerprint, query_ids in query_ids_by_fingerprint.items():
+            for query_id in query_ids:
+                others = sorted(other for other in stored.get(fingerprint, []) if other != query_id)
+                if others:
+                    duplicates[query_id] = others
+        return duplicates
+
+    def get_duplicates(self) -> List[Dict[str, Any]]:
+        """
+        get the groups of stored queries with the same fingerprint
+        see the duplicate_queries meta query
+        """
+        # make sure the table and its fingerprint column exist
+        self.get_entity_info(QueryDetails)
+        query = self.meta_qm.queriesByName["duplicate_queries"]
+        lod = self.sql_db.query(query.query)
+        return lod
+
+    def get_fingerprint(self, named_query: NamedQuery) -> QueryFingerprint:
+        """
+        get the fingerprint of the given named query with the mapping of its variable names
+        """
+        fingerprint = self.fingerprints.get(named_query.query_id)
+        if fingerprint is None or fingerprint.sparql != named_query.sparql:
+            fingerprint = QueryFingerprint(named_query.sparql)
+            self.fingerprints[named_query.query_id] = fingerprint
+        return fingerprint
 
     def store_stats(self, stats_list: List[QueryStats]):
         """
-        store the given list of query statistics
+        store the given list of query statistics and log the slow executions
         """
-        stats_lod = []
-        for stats in stats_list:
-            stats_lod.append(asdict(stats))
+        stats_lod = [asdict(stats) for stats in stats_list]
+        start = time.perf_counter()
         self.store(lod=stats_lod, source_class=QueryStats)
+        store_time = time.perf_counter() - start
+        for stats in stats_list:
+            stats.add_time("store", store_time)
+        slow_lod = []
+        for stats in stats_list:
+            slow_query = self.slow_query_log.check(stats)
+            if slow_query:
+                slow_lod.append(asdict(slow_query))
+        if slow_lod:
+            self.store(lod=slow_lod, source_class=SlowQuery)
+        if self.duration_predictor:
+            for stats in stats_list:
+                self.duration_predictor.observe(stats)
 
     def store_graphs(self, gm: GraphManager = None):
         """
@@ -818,6 +1160,9 @@ class NamedQueryManager:
         limit: int = None,
         with_stats: bool = True,
         prefix_merger: QueryPrefixMerger = QueryPrefixMerger.SIMPLE_MERGER,
+        with_snapshot: bool = False,
+        timeout: Optional[float] = None,
+        context: Optional[str] = None,
     ):
         """
         execute the given named_query
@@ -829,23 +1174,121 @@ class NamedQueryManager:
             limit(int): the record limit for the results (if any)
             with_stats(bool): if True run the stats
             prefix_merger: prefix merger to use
-        """
-        # Assemble the query bundle using the named query, endpoint, and limit
-        query_bundle = self.as_query_bundle(named_query, endpoint_name, limit, prefix_merger)
-        params = Params(query_bundle.query.query)
-        if params.has_params:
-            params.set(params_dict)
-            query = params.apply_parameters()
-            query_bundle.query.query = query
+            with_snapshot(bool): if True save the result as content addressed snapshot linked from the stats
+            timeout(float): the timeout of the SPARQL request in seconds (if any) see get_duration_predictor
+            context(str): the context to store the stats with (if any)
+        """
+        stats = QueryStats(query_id=named_query.query_id, endpoint_name=endpoint_name, context=context)
+        with stats.timed("prepare"):
+            # Assemble the query bundle using the named query, endpoint, and limit
+            query_bundle = self.as_query_bundle(named_query, endpoint_name, limit, prefix_merger)
+            template = ParamTemplateCache.get_instance().get(query_bundle.query.query)
+            if template.has_params:
+                query_bundle.query.query = template.render(params_dict)
+            if timeout:
+                query_bundle.set_timeout(timeout)
         if with_stats:
             # Execute the query
-            results, stats = query_bundle.get_lod_with_stats()
+            results, stats = query_bundle.get_lod_with_stats(query_stat=stats)
+            if with_snapshot and results is not None and not stats.error_msg:
+                with stats.timed("snapshot"):
+                    stats.snapshot_hash = self.get_snapshot_store().save(results)
             self.store_stats([stats])
         else:
             results = query_bundle.get_lod()
             stats = None
         return results, stats
 
+    def get_param_types(self, query_id: str) -> Dict[str, str]:
+        """
+        get the expected parameter types of the given query from its QueryDetails
+        """
+        param_types = self.param_types.get(query_id)
+        if param_types is None:
+            # make sure the table exists
+            self.get_entity_info(QueryDetails)
+            records = self.sql_db.query("SELECT * FROM QueryDetails WHERE query_id=?", (query_id,))
+            param_types = QueryDetails(**records[0]).get_param_types() if records else {}
+            self.param_types[query_id] = param_types
+        return param_types
+
+    def check_params(self, query_bundle: QueryBundle, param_dict: Optional[Dict[str, Any]]):
+        """
+        check the given parameter values against the precompiled template of the query
+        and the parameter types of its QueryDetails
+
+        Raises:
+            ValueError: if values are missing, malicious or of the wrong type
+        """
+        template = ParamTemplateCache.get_instance().get(query_bundle.query.query)
+        if template.has_params:
+            param_types = self.get_param_types(query_bundle.named_query.query_id)
+            template.check(dict(param_dict) if param_dict else {}, param_types)
+
+    def get_duration_predictor(self) -> DurationPredictor:
+        """
+        get the duration predictor which is kept up to date by store_stats
+        """
+        if self.duration_predictor is None:
+            # make sure the tables exist
+            self.get_entity_info(QueryStats)
+            self.get_entity_info(QueryDetails)
+            self.duration_predictor = DurationPredictor.from_sql_db(self.sql_db)
+        return self.duration_predictor
+
+    def predict_duration(self, query_id: str, endpoint_name: str) -> DurationPrediction:
+        """
+        predict the duration of the given query on the given endpoint
+        """
+        prediction = self.get_duration_predictor().predict(query_id, endpoint_name)
+        return prediction
+
+    def get_slow_queries(self) -> List[Dict[str, Any]]:
+        """
+        get the slow query offenders ranked by count and average duration
+        see the slow_queries meta query
+        """
+        # make sure the table exists even if no slow query has been logged yet
+        self.get_entity_info(SlowQuery)
+        query = self.meta_qm.queriesByName["slow_queries"]
+        lod = self.sql_db.query(query.query)
+        return lod
+
+    def get_snapshot_store(self) -> SnapshotStore:
+        """
+        get the store of result snapshots
+        """
+        if self.snapshot_store is None:
+            self.snapshot_store = SnapshotStore()
+        return self.snapshot_store
+
+    def get_result_changes(self, query_id: str, endpoint_name: Optional[str] = None) -> List[QueryStats]:
+        """
+        get the query stats at which the result snapshot of the given query changed
+
+        Args:
+            query_id(str): the id of the query
+            endpoint_name(str): optional endpoint to restrict the history to
+
+        Returns:
+            List[QueryStats]: the first stats of each distinct consecutive snapshot in time order
+        """
+        sql_query = """SELECT * FROM QueryStats
+WHERE query_id = ? AND snapshot_hash IS NOT NULL"""
+        params = (query_id,)
+        if endpoint_name:
+            sql_query += " AND endpoint_name = ?"
+            params += (endpoint_name,)
+        sql_query += " ORDER BY time_stamp"
+        changes = []
+        previous_hash = None
+        for record in self.sql_db.queryGen(sql_query, params):
+            stats = QueryStats.from_record(record)
+            if stats.snapshot_hash != previous_hash:
+                changes.append(stats)
+                previous_hash = stats.snapshot_hash
+        return changes
+
     def add_and_store(self, nq: NamedQuery):
         """
         Adds a new NamedQuery instance and stores it in the database.
@@ -877,13 +1320,41 @@ class NamedQueryManager:
                 debug=self.debug,
                 quiet=not self.debug,
             )
+            self.migrate_table(self.entity_infos[source_class])
+            self.create_indexes(source_class)
         return self.entity_infos[source_class]
 
+    def create_indexes(self, source_class: Type):
+        """
+        create the missing indexes of the table of the given source class
+        """
+        table_name = source_class.__name__
+        for column in self.indexes.get(source_class, []):
+            self.sql_db.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{column} ON {table_name} ({column})")
+
+    def migrate_table(self, entity_info: EntityInfo):
+        """
+        create the table of the given entity info if it is missing or add the
+        columns missing in an existing table e.g. for fields added to QueryStats
+        after the database was created
+
+        Args:
+            entity_info(EntityInfo): the entity info derived from the current dataclass
+        """
+        columns = {record["name"] for record in self.sql_db.query(f"PRAGMA table_info({entity_info.name})")}
+        if not columns:
+            self.sql_db.createTable4EntityInfo(entityInfo=entity_info)
+        else:
+            for column, sql_type in entity_info.sqlTypeMap.items():
+                if column not in columns:
+                    self.sql_db.execute(f"ALTER TABLE {entity_info.name} ADD COLUMN {column} {sql_type}")
+
     def store(
         self,
         lod: List[Dict[str, Any]],
         source_class: Type = NamedQuery,
         with_create: bool = False,
+        execute_many: bool = False,
     ) -> None:
         """
         Stores the given list of dictionaries in the database using entity information
@@ -894,14 +1365,65 @@ class NamedQueryManager:
             source_class (Type): The class from which the entity information is derived. This class
                 should have an attribute or method that defines its primary key and must have a `__name__` attribute.
                 with_create(bool): if True create the table
+            execute_many(bool): if True upsert all records with a single executemany call
         Raises:
             AttributeError: If the source class does not have the necessary method or attribute to define the primary key.
         """
         entity_info = self.get_entity_info(source_class)
         if with_create:
             self.sql_db.createTable4EntityInfo(entityInfo=entity_info, withDrop=True)
+            self.create_indexes(source_class)
         # Store the list of dictionaries in the database using the defined entity information
-        self.sql_db.store(lod, entity_info, fixNone=True, replace=True)
+        start = time.perf_counter()
+        self.sql_db.store(lod, entity_info, executeMany=execute_many, fixNone=True, replace=True)
+        SnapQueryMetrics.get_instance().sqlite_write_duration.observe(
+            time.perf_counter() - start, table=source_class.__name__
+        )
+        self.on_stored(lod, source_class, with_create=with_create)
+
+    def store_batch(self, batch: List[Tuple[List[Dict[str, Any]], Type]]) -> None:
+        """
+        upsert the records of several source classes in a single transaction
+
+        Args:
+            batch(List[Tuple[List[Dict[str, Any]], Type]]): the list of records and the source class for each table
+        """
+        metrics = SnapQueryMetrics.get_instance()
+        with self.sql_db.c as connection:
+            for lod, source_class in batch:
+                entity_info = self.get_entity_info(source_class)
+                LOD.setNone4List(lod, entity_info.typeMap.keys())
+                start = time.perf_counter()
+                connection.executemany(entity_info.getInsertCmd(replace=True), lod)
+                metrics.sqlite_write_duration.observe(time.perf_counter() - start, table=source_class.__name__)
+        for lod, source_class in batch:
+            self.on_stored(lod, source_class)
+
+    def on_stored(self, lod: List[Dict[str, Any]], source_class: Type, with_create: bool = False) -> None:
+        """
+        update the in-memory indices and notify the other workers after storing the given records
+
+        Args:
+            lod (List[Dict[str, Any]]): the stored records
+            source_class (Type): the source class of the records
+            with_create(bool): True if the table has been recreated
+        """
+        if source_class is NamedQuery:
+            if with_create:
+                self.name_index = None
+                self.catalog = None
+            else:
+                if self.name_index is not None:
+                    self.name_index.add_records(lod)
+                if self.catalog is not None:
+                    self.catalog.add_records(lod)
+            self.notifier.notify("NamedQuery")
+        elif source_class is QueryDetails:
+            self.param_types = {}
+            predictor = self.duration_predictor
+            if predictor:
+                for record in lod:
+                    predictor.add_details(record["query_id"], record.get("size"), record.get("fingerprint"))
 
     @classmethod
     def get_sample_records(cls, source_class: Type) -> List[Dict[str, Any]]:
@@ -940,39 +1462,20 @@ class NamedQueryManager:
 
         return list_of_records
 
-    def lookup(self, query_name: QueryName, lenient: bool = True) -> NamedQuery:
+    def lookup(self, query_name: QueryName) -> NamedQuery:
         """
         lookup the named query for the given structured query name
 
-
         Args:
             query_name(QueryName): the structured query name
-            lenient(bool): if True handle multiple entry errors as warnings
         Returns:
             NamedQuery: the named query
         """
         qn = query_name
-        query_id = qn.query_id
-        sql_query = """SELECT
-    *
-FROM
-    NamedQuery
-WHERE
-    query_id=?"""
-        query_records = self.sql_db.query(sql_query, (query_id,))
-        if not query_records:
+        record = self.get_catalog().get_record(qn.query_id)
+        if record is None:
             msg = f"NamedQuery not found for the specified query '{qn}'."
             raise ValueError(msg)
-
-        query_count = len(query_records)
-        if query_count != 1:
-            msg = f"multiple entries ({query_count}) for query '{qn.name}' namespace '{qn.namespace} and domain '{qn.domain}' the id '{qn.query_id}' is not unique"
-            if lenient:
-                print(f"warning: {msg}")
-            else:
-                raise ValueError(msg)
-
-        record = query_records[0]
         named_query = NamedQuery.from_record(record)
         return named_query
 
@@ -1026,7 +1529,16 @@ WHERE
             endpoint=endpoint.endpoint,
             limit=limit,
         )
-        sparql_query = QueryPrefixMerger.merge_prefixes(query, endpoint, prefix_merger)
+        if prefix_merger == QueryPrefixMerger.ANALYSIS_MERGER:
+            # the analysis parses the query - share the result with the other workers
+            cache = self.get_shared_cache()
+            key = hashlib.sha256(named_query.sparql.encode("utf-8")).hexdigest()
+            sparql_query = cache.get("merged_query", key)
+            if sparql_query is None:
+                sparql_query = QueryPrefixMerger.merge_prefixes(query, endpoint, prefix_merger)
+                cache.put("merged_query", key, sparql_query)
+        else:
+            sparql_query = QueryPrefixMerger.merge_prefixes(query, endpoint, prefix_merger)
         if limit:
             sparql_query += f"\nLIMIT {limit}"
         query.query = sparql_query
@@ -1075,16 +1587,18 @@ WHERE
         Returns:
             List[NamedQuery]: A list of NamedQuery instances in the database.
         """
-        sql_query = """SELECT * FROM NamedQuery
+        if "%" in domain or "%" in namespace:
+            # wildcards within the filters need SQL LIKE
+            sql_query = """SELECT * FROM NamedQuery
 WHERE domain LIKE ? AND namespace LIKE ?
 ORDER BY domain,namespace,name"""
-        params = (f"{domain}%", f"{namespace}%")
-
-        if limit is not None:
-            sql_query += " LIMIT ?"
-            params += (limit,)
-
-        query_records = self.sql_db.query(sql_query, params)
+            params = (f"{domain}%", f"{namespace}%")
+            if limit is not None:
+                sql_query += " LIMIT ?"
+                params += (limit,)
+            query_records = self.sql_db.query(sql_query, params)
+        else:
+            query_records = self.get_catalog().get_records(domain=domain, namespace=namespace, limit=limit)
         named_queries = []
         for record in query_records:
             named_query = NamedQuery.from_record(record)
@@ -1107,14 +1621,7 @@ ORDER BY domain,namespace,name"""
         Returns:
             tuple[set, set]: A tuple of (unique URLs, unique names) sets
         """
-        sql_query = """SELECT url, name
-        FROM NamedQuery
-        WHERE domain = ? AND namespace = ?"""
-
-        query_records = self.sql_db.query(sql_query, (domain, namespace))
-        unique_urls = {record["url"] for record in query_records}
-        unique_names = {record["name"] for record in query_records}
-
+        unique_urls, unique_names = self.get_catalog().get_unique_sets(domain, namespace)
         return unique_urls, unique_names
 
     def get_query_stats(self, query_id: str) -> list[QueryStats]:
@@ -1162,6 +1669,8 @@ class QueryNameSet:
     """
     Manages a set of QueryNames filtered by domain and namespaces SQL like patterns
 
+    plain prefixes are answered by the in memory QueryNameIndex of the NamedQueryManager
+
     Attributes:
 
         nqm (NamedQueryManager): A manager to handle named queries and interactions with the database.
@@ -1203,19 +1712,29 @@ class QueryNameSet:
         """
         if limit is None:
             limit = self.limit
-        query = self.nqm.meta_qm.queriesByName["domain_namespace_stats"]
-        params = (f"{domain}%", f"{namespace}%")
-        results = self.nqm.sql_db.query(query.query, params)
-
         self.total = 0  # Reset total for each update call
         self.domains.clear()  # Clear previous domains
         self.namespaces.clear()  # Clear previous namespaces
         self.names.clear()  # Clear previous names
 
+        if "%" in domain or "%" in namespace:
+            # explicit SQL wildcards
+            query = self.nqm.meta_qm.queriesByName["domain_namespace_stats"]
+            params = (f"{domain}%", f"{namespace}%")
+            results = self.nqm.sql_db.query(query.query, params)
+            self.top_queries = self.nqm.get_all_queries(namespace=namespace, domain=domain, limit=limit)
+        else:
+            # prefix filters are answered by the in memory name index
+            name_index = self.nqm.get_name_index()
+            results = name_index.stats(domain, namespace)
+            self.top_queries = [
+                QueryName(name=name, namespace=qnamespace, domain=qdomain)
+                for qdomain, qnamespace, name in name_index.complete(domain, namespace, limit=limit)
+            ]
+
         for record in results:
             self.domains.add(record["domain"])
             self.namespaces.add(record["namespace"])
             self.total += record["query_count"]
-        self.top_queries = self.nqm.get_all_queries(namespace=namespace, domain=domain, limit=limit)
         for query in self.top_queries:
             self.names.add(query.name)
@@ -11,9 +11,12 @@ from lodstorage.query import QuerySyntaxHighlight, ValueFormatter, ValueFormatte
 from ngwidgets.input_webserver import InputWebSolution
 from ngwidgets.lod_grid import ListOfDictsGrid
 from ngwidgets.widgets import Link
-from nicegui import background_tasks, run, ui
+from nicegui import background_tasks, ui
 
 from snapquery.basequeryview import BaseQueryView
+from snapquery.duration_predictor import DurationPrediction
+from snapquery.metrics import SnapQueryMetrics
+from snapquery.param_template import ParamTemplateCache
 from snapquery.params_view import ParamsView
 from snapquery.query_annotate import SparqlQueryAnnotater
 from snapquery.snapquery_core import NamedQueryManager, QueryBundle, QueryStats
@@ -61,6 +64,7 @@ class NamedQueryView:
                         list(self.nqm.endpoints.keys()),
                         value=self.solution.endpoint_name,
                         label="endpoint",
+                        on_change=self.show_prediction,
                     )
                     endpoint_selector.bind_value(
                         self,
@@ -77,6 +81,8 @@ class NamedQueryView:
                         pass
                     ui.button(icon="play_arrow", on_click=self.run_query)
                     self.stats_html = ui.html()
+                    self.prediction_html = ui.html()
+                    background_tasks.create(self.show_prediction())
                 with ui.row():
                     with ui.expansion("Show Query", icon="manage_search").classes("w-full"):
                         query_syntax_highlight = QuerySyntaxHighlight(self.query_bundle.query)
@@ -97,6 +103,48 @@ class NamedQueryView:
                     ui.button("Run Query", icon="play_arrow", on_click=self.run_query)
                 pass
 
+    async def get_prediction(self, endpoint_name: str = None) -> DurationPrediction:
+        """
+        predict the duration in the io_bound thread pool - the first prediction loads the predictor
+        from the stored stats which must not block the event loop
+        """
+        endpoint_name = endpoint_name or self.endpoint_name
+        prediction = await SnapQueryMetrics.get_instance().io_bound(
+            self.nqm.predict_duration, self.query_bundle.named_query.query_id, endpoint_name
+        )
+        return prediction
+
+    async def show_prediction(self, args=None):
+        """
+        show the expected duration of the query on the selected endpoint
+        """
+        prediction = await self.get_prediction(args.value if args else None)
+        markup = ""
+        if prediction.known:
+            markup = f"expected ~{prediction.duration:.1f} secs"
+            if prediction.source != "history":
+                markup += " (estimated from similar queries)"
+        if prediction.timeouts:
+            markup += f' <span style="color: red;">{prediction.timeouts} recent timeouts</span>'
+        self.prediction_html.content = markup
+
+    async def warn_if_expensive(self):
+        """
+        warn before running a query that is expected to exceed the time out
+        """
+        prediction = await self.get_prediction()
+        if prediction.known and prediction.upper > self.timeout:
+            ui.notify(
+                f"this query is expected to take up to {prediction.upper:.1f} secs on {self.endpoint_name}"
+                f" which exceeds the time out of {self.timeout} secs",
+                type="warning",
+            )
+        elif prediction.timeouts:
+            ui.notify(
+                f"this query timed out {prediction.timeouts} times recently on {self.endpoint_name}",
+                type="warning",
+            )
+
     def load_stats(self):
         """
         display query stats
@@ -167,12 +215,13 @@ class NamedQueryView:
         (re) load the query results
         """
         if self.params.has_params:
-            self.query_bundle.query.query = self.params.apply_parameters()
+            template = ParamTemplateCache.get_instance().get(self.params.query)
+            self.query_bundle.query.query = template.render(self.params.params_dict)
             self.params_view.close()
         self.query_bundle.set_limit(int(self.limit))
         endpoint = self.nqm.endpoints[self.endpoint_name]
         self.query_bundle.update_endpoint(endpoint)
-        result = await run.io_bound(self.query_bundle.get_lod_with_stats)
+        result = await SnapQueryMetrics.get_instance().io_bound(self.query_bundle.get_lod_with_stats)
         if not result:
             with self.solution.container:
                 ui.notify("query execution failure")
@@ -218,6 +267,7 @@ class NamedQueryView:
             if self.load_task:
                 self.load_task.cancel()
 
+        await self.warn_if_expensive()
         self.grid_row.clear()
         with self.grid_row:
             ui.spinner()
@@ -7,20 +7,25 @@ import json
 from pathlib import Path
 from typing import Union
 
+import anyio.to_thread
 import fastapi
 from fastapi import HTTPException
-from fastapi.responses import HTMLResponse, PlainTextResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from lodstorage.query import Format
 from ngwidgets.input_webserver import InputWebserver, InputWebSolution, WebserverConfig
 from ngwidgets.login import Login
 from ngwidgets.users import Users
 from nicegui import app, ui
 from nicegui.client import Client
+from starlette.background import BackgroundTask
 from starlette.responses import JSONResponse, RedirectResponse
 
 from snapquery.authorization import Authorization
+from snapquery.meta_query_stream import MetaQueryStream
+from snapquery.metrics import MetricsMiddleware, MetricsRegistry, SnapQueryMetrics
 from snapquery.namespace_stats_view import NamespaceStatsView
 from snapquery.orcid import OrcidAuth
+from snapquery.param_template import ParamTemplateCache
 from snapquery.query_set_tool_view import QuerySetToolView
 from snapquery.snapquery_core import NamedQueryManager, QueryBundle, QueryName, QueryPrefixMerger
 from snapquery.snapquery_view import NamedQuerySearch, NamedQueryView
@@ -58,6 +63,12 @@ class SnapQueryWebServer(InputWebserver):
         self.orcid_auth = OrcidAuth(Path(self.config.base_path))
         self.authorization = Authorization.load()
         self.nqm = NamedQueryManager.from_samples()
+        # load the catalog of named queries at startup instead of on the first request
+        self.nqm.get_catalog()
+        self.metrics = SnapQueryMetrics.get_instance()
+        # the app is shared by all webserver instances e.g. in tests
+        if not any(middleware.cls is MetricsMiddleware for middleware in app.user_middleware):
+            app.add_middleware(MetricsMiddleware, metrics=self.metrics)
 
         @ui.page("/admin")
         async def admin(client: Client):
@@ -125,6 +136,14 @@ class SnapQueryWebServer(InputWebserver):
                 r_format_str=format,
             )
 
+        @app.get("/metrics")
+        async def metrics():
+            """
+            the operational metrics in the Prometheus text exposition format
+            """
+            self.update_threadpool_metrics()
+            return PlainTextResponse(self.metrics.render(), media_type=MetricsRegistry.content_type)
+
         @app.get("/api/endpoints")
         def get_endpoints():
             """
@@ -137,21 +156,38 @@ class SnapQueryWebServer(InputWebserver):
         def meta_query(
             name: str,
             limit: int = None,
-            fmt: str = 'json'):
+            fmt: str = 'json',
+            offset: int = None,
+            key: str = None,
+            after: str = None):
             """
             run the meta query with the given name
             query parameters are limit for a potential query result limt,
+            offset for the number of records to skip,
+            key for a column to order by for keyset pagination
+            with after as the key value of the last record of the previous page,
             fmt for an optional output format - default is JSON
             params may optionally be set as key=value pairs
+
+            JSON and CSV results are streamed from a database cursor
             """
             name, r_format = self.get_r_format(name, fmt)
             if name not in self.nqm.meta_qm.queriesByName:
                 raise HTTPException(status_code=404, detail=f"meta query {name} not known")
             query = self.nqm.meta_qm.queriesByName[name]
+            try:
+                stream = MetaQueryStream(self.nqm.sql_db, query, limit=limit, offset=offset, key=key, after=after)
+                stream.open()
+            except Exception as ex:
+                raise HTTPException(status_code=400, detail=str(ex))
+            # the connection is also closed if the body is never iterated e.g. on a client disconnect
+            close_stream = BackgroundTask(stream.close)
+            if r_format == Format.json:
+                return StreamingResponse(stream.json_chunks(), media_type="application/json", background=close_stream)
+            if r_format == Format.csv:
+                return StreamingResponse(stream.csv_chunks(), media_type="text/csv", background=close_stream)
             qb = QueryBundle(named_query=None, query=query)
-            qlod = self.nqm.sql_db.query(query.query)
-            if limit:
-                qlod = qlod[:limit]
+            qlod = stream.get_lod()
             content = qb.format_result(qlod, r_format)
             # content=content.replace("\n", "<br>\n")
             if r_format == Format.html:
@@ -262,6 +298,7 @@ class SnapQueryWebServer(InputWebserver):
 
     def get_query_builder(self, domain: str, namespace: str, name: str, endpoint_name: str, limit: int = None):
         """Get query builder for given parameters."""
+        self.nqm.sync()
         query_name = QueryName(domain=domain, namespace=namespace, name=name)
         qb = self.nqm.get_query(query_name=query_name, endpoint_name=endpoint_name, limit=limit)
         return qb
@@ -335,16 +372,55 @@ class SnapQueryWebServer(InputWebserver):
             name, r_format = self.get_r_format(name)
             if format:
                 r_format = format
+            self.nqm.sync()
             query_name = QueryName(domain=domain, namespace=namespace, name=name)
             qb = self.nqm.get_query(query_name=query_name, endpoint_name=endpoint_name, limit=limit)
+            try:
+                self.nqm.check_params(qb, param_dict)
+            except ValueError as ve:
+                raise HTTPException(status_code=422, detail=str(ve))
+            cache_key = None
+            if self.nqm.result_cache_ttl:
+                # queries with the same fingerprint share their result rows
+                fingerprint = self.nqm.get_fingerprint(qb.named_query)
+                template = ParamTemplateCache.get_instance().get(qb.named_query.sparql)
+                params = [param_dict.get(param) for param in template.params] if param_dict else []
+                cache_key = json.dumps([fingerprint.fingerprint, endpoint_name, limit, params])
+                rows = self.nqm.get_shared_cache().get("result", cache_key)
+                if rows is not None:
+                    qlod = fingerprint.from_canonical_rows(json.loads(rows))
+                    return qb.format_result(qlod, r_format)
             (qlod, stats) = qb.get_lod_with_stats(param_dict=param_dict)
+            content = qb.format_result(qlod, r_format, query_stat=stats)
             self.nqm.store_stats([stats])
-            content = qb.format_result(qlod, r_format)
+            if cache_key and not stats.error_msg:
+                rows = json.dumps(fingerprint.to_canonical_rows(qlod), default=str)
+                self.nqm.get_shared_cache().put("result", cache_key, rows, ttl=self.nqm.result_cache_ttl)
             return content
+        except HTTPException:
+            raise
         except Exception as e:
             # Handling specific exceptions can be more detailed based on what nqm.get_sparql and nqm.query can raise
             raise HTTPException(status_code=404, detail=str(e))
 
+    def configure_run(self):
+        """
+        configure the run from the command line arguments
+        """
+        InputWebserver.configure_run(self)
+        if hasattr(self.args, "resultCacheTtl"):
+            self.nqm.result_cache_ttl = self.args.resultCacheTtl
+
+    def update_threadpool_metrics(self):
+        """
+        update the saturation of the thread pools of the sync routes and of run.io_bound
+        - needs the running event loop
+        """
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        self.metrics.update_threadpool("anyio", busy=limiter.borrowed_tokens, max_threads=limiter.total_tokens)
+        tasks = self.metrics.io_bound_tasks
+        self.metrics.update_threadpool("io_bound", busy=tasks.running, queued=tasks.queued)
+
     def authenticated(self) -> bool:
         """
         Check if the user is authenticated.
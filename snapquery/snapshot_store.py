@@ -0,0 +1,115 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from snapquery.metrics import SnapQueryMetrics
+
+
+class SnapshotStore:
+    """
+    content addressed store of compressed query result snapshots
+
+    each result set is canonicalized (records with sorted keys in sorted order)
+    and saved gzip compressed under the sha256 hash of the canonical form so that
+    identical results of different runs and endpoints are stored only once
+    """
+
+    def __init__(self, base_path: Optional[str] = None):
+        """
+        Constructor
+
+        Args:
+            base_path: the directory of the snapshots (default: ~/.solutions/snapquery/snapshots)
+        """
+        if base_path is None:
+            base_path = Path.home() / ".solutions" / "snapquery" / "snapshots"
+        self.base_path = Path(base_path)
+        self.base_path.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def canonical_record(cls, record: Dict[str, Any]) -> str:
+        """
+        get the canonical JSON form of the given record - independent of the order of its keys
+        """
+        canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+        return canonical
+
+    @classmethod
+    def canonicalize(cls, lod: List[Dict[str, Any]]) -> bytes:
+        """
+        get the canonical form of the given result set which does not
+        depend on the order of the records or the order of the variables
+
+        Args:
+            lod: the result records
+
+        Returns:
+            bytes: the canonical UTF-8 encoded JSON
+        """
+        rows = sorted(cls.canonical_record(record) for record in lod)
+        canonical = ("[" + ",".join(rows) + "]").encode("utf-8")
+        return canonical
+
+    @classmethod
+    def get_hash(cls, lod: List[Dict[str, Any]]) -> str:
+        """
+        get the content hash of the given result set
+        """
+        snapshot_hash = hashlib.sha256(cls.canonicalize(lod)).hexdigest()
+        return snapshot_hash
+
+    def get_path(self, snapshot_hash: str) -> Path:
+        """
+        get the path of the snapshot with the given hash - fanned out by the first two hex digits
+        """
+        path = self.base_path / snapshot_hash[:2] / f"{snapshot_hash}.json.gz"
+        return path
+
+    def exists(self, snapshot_hash: str) -> bool:
+        return self.get_path(snapshot_hash).exists()
+
+    def save(self, lod: List[Dict[str, Any]]) -> str:
+        """
+        save the given result set unless an identical one is already stored
+
+        Args:
+            lod: the result records
+
+        Returns:
+            str: the content hash of the snapshot
+        """
+        canonical = SnapshotStore.canonicalize(lod)
+        snapshot_hash = hashlib.sha256(canonical).hexdigest()
+        path = self.get_path(snapshot_hash)
+        exists = path.exists()
+        SnapQueryMetrics.get_instance().cache_lookup("snapshot", hit=exists)
+        if not exists:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write atomically via a unique temporary file - concurrent threads and processes may save the same snapshot
+            with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", delete=False) as tmp:
+                tmp.write(gzip.compress(canonical))
+            os.replace(tmp.name, path)
+        return snapshot_hash
+
+    def load(self, snapshot_hash: str) -> List[Dict[str, Any]]:
+        """
+        load the snapshot with the given hash
+
+        Args:
+            snapshot_hash: the content hash
+
+        Returns:
+            List[Dict[str, Any]]: the canonicalized result records
+        """
+        lod = json.loads(gzip.decompress(self.get_path(snapshot_hash).read_bytes()))
+        return lod
@@ -3,6 +3,7 @@ Created on 2024-05-03
 @author: tholzheim
 """
 
+import functools
 import logging
 import random
 import re
@@ -16,6 +17,20 @@ from rdflib.plugins.sparql.parserutils import CompValue
 
 logger = logging.getLogger(__name__)
 
+# a single environment for parsing and compiling the query templates
+jinja_env = Environment()
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_query_parameter(query: str) -> frozenset[str]:
+    ast = jinja_env.parse(query)
+    return frozenset(meta.find_undeclared_variables(ast))
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_query_template(query: str) -> Template:
+    return jinja_env.from_string(query)
+
 
 class SparqlAnalyzer:
     """
@@ -169,6 +184,83 @@ class SparqlAnalyzer:
             fixed_query = query
         return fixed_query
 
+    @classmethod
+    def get_structure(cls, query: str) -> dict[str, int]:
+        """
+        Get a structural summary of the given SPARQL query
+        Args:
+            query: SPARQL query
+
+        Returns:
+            counts of the triple patterns, OPTIONALs, UNIONs, property paths, SERVICE calls,
+            subqueries, FILTERs and GROUP BY/ORDER BY clauses
+
+        Raises:
+            Exception: if the query can not be parsed
+        """
+        prepared_query = query
+        if cls.has_parameter(prepared_query):
+            prepared_query = cls.fill_with_sample_query_parameters(prepared_query)
+        if cls.has_blazegraph_with_clause(prepared_query):
+            prepared_query = cls.transform_with_clause_to_subquery(prepared_query)
+        parsed_query = parseQuery(cls._add_prefixes(cls.get_prefix_luts(), prepared_query))
+        structure = {
+            "triple_patterns": 0,
+            "optionals": 0,
+            "unions": 0,
+            "property_paths": 0,
+            "services": 0,
+            "subqueries": 0,
+            "filters": 0,
+            "group_by": 0,
+            "order_by": 0,
+        }
+        counted = {
+            "OptionalGraphPattern": "optionals",
+            "ServiceGraphPattern": "services",
+            "SubSelect": "subqueries",
+            "Filter": "filters",
+            "GroupClause": "group_by",
+            "OrderClause": "order_by",
+        }
+        elements = parsed_query.as_list()
+        while elements:
+            element = elements.pop()
+            if isinstance(element, CompValue):
+                if element.name == "PathAlternative":
+                    # paths contain no further patterns
+                    if cls.is_property_path(element):
+                        structure["property_paths"] += 1
+                    continue
+                if element.name == "TriplesBlock":
+                    # each subject with its predicate object list is flattened to s p o s p o ...
+                    structure["triple_patterns"] += sum(len(triples) // 3 for triples in element["triples"])
+                elif element.name == "GroupOrUnionGraphPattern":
+                    structure["unions"] += len(element["graph"]) - 1
+                elif element.name in counted:
+                    structure[counted[element.name]] += 1
+                elements.extend(element.values())
+            elif isinstance(element, dict):
+                elements.extend(element.values())
+            elif isinstance(element, Iterable) and not isinstance(element, str):
+                elements.extend(element)
+        return structure
+
+    @classmethod
+    def is_property_path(cls, path: CompValue) -> bool:
+        """
+        Check if the given parsed predicate is a property path and not a plain iri
+        """
+        sequences = path["part"]
+        if len(sequences) != 1 or len(sequences[0]["part"]) != 1:
+            return True
+        path_element = sequences[0]["part"][0]
+        # CompValue.get returns the key for missing values
+        if path_element.name != "PathElt" or "mod" in path_element:
+            return True
+        part = path_element["part"]
+        return isinstance(part, CompValue) and part.name != "pname"
+
     @classmethod
     def transform_with_clause_to_subquery(cls, query: str) -> str:
         """
@@ -244,9 +336,7 @@ class SparqlAnalyzer:
 
     @classmethod
     def get_query_parameter(cls, query: str) -> set[str]:
-        env = Environment()
-        ast = env.parse(query)
-        params = meta.find_undeclared_variables(ast)
+        params = set(parse_query_parameter(query))
         return params
 
     @classmethod
@@ -276,7 +366,7 @@ class SparqlAnalyzer:
         Returns:
             Query with parameters binded
         """
-        template = Template(query)
+        template = compile_query_template(query)
         query_with_param_values = template.render(**params)
         return query_with_param_values
 
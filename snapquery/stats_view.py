@@ -1,7 +1,9 @@
 import plotly.express as px
+from ngwidgets.lod_grid import ListOfDictsGrid
 from nicegui import ui
 from pandas import DataFrame
 
+from snapquery.metrics import SnapQueryMetrics
 from snapquery.query_annotate import QUERY_ITEM_STATS
 
 
@@ -33,7 +35,24 @@ class QueryStatsView:
                 self.show_function_usage()
                 self.show_namespace_usage()
             with ui.expansion(text="Query Stats", value=True):
-                ui.label("ToDo:")
+                ui.label("Slow queries ranked by count and average duration")
+                self.slow_query_grid = ListOfDictsGrid()
+                ui.timer(0.0, self.show_slow_queries, once=True)
+
+    async def show_slow_queries(self):
+        """
+        show the slow query offenders
+        """
+        try:
+            lod = await SnapQueryMetrics.get_instance().io_bound(self.nqm.get_slow_queries)
+            for record in lod:
+                for key in ["avg_duration", "max_duration", "avg_first_byte", "avg_transfer", "avg_parse"]:
+                    if record.get(key) is not None:
+                        record[key] = round(record[key], 3)
+            self.slow_query_grid.load_lod(lod)
+            self.slow_query_grid.update()
+        except Exception as ex:
+            self.solution.handle_exception(ex)
 
     def show_entity_usage(self):
         """
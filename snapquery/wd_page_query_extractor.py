@@ -18,6 +18,8 @@ from typing import List, Optional
 import wikitextparser as wtp
 from wikitextparser import Section, Template
 
+from snapquery.bulk_import import BulkImporter
+from snapquery.short_url_resolver import ShortUrlResolver
 from snapquery.snapquery_core import NamedQuery, NamedQueryManager, NamedQuerySet, QueryName
 from snapquery.wd_short_url import ShortUrl, Wikidata
 
@@ -79,6 +81,15 @@ class WikidataQueryExtractor:
             domain=self.domain, namespace=self.namespace, target_graph_name=self.target_graph_name
         )
         self.errors: List[str] = []
+        self.short_url_resolver = None
+
+    def get_short_url_resolver(self) -> ShortUrlResolver:
+        """
+        get the (lazily created) resolver for short URLs
+        """
+        if self.short_url_resolver is None:
+            self.short_url_resolver = ShortUrlResolver(debug=self.debug)
+        return self.short_url_resolver
 
     def log(self, message: str, is_error: bool = False):
         """
@@ -156,6 +167,8 @@ class WikidataQueryExtractor:
             markup (str): The wikimarkup content of a section.
         """
         matches = self.RE_SHORT_URL_BLOCK.findall(markup)
+        # resolve all short urls of the markup concurrently
+        resolutions = self.get_short_url_resolver().resolve_all([short_url for _, short_url, _ in matches])
 
         for pre_text, short_url, post_text in matches:
             self.log(f"Processing short URL: {short_url}")
@@ -174,11 +187,12 @@ class WikidataQueryExtractor:
                 self.log(f"Query {title} ({query_name.query_id}) already exists. Skipping.", is_error=True)
                 continue
 
-            # This handles fetching the SPARQL from the short URL redirection
-            sparql_query = short_url_instance.read_query()
+            # the SPARQL from the short URL redirection
+            resolution = resolutions[short_url]
+            sparql_query = resolution.sparql
 
-            if short_url_instance.error:
-                self.log(f"Error reading query from {short_url}: {short_url_instance.error}", is_error=True)
+            if resolution.error:
+                self.log(f"Error reading query from {short_url}: {resolution.error}", is_error=True)
                 continue
 
             if sparql_query:
@@ -285,9 +299,10 @@ class WikidataQueryExtractor:
 
     def store_queries(self):
         """
-        Store the extracted queries into the main NamedQueryManager instance.
+        Store the extracted queries and their details into the main NamedQueryManager instance.
         """
-        self.nqm.store_named_query_list(self.named_query_list)
+        bulk_importer = BulkImporter(self.nqm, debug=self.debug)
+        bulk_importer.import_query_set(self.named_query_list)
 
     def show_queries(self):
         """
@@ -10,7 +10,6 @@ import urllib.parse
 from typing import Optional, Set
 
 import requests
-import tqdm
 from ngwidgets.llm import LLM
 from ratelimit import limits, sleep_and_retry
 
@@ -48,6 +47,25 @@ class ShortIds:
 
         return value
 
+    def int_to_id(self, value: int, k: int = 4) -> str:
+        """
+        Convert an integer to an ID string of my base character set.
+
+        Args:
+            value (int): The integer value to convert.
+            k (int): the minimum length of the ID - padded with the first base char
+
+        Returns:
+            str: The ID string.
+        """
+        base = len(self.base_chars)
+        chars = []
+        while value > 0:
+            value, remainder = divmod(value, base)
+            chars.append(self.base_chars[remainder])
+        id_str = "".join(reversed(chars)).rjust(k, self.base_chars[0])
+        return id_str
+
     def get_random(self, k: int = 4) -> str:
         """
         get a random short id
@@ -225,77 +243,40 @@ SPARQL: {sparql}
         with_llm=False,
         with_progress: bool = False,
         debug=False,
+        namer=None,
     ) -> NamedQuerySet:
         """
         Read a specified number of random queries from a list of short URLs.
 
+        The random ids are probed concurrently and remembered as hit or miss
+        in the persistent short url cache - see ShortUrlSampler.
+
         Args:
             nqm (NamedQueryManager): optional NamedQueryManager
             namespace (str): the name to use for the named query list
             count (int): Number of random URLs to fetch.
             max_postfix (str): the maximum ID to try
+            with_llm (bool): if True name the queries in batches with the default LLM
             with_progress (bool): if True show progress
+            namer (QueryNamer): optional batch namer e.g. with a local HeuristicNamingBackend
 
         Returns:
             NamedQueryList: A NamedQueryList containing the queries read from the URLs.
         """
-        if with_llm:
-            llm = cls.get_llm()
-        short_ids = ShortIds()
-        base_url = "https://w.wiki/"
-        domain = "wikidata.org"
-        if nqm is None:
-            unique_urls = set()
-            unique_names = set()
-        else:
-            unique_urls, unique_names = nqm.get_unique_sets(namespace=namespace, domain=domain)
-
-        nq_set = NamedQuerySet(domain=domain, namespace=namespace, target_graph_name="wikidata")
-        give_up = (
-            count * 15
-        )  # heuristic factor for probability that a short url points to a wikidata entry - 14 has worked so far
-        max_short_int = short_ids.id_to_int(max_postfix)
-        pbar = tqdm.tqdm(total=count, disable=not with_progress or debug, desc="Fetching queries")
-        while len(unique_urls) < count and give_up > 0:
-            # Generate a 4-char base36 string
-            postfix = short_ids.get_random()
-            if short_ids.id_to_int(postfix) > max_short_int:
-                continue
-            if debug:
-                print(f"{give_up:4}:{postfix}")
-            wd_short_url = f"{base_url}{postfix}"
-            short_url = cls(short_url=wd_short_url)
-            short_url.read_query()
-            if short_url.sparql and not short_url.error:
-                nq = NamedQuery(
-                    domain=nq_set.domain,
-                    name=postfix,
-                    namespace=nq_set.namespace,
-                    url=wd_short_url,
-                    sparql=short_url.sparql,
-                )
-                if with_llm:
-                    try:
-                        llm_nq = short_url.ask_llm_for_name_and_title(llm=llm, nq=nq, unique_names=unique_names)
-                        # try again with a different url to avoid name clash
-                        if llm_nq is None:
-                            give_up -= 1
-                            continue
-                    except Exception as ex:
-                        if debug:
-                            print(f"Failed to get LLM response: {str(ex)}")
-                        continue
-                nq_set.queries.append(nq)
-                unique_urls.add(nq.url)
-                unique_names.add(nq.name)
-                if with_progress:
-                    pbar.update(1)
-                if debug:
-                    print(nq)
-            else:
-                give_up -= 1
-        if with_progress:
-            pbar.close()
+        # imported here since the sampler and namer build on the ShortUrl resolution
+        from snapquery.query_namer import LLMNamingBackend, QueryNamer
+        from snapquery.short_url_sampler import ShortUrlSampler
+
+        if namer is None and with_llm:
+            namer = QueryNamer(LLMNamingBackend(cls.get_llm()), debug=debug)
+        sampler = ShortUrlSampler(max_postfix=max_postfix, debug=debug)
+        nq_set = sampler.get_query_set(
+            namespace=namespace,
+            count=count,
+            nqm=nqm,
+            namer=namer,
+            with_progress=with_progress and not debug,
+        )
         return nq_set
 
     def read_query(self) -> str:
@@ -307,12 +288,28 @@ SPARQL: {sparql}
         """
         self.fetch_final_url(self.short_url)
         if self.url:
-            parsed_url = urllib.parse.urlparse(self.url)
-            if parsed_url.scheme == self.scheme and parsed_url.netloc == self.netloc:
-                if parsed_url.fragment:
-                    self.sparql = urllib.parse.unquote(parsed_url.fragment)
-                else:
-                    query_params = urllib.parse.parse_qs(parsed_url.query)
-                    if "query" in query_params:
-                        self.sparql = query_params["query"][0]
+            sparql = self.sparql_from_url(self.url)
+            if sparql:
+                self.sparql = sparql
         return self.sparql
+
+    def sparql_from_url(self, url: str) -> Optional[str]:
+        """
+        Extract the SPARQL query from the given final (redirected) URL.
+
+        Args:
+            url (str): the final URL e.g. https://query.wikidata.org/#SELECT...
+
+        Returns:
+            Optional[str]: The SPARQL query or None if the URL does not contain a query.
+        """
+        sparql = None
+        parsed_url = urllib.parse.urlparse(url)
+        if parsed_url.scheme == self.scheme and parsed_url.netloc == self.netloc:
+            if parsed_url.fragment:
+                sparql = urllib.parse.unquote(parsed_url.fragment)
+            else:
+                query_params = urllib.parse.parse_qs(parsed_url.query)
+                if "query" in query_params:
+                    sparql = query_params["query"][0]
+        return sparql
@@ -0,0 +1,75 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import tempfile
+
+from basemkit.basetest import Basetest
+
+from snapquery.bulk_import import BulkImporter
+from snapquery.snapquery_core import NamedQueryManager, NamedQuerySet
+
+
+class TestBulkImport(Basetest):
+    """
+    test the bulk import of named queries
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_bulk_import(self):
+        """
+        test bulk importing the scholia sample query set
+        sequentially and with a process pool
+        """
+        for min_parallel in [100000, 1]:
+            with self.subTest(min_parallel=min_parallel):
+                with tempfile.NamedTemporaryFile() as tmpfile:
+                    nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+                    json_file = os.path.join(nqm.samples_path, "scholia.json")
+                    nq_set = NamedQuerySet.load_from_json_file(json_file)  # @UndefinedVariable
+                    bulk_importer = BulkImporter(nqm, batch_size=100, max_workers=2, min_parallel=min_parallel)
+                    stats = bulk_importer.import_query_set(nq_set)
+                    if self.debug:
+                        print(stats)
+                    self.assertEqual(len(nq_set), stats.rows)
+                    self.assertEqual(4, stats.batches)
+                    params = (nq_set.domain, nq_set.namespace)
+                    records = nqm.sql_db.query(
+                        "SELECT COUNT(*) AS count FROM NamedQuery WHERE domain=? AND namespace=?", params
+                    )
+                    self.assertEqual(len(nq_set), records[0]["count"])
+                    records = nqm.sql_db.query(
+                        """SELECT COUNT(*) AS count FROM QueryDetails qd
+JOIN NamedQuery nq ON qd.query_id=nq.query_id
+WHERE nq.domain=? AND nq.namespace=?""",
+                        params,
+                    )
+                    self.assertEqual(len(nq_set), records[0]["count"])
+                    # re-import is an upsert
+                    stats = bulk_importer.import_query_set(nq_set)
+                    records = nqm.sql_db.query(
+                        "SELECT COUNT(*) AS count FROM NamedQuery WHERE domain=? AND namespace=?", params
+                    )
+                    self.assertEqual(len(nq_set), records[0]["count"])
+
+    def test_skip_without_sparql(self):
+        """
+        test that queries without sparql are counted as skipped
+        """
+        with tempfile.NamedTemporaryFile() as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            json_file = os.path.join(nqm.samples_path, "scholia.json")
+            nq_set = NamedQuerySet.load_from_json_file(json_file)  # @UndefinedVariable
+            nq_set.queries[0].sparql = None
+            bulk_importer = BulkImporter(nqm, batch_size=100)
+            stats = bulk_importer.import_query_set(nq_set)
+            if self.debug:
+                print(stats)
+            self.assertEqual(1, stats.skipped)
+            self.assertEqual(len(nq_set) - 1, stats.rows)
+            self.assertIn("1 skipped without sparql", str(stats))
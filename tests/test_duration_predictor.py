@@ -0,0 +1,92 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import tempfile
+
+from basemkit.basetest import Basetest
+
+from snapquery.duration_predictor import DurationPredictor
+from snapquery.execution import Execution
+from snapquery.local_endpoint import LocalEndpointConfig, LocalSparqlEndpoint
+from snapquery.snapquery_core import NamedQueryManager, QueryName
+
+
+class TestDurationPredictor(Basetest):
+    """
+    test the duration prediction from historical query stats
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_predict(self):
+        """
+        test the rolling statistics and the fallback to similar queries
+        """
+        predictor = DurationPredictor(window=5)
+        predictor.sizes = {"small": 100, "small2": 120, "large": 5000, "new": 110}
+        for duration in [9.0, 1.0, 2.0, 3.0, 4.0, 5.0]:
+            predictor.add("small", "ep", duration)
+        predictor.add("small2", "ep", 2.5)
+        predictor.add("large", "ep", 50.0)
+        predictor.add("large", "ep", None, "Timeout")
+        predictor.add("large", "ep", None, "Syntax Error")
+        small = predictor.predict("small", "ep")
+        # the first duration has left the window
+        self.assertEqual(("history", 5, 3.0, 5.0), (small.source, small.count, small.duration, small.upper))
+        large = predictor.predict("large", "ep")
+        self.assertEqual((50.0, 1), (large.duration, large.timeouts))
+        new = predictor.predict("new", "ep")
+        self.assertEqual(("structure", 2.75), (new.source, new.duration))
+        unknown = predictor.predict("small", "other")
+        self.assertFalse(unknown.known)
+        self.assertEqual(15.0, predictor.get_timeout("small", "ep"))
+        self.assertEqual(10.0, predictor.get_timeout("small2", "ep"))
+        self.assertEqual(120.0, predictor.get_timeout("small", "other"))
+        # queries of unknown size are not estimated from the other queries of the endpoint
+        self.assertFalse(predictor.predict("unknown", "ep").known)
+        self.assertEqual(120.0, predictor.get_timeout("unknown", "ep"))
+        predictor.sizes["huge"] = 100000
+        self.assertFalse(predictor.predict("huge", "ep").known)
+        # and kept last
+        query_ids = ["unknown", "large", "small", "small2"]
+        self.assertEqual(["small2", "small", "large", "unknown"], predictor.order(query_ids, "ep"))
+        self.assertEqual(["large", "small", "small2", "unknown"], predictor.order(query_ids, "ep", longest_first=True))
+        # without any history the order is kept
+        self.assertEqual(["small2", "small"], predictor.order(["small2", "small"], "other"))
+
+    def test_history(self):
+        """
+        test predictions from executions on the local endpoint
+        """
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            execution = Execution(nqm)
+            queries = {}
+            for name in ["cats", "bands"]:
+                query_name = QueryName(name=name, namespace="snapquery-examples", domain="wikidata.org")
+                queries[name] = nqm.lookup(query_name)
+            for name, latency in [("bands", 0.01), ("cats", 0.2)]:
+                config = LocalEndpointConfig(name="local", latency=latency)
+                with LocalSparqlEndpoint(config) as local:
+                    local.register(nqm)
+                    for i in range(2):
+                        execution.execute(
+                            queries[name], "local", title=f"{name} {i}", context="prediction", adaptive_timeout=True
+                        )
+            cats = nqm.predict_duration(queries["cats"].query_id, "local")
+            bands = nqm.predict_duration(queries["bands"].query_id, "local")
+            if self.debug:
+                print(cats, bands)
+            # stats stored twice by the execution are only counted once
+            self.assertEqual(("history", 2), (cats.source, cats.count))
+            self.assertGreater(cats.duration, bands.duration)
+            ordered = execution.order_queries(list(queries.values()), "local", "longest")
+            self.assertEqual(["cats", "bands"], [nq.name for nq in ordered])
+            # a fresh predictor is loaded from the stored QueryStats
+            nqm.duration_predictor = None
+            reloaded = nqm.predict_duration(queries["cats"].query_id, "local")
+            self.assertAlmostEqual(cats.duration, reloaded.duration)
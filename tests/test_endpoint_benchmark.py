@@ -0,0 +1,119 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from basemkit.basetest import Basetest
+from lodstorage.query import Endpoint
+
+from snapquery.endpoint_benchmark import EndpointBenchmark, EndpointBenchmarkResult
+from snapquery.snapquery_core import NamedQuery, NamedQueryManager
+
+
+class JsonResultHandler(BaseHTTPRequestHandler):
+    """
+    answer every SPARQL query with two bindings after the latency given by the path
+    """
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        if self.path == "/broken":
+            self.send_response(500)
+            self.end_headers()
+            return
+        time.sleep(float(self.path.strip("/")))
+        result = {
+            "head": {"vars": ["cat"]},
+            "results": {
+                "bindings": [
+                    {"cat": {"type": "uri", "value": "http://www.wikidata.org/entity/Q1"}},
+                    {"cat": {"type": "uri", "value": "http://www.wikidata.org/entity/Q2"}},
+                ]
+            },
+        }
+        body = json.dumps(result).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/sparql-results+json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestEndpointBenchmark(Basetest):
+    """
+    test the endpoint benchmark runner
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_percentile(self):
+        """
+        test the interpolated percentiles
+        """
+        values = [float(i) for i in range(1, 101)]
+        self.assertAlmostEqual(50.5, EndpointBenchmarkResult.percentile(values, 50))
+        self.assertAlmostEqual(99.01, EndpointBenchmarkResult.percentile(values, 99))
+        self.assertEqual(3.0, EndpointBenchmarkResult.percentile([3.0], 90))
+
+    def test_benchmark(self):
+        """
+        test benchmarking a query on a fast, a slow and a broken endpoint
+        """
+        server = ThreadingHTTPServer(("127.0.0.1", 0), JsonResultHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+                nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+                for name, path in [("fast", "0.01"), ("slow", "0.05"), ("broken", "broken")]:
+                    url = f"http://127.0.0.1:{server.server_port}/{path}"
+                    nqm.endpoints[name] = Endpoint(name=name, endpoint=url, method="POST")
+                nq = NamedQuery(
+                    domain="example.org",
+                    namespace="benchmark",
+                    name="cats",
+                    sparql="SELECT ?cat WHERE { ?cat ?p ?o }",
+                )
+                benchmark = EndpointBenchmark(
+                    nqm,
+                    endpoint_names=["fast", "slow", "broken"],
+                    warmup=1,
+                    repetitions=6,
+                    concurrency_levels=[1, 3],
+                    cooldown=0,
+                )
+                results = benchmark.run([nq])
+                self.assertEqual(6, len(results))
+                by_key = {(result.endpoint_name, result.concurrency): result for result in results}
+                fast = by_key[("fast", 1)]
+                self.assertEqual((6, 0, 2), (fast.runs, fast.errors, fast.records))
+                self.assertTrue(fast.p50 <= fast.p90 <= fast.p99 <= fast.max)
+                self.assertTrue(by_key[("slow", 1)].p50 > fast.p50)
+                # concurrent clients raise the throughput
+                self.assertTrue(by_key[("slow", 3)].throughput > by_key[("slow", 1)].throughput)
+                self.assertEqual(0, by_key[("broken", 1)].runs)
+                self.assertIsNotNone(by_key[("broken", 1)].error_msg)
+                stored = nqm.sql_db.query("SELECT * FROM EndpointBenchmarkResult WHERE run_id=?", (benchmark.run_id,))
+                self.assertEqual(6, len(stored))
+                # the result table is registered by the manager itself
+                primary_keys = NamedQueryManager(db_path=tmpfile.name).primary_keys
+                self.assertEqual("result_id", primary_keys[EndpointBenchmarkResult])
+                report = EndpointBenchmark.get_report(results)
+                if self.debug:
+                    print(report)
+                self.assertIn("fast: 2", report)
+        finally:
+            server.shutdown()
+            server.server_close()
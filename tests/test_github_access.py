@@ -0,0 +1,117 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import requests
+from basemkit.basetest import Basetest
+
+from snapquery.github_access import GitHub
+from snapquery.query_set_cmd import QuerySetCmd, QuerySetCmdVersion
+from snapquery.snapquery_core import NamedQuerySet
+
+
+class StubSession(requests.Session):
+    """
+    a session answering the GitHub API and raw download requests from memory
+    """
+
+    def __init__(self, files: dict):
+        super().__init__()
+        self.files = files
+        self.requests = []
+
+    def get(self, url, headers=None, params=None, timeout=None, **kwargs):
+        headers = headers or {}
+        self.requests.append(url)
+        response = requests.Response()
+        response.url = url
+        if "/git/trees/" in url:
+            etag = '"tree-1"'
+            if headers.get("If-None-Match") == etag:
+                response.status_code = 304
+            else:
+                tree = [{"path": "sessions", "type": "tree"}]
+                for i, path in enumerate(self.files):
+                    tree.append({"path": path, "type": "blob", "sha": f"sha{i}", "size": len(self.files[path])})
+                response.status_code = 200
+                response.headers["ETag"] = etag
+                response._content = json.dumps({"tree": tree, "truncated": False}).encode()
+        else:
+            path = url.split("/HEAD/", 1)[1]
+            response.status_code = 200
+            response._content = self.files[path].encode()
+        return response
+
+
+class TestGitHubAccess(Basetest):
+    """
+    test the GitHub API client
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_tree_listing_and_downloads(self):
+        """
+        test listing a repository tree with a single call,
+        revalidating it from the disk cache and downloading blobs concurrently
+        """
+        files = {f"sessions/q{i}.rq": f"SELECT * WHERE {{ ?s ?p {i} }}" for i in range(7)}
+        files["README.md"] = "# sessions"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = Path(tmpdir) / "github"
+            session = StubSession(files)
+            github = GitHub(owner="hartig", repo="ExploratoryQueryingSessions", session=session, cache_dir=cache_dir)
+            # the cache directory is only created on the first write
+            self.assertFalse(cache_dir.exists())
+            files = github.list_files_recursive("/sessions", suffix=".rq")
+            self.assertEqual(7, len(files))
+            for file_info in files:
+                self.assertTrue(file_info["path"].startswith("sessions/"))
+                self.assertIsNotNone(file_info["sha"])
+            # second listing is revalidated with If-None-Match
+            files_again = github.list_files_recursive("/sessions", suffix=".rq")
+            self.assertEqual(files, files_again)
+            contents = github.download_all(files[:5])
+            self.assertEqual(5, len(contents))
+            # blobs are now cached by sha
+            request_count = len(session.requests)
+            for file_info in files[:5]:
+                blob_path = github.cache_dir / "blobs" / file_info["sha"]
+                self.assertTrue(blob_path.exists())
+                self.assertEqual(contents[file_info["path"]], github.download_file(file_info))
+            self.assertEqual(request_count, len(session.requests))
+            uncached = GitHub(owner="hartig", repo="ExploratoryQueryingSessions", session=session, with_cache=False)
+            self.assertIsNone(uncached.cache_dir)
+            self.assertEqual(files, uncached.list_files_recursive("/sessions", suffix=".rq"))
+
+    def test_incremental_cmd(self):
+        """
+        test extracting the queries of a repository with the --incremental option
+        of the query-set command line
+        """
+        files = {f"sessions/q{i}.rq": f"SELECT * WHERE {{ ?s ?p {i} }}" for i in range(3)}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            session = StubSession(files)
+
+            def get_github(owner: str, repo: str, branch: str = None) -> GitHub:
+                github = GitHub(owner=owner, repo=repo, branch=branch, session=session, cache_dir=Path(tmpdir))
+                return github
+
+            output = Path(tmpdir) / "queries.yaml"
+            argv = ["--github", "hartig/sessions", "--github-path", "sessions", "--github-extension", ".rq"]
+            argv += ["--incremental", "-o", str(output)]
+            with patch("snapquery.scholia.GitHub", side_effect=get_github):
+                expected_counts = [3, 0]
+                for expected_count in expected_counts:
+                    exit_code = QuerySetCmd.main(QuerySetCmdVersion(), argv)
+                    self.assertEqual(0, exit_code)
+                    nq_set = NamedQuerySet.load_from_yaml_file(str(output))  # @UndefinedVariable
+                    self.assertEqual(expected_count, len(nq_set.queries))
@@ -0,0 +1,101 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import tempfile
+import time
+
+from basemkit.basetest import Basetest
+
+from snapquery.error_filter import ErrorFilter
+from snapquery.local_endpoint import LocalEndpointConfig, LocalSparqlEndpoint
+from snapquery.snapquery_core import NamedQuery, NamedQueryManager, QueryName
+
+
+class TestLocalEndpoint(Basetest):
+    """
+    test the local stand-in SPARQL endpoint
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmpfile = tempfile.NamedTemporaryFile(suffix=".db")
+        self.nqm = NamedQueryManager.from_samples(db_path=self.tmpfile.name)
+
+    def tearDown(self):
+        self.tmpfile.close()
+        Basetest.tearDown(self)
+
+    def get_query(self, name: str) -> NamedQuery:
+        query_name = QueryName(name=name, namespace="snapquery-examples", domain="wikidata.org")
+        return self.nqm.lookup(query_name)
+
+    def test_sample_queries(self):
+        """
+        test the sample queries on the fixture graph
+        """
+        with LocalSparqlEndpoint() as local:
+            local.register(self.nqm)
+            for name, expected in [("cats", 5), ("bands", 2), ("horses", 3)]:
+                lod, stats = self.nqm.execute_query(self.get_query(name), params_dict={}, endpoint_name="local")
+                if self.debug:
+                    print(lod)
+                self.assertIsNone(stats.error_msg)
+                self.assertEqual(expected, len(lod))
+            query_bundle = self.nqm.as_query_bundle(self.get_query("bands"), "local")
+            records = list(query_bundle.iter_records(timeout=5))
+            self.assertEqual({"Muse", "Metallica"}, {record["bandLabel"] for record in records})
+            self.assertIn("<sparql", query_bundle.raw_query("xml", mime_type="application/sparql-results+xml"))
+
+    def test_injected_errors(self):
+        """
+        test that the injected errors reach the expected ErrorFilter categories
+        """
+        expected_categories = {
+            "429": "Too Many Requests",
+            "503": "Service Unavailable",
+            "504": "Timeout",
+            "virtuoso": "Syntax Error",
+            "qlever": "Syntax Error",
+        }
+        expected_messages = {
+            "504": "Query has timed out.",
+            "virtuoso": "Virtuoso 37000 Error SP030",
+            "qlever": "Not supported",
+        }
+        cats = self.get_query("cats")
+        for error_kind, expected_category in expected_categories.items():
+            config = LocalEndpointConfig(name=f"local-{error_kind}", error_rate=1.0, error_kind=error_kind)
+            with LocalSparqlEndpoint(config) as local:
+                local.register(self.nqm)
+                lod, stats = self.nqm.execute_query(cats, params_dict={}, endpoint_name=config.name)
+                self.assertEqual([], lod)
+                error_filter = ErrorFilter(stats.error_msg)
+                if self.debug:
+                    print(f"{error_kind}: {error_filter.category} {error_filter.get_message(for_html=False)}")
+                self.assertEqual(expected_category, error_filter.category, error_kind)
+                if error_kind in expected_messages:
+                    self.assertIn(expected_messages[error_kind], error_filter.get_message(for_html=False))
+
+    def test_error_rate_and_load(self):
+        """
+        test the seeded error rate, the latency and the repeated results
+        """
+        error_counts = []
+        for _ in range(2):
+            config = LocalEndpointConfig(error_rate=0.3, seed=7, latency=0.02, repeat=1000)
+            with LocalSparqlEndpoint(config) as local:
+                local.register(self.nqm)
+                cats = self.get_query("cats")
+                start = time.time()
+                for _ in range(10):
+                    lod, stats = self.nqm.execute_query(cats, params_dict={}, endpoint_name="local")
+                    if not stats.error_msg:
+                        self.assertEqual(5000, len(lod))
+                self.assertGreaterEqual(time.time() - start, 0.2)
+                self.assertEqual(10, local.query_count)
+                error_counts.append(local.error_count)
+        self.assertEqual(error_counts[0], error_counts[1])
+        self.assertTrue(0 < error_counts[0] < 10)
@@ -0,0 +1,101 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import subprocess
+import tempfile
+from unittest.mock import patch
+
+from basemkit.basetest import Basetest
+
+from snapquery.local_repository import LocalRepository
+from snapquery.query_set_cmd import QuerySetCmd, QuerySetCmdVersion
+from snapquery.scholia import GitHubQueries
+from snapquery.snapquery_core import NamedQueryManager, NamedQuerySet
+
+
+class TestLocalRepository(Basetest):
+    """
+    test importing queries from a local git checkout
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.repo_path = os.path.join(self.tmpdir.name, "queries")
+        self.queries = {
+            "sessions/a/cats.rq": "SELECT ?cat WHERE { ?cat wdt:P31 wd:Q146 }",
+            "sessions/b/horses.rq": "SELECT ?horse WHERE { ?horse wdt:P31 wd:Q726 }",
+            "README.md": "# test queries",
+        }
+        for path, content in self.queries.items():
+            full_path = os.path.join(self.repo_path, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w") as f:
+                f.write(content)
+        for git_args in [
+            ["init", "-q"],
+            ["add", "."],
+            ["-c", "user.name=test", "-c", "user.email=test@example.org", "commit", "-qm", "queries"],
+        ]:
+            subprocess.run(["git", "-C", self.repo_path, *git_args], check=True)
+        self.cache_dir = os.path.join(self.tmpdir.name, "cache")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        Basetest.tearDown(self)
+
+    def test_listing_and_reading(self):
+        """
+        test listing and reading files from the working tree and via git plumbing
+        """
+        for branch in [None, "HEAD"]:
+            with self.subTest(branch=branch):
+                local_repo = LocalRepository(self.repo_path, branch=branch, cache_dir=self.cache_dir)
+                self.assertEqual(branch is not None, local_repo.use_git)
+                files = local_repo.list_files_recursive("/sessions", suffix=".rq")
+                self.assertEqual(["sessions/a/cats.rq", "sessions/b/horses.rq"], [f["path"] for f in files])
+                contents = local_repo.download_all(files)
+                self.assertEqual(2, len(contents))
+                for file_info in files:
+                    content = self.queries[file_info["path"]]
+                    self.assertEqual(content, contents[file_info["path"]])
+                    self.assertEqual(content, local_repo.download_file(file_info))
+
+    def test_import(self):
+        """
+        test importing a local checkout incrementally
+        """
+        with tempfile.NamedTemporaryFile() as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            local_repo = LocalRepository(self.repo_path, cache_dir=self.cache_dir)
+            gh_queries = GitHubQueries(
+                nqm, owner="test", repo="queries", path="sessions", extension=".rq", github=local_repo
+            )
+            gh_queries.extract_queries(only_changed=True)
+            self.assertEqual(2, len(gh_queries.named_query_set))
+            gh_queries.store_queries()
+            # nothing changed
+            gh_queries = GitHubQueries(
+                nqm, owner="test", repo="queries", path="sessions", extension=".rq", github=local_repo
+            )
+            gh_queries.extract_queries(only_changed=True)
+            self.assertEqual(0, len(gh_queries.named_query_set))
+
+    def test_incremental_cmd(self):
+        """
+        test the --local-repo option of the query-set command line with --incremental
+        """
+        output = os.path.join(self.tmpdir.name, "queries.yaml")
+        argv = ["--github", "test/queries", "--local-repo", self.repo_path, "--github-path", "sessions"]
+        argv += ["--github-extension", ".rq", "--incremental", "-o", output]
+        # the import state is kept in the default cache directory below the home directory
+        with patch.dict(os.environ, {"HOME": self.tmpdir.name}):
+            for expected_count in [2, 0]:
+                exit_code = QuerySetCmd.main(QuerySetCmdVersion(), argv)
+                self.assertEqual(0, exit_code)
+                nq_set = NamedQuerySet.load_from_yaml_file(output)  # @UndefinedVariable
+                self.assertEqual(expected_count, len(nq_set.queries))
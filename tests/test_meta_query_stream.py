@@ -0,0 +1,70 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import csv
+import io
+import json
+import sqlite3
+import tempfile
+
+from basemkit.basetest import Basetest
+
+from snapquery.meta_query_stream import MetaQueryStream
+from snapquery.query_set_tool import QuerySetTool
+from snapquery.snapquery_core import NamedQueryManager
+
+
+class TestMetaQueryStream(Basetest):
+    """
+    test paginated and streamed meta queries
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_pagination_and_streaming(self):
+        """
+        test limit/offset and keyset pagination pushed into SQL
+        """
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            QuerySetTool(nqm=nqm).import_samples(with_store=True, show_progress=self.debug)
+            query = nqm.meta_qm.queriesByName["all_queries"]
+            all_ids = sorted(record["query_id"] for record in nqm.sql_db.query(query.query))
+            self.assertTrue(len(all_ids) > 4)
+            stream = MetaQueryStream(nqm.sql_db, query, limit=2, offset=1, key="query_id")
+            self.assertEqual(all_ids[1:3], [record["query_id"] for record in stream.get_lod()])
+            # keyset pagination over all pages
+            paged_ids = []
+            after = None
+            while True:
+                stream = MetaQueryStream(nqm.sql_db, query, limit=3, key="query_id", after=after)
+                page = [record["query_id"] for record in stream.get_lod()]
+                if not page:
+                    break
+                paged_ids.extend(page)
+                after = page[-1]
+            self.assertEqual(all_ids, paged_ids)
+            # streamed json and csv
+            stream = MetaQueryStream(nqm.sql_db, query, limit=2, key="query_id")
+            records = json.loads("".join(stream.json_chunks()))
+            self.assertEqual(all_ids[:2], [record["query_id"] for record in records])
+            stream = MetaQueryStream(nqm.sql_db, query, limit=2, key="query_id")
+            rows = list(csv.DictReader(io.StringIO("".join(stream.csv_chunks()))))
+            self.assertEqual(all_ids[:2], [row["query_id"] for row in rows])
+            empty = MetaQueryStream(nqm.sql_db, query, key="query_id", after="\U0010ffff")
+            self.assertEqual([], json.loads("".join(empty.json_chunks())))
+            # an opened stream whose body is never iterated is closed explicitly
+            unread = MetaQueryStream(nqm.sql_db, query, limit=2, key="query_id")
+            unread.open()
+            connection = unread.stream_db.c
+            unread.close()
+            unread.close()
+            self.assertIsNone(unread.stream_db)
+            with self.assertRaises(sqlite3.ProgrammingError):
+                connection.execute("SELECT 1")
+            with self.assertRaises(ValueError):
+                MetaQueryStream(nqm.sql_db, query, key="query_id; DROP TABLE NamedQuery")
@@ -0,0 +1,90 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from basemkit.basetest import Basetest
+
+from snapquery.local_endpoint import LocalEndpointConfig, LocalSparqlEndpoint
+from snapquery.metrics import Counter, Histogram, MetricsRegistry, SnapQueryMetrics, TaskCounter
+from snapquery.snapquery_core import NamedQueryManager, QueryName
+
+
+class TestMetrics(Basetest):
+    """
+    test the operational metrics
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_exposition_format(self):
+        """
+        test the Prometheus text exposition format of counters and histograms
+        """
+        registry = MetricsRegistry()
+        counter = registry.register(Counter("test_errors_total", "errors", ["category"]))
+        histogram = registry.register(Histogram("test_duration_seconds", "durations", ["route"], buckets=(0.1, 1.0)))
+        counter.inc(category='say "hi"')
+        counter.inc(2, category='say "hi"')
+        for value in [0.05, 0.1, 0.5, 2.0]:
+            histogram.observe(value, route="/a")
+        text = registry.render()
+        if self.debug:
+            print(text)
+        self.assertIn('test_errors_total{category="say \\"hi\\""} 3', text)
+        self.assertIn('test_duration_seconds_bucket{route="/a",le="0.1"} 2', text)
+        self.assertIn('test_duration_seconds_bucket{route="/a",le="1.0"} 3', text)
+        self.assertIn('test_duration_seconds_bucket{route="/a",le="+Inf"} 4', text)
+        self.assertIn('test_duration_seconds_sum{route="/a"} 2.65', text)
+        self.assertIn('test_duration_seconds_count{route="/a"} 4', text)
+
+    def test_query_metrics(self):
+        """
+        test the upstream query and SQLite write metrics of query executions
+        """
+        metrics = SnapQueryMetrics.get_instance()
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            cats = nqm.lookup(QueryName(name="cats", namespace="snapquery-examples", domain="wikidata.org"))
+            writes = metrics.sqlite_write_duration.get_count(table="QueryStats")
+            for name, error_rate in [("metrics-ok", 0.0), ("metrics-504", 1.0)]:
+                config = LocalEndpointConfig(name=name, error_rate=error_rate, error_kind="504")
+                with LocalSparqlEndpoint(config) as local:
+                    local.register(nqm)
+                    nqm.execute_query(cats, params_dict={}, endpoint_name=name)
+        self.assertEqual(1, metrics.sparql_duration.get_count(endpoint="metrics-ok"))
+        self.assertEqual(1, metrics.sparql_records.get_count(endpoint="metrics-ok"))
+        self.assertEqual(1, metrics.sparql_errors.get(endpoint="metrics-504", category="Timeout"))
+        self.assertEqual(writes + 2, metrics.sqlite_write_duration.get_count(table="QueryStats"))
+
+    def test_task_counter(self):
+        """
+        test counting the queued and running tasks of a thread pool
+        """
+        task_counter = TaskCounter()
+        started = threading.Event()
+        release = threading.Event()
+
+        def block() -> bool:
+            started.set()
+            return release.wait(5.0)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with task_counter.track(block) as blocking_task:
+                with task_counter.track(lambda: None) as queued_task:
+                    running = executor.submit(blocking_task)
+                    queued = executor.submit(queued_task)
+                    self.assertTrue(started.wait(5.0))
+                    self.assertEqual((1, 1), (task_counter.queued, task_counter.running))
+                    # a task cancelled before it started is no longer queued on exit
+                    self.assertTrue(queued.cancel())
+                self.assertEqual((0, 1), (task_counter.queued, task_counter.running))
+                release.set()
+                self.assertTrue(running.result())
+        self.assertEqual((0, 0), (task_counter.queued, task_counter.running))
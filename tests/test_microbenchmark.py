@@ -0,0 +1,75 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from basemkit.basetest import Basetest
+
+from snapquery.microbenchmark import BenchmarkResult, BenchmarkResults, SnapQueryBenchmarks
+from snapquery.snapquery_core import NamedQueryManager
+
+
+class TestMicrobenchmark(Basetest):
+    """
+    test the microbenchmarks of the snapquery hot paths
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def get_error_messages(self):
+        error_log_path = Path(__file__).parent / "resources" / "error_messages"
+        error_messages = [path.read_text() for path in sorted(error_log_path.glob("*/*")) if path.is_file()]
+        return error_messages
+
+    def test_regressions(self):
+        """
+        test the regression check against a baseline
+        """
+        baseline = BenchmarkResults(name="test", results=[BenchmarkResult.from_timings("a", 10, [1.0, 1.0])])
+        results = BenchmarkResults(name="test", results=[BenchmarkResult.from_timings("a", 10, [1.4, 1.4])])
+        self.assertEqual([], results.get_regressions(baseline, threshold=1.5))
+        results = BenchmarkResults(name="test", results=[BenchmarkResult.from_timings("a", 10, [2.0, 2.0])])
+        self.assertEqual(1, len(results.get_regressions(baseline, threshold=1.5)))
+
+    def test_hot_path_benchmarks(self):
+        """
+        run the hot path benchmarks and check them against the stored baseline
+        """
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile, tempfile.TemporaryDirectory() as baseline_dir:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            benchmarks = SnapQueryBenchmarks(nqm, error_messages=self.get_error_messages(), max_queries=5)
+            suite = benchmarks.get_suite(baseline_dir=baseline_dir, min_time=0.005)
+            results = suite.run(rounds=3)
+            self.assertEqual(len(suite.benchmarks), len(results.results))
+            for result in results.results:
+                if self.debug:
+                    print(result)
+                self.assertTrue(result.median > 0)
+            # the first check stores the baseline
+            self.assertEqual([], suite.check(results))
+            self.assertTrue(suite.baseline_path.exists())
+            self.assertEqual(len(results.results), len(suite.load_baseline().results))
+
+    @unittest.skipUnless(
+        os.getenv("SNAPQUERY_BENCHMARK_BASELINE"),
+        "opt in by setting SNAPQUERY_BENCHMARK_BASELINE to a baseline directory",
+    )
+    def test_benchmark_regressions(self):
+        """
+        fail on regressions against the baseline of this machine in the directory
+        given by SNAPQUERY_BENCHMARK_BASELINE - the first run stores the baseline
+        """
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            benchmarks = SnapQueryBenchmarks(nqm, error_messages=self.get_error_messages())
+            suite = benchmarks.get_suite(baseline_dir=os.getenv("SNAPQUERY_BENCHMARK_BASELINE"))
+            results = suite.run(rounds=3)
+            regressions = suite.check(results, threshold=3.0)
+            self.assertEqual([], regressions)
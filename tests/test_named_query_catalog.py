@@ -0,0 +1,97 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import tempfile
+from dataclasses import asdict, fields
+
+from basemkit.basetest import Basetest
+
+from snapquery.named_query_catalog import NamedQueryCatalog
+from snapquery.query_set_tool import QuerySetTool
+from snapquery.snapquery_core import NamedQuery, NamedQueryManager, QueryName
+
+
+class TestNamedQueryCatalog(Basetest):
+    """
+    test the in memory catalog of named queries
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_catalog(self):
+        """
+        test adding, replacing and removing catalog entries
+        """
+        catalog = NamedQueryCatalog(NamedQuery)
+        for name in ["b", "a", "c"]:
+            nq = NamedQuery(domain="example.org", namespace="test", name=name, url=f"http://example.org/{name}")
+            catalog.add(asdict(nq))
+        nq = NamedQuery(domain="example.org", namespace="other", name="a", sparql="SELECT * {}")
+        catalog.add(asdict(nq))
+        self.assertEqual(4, len(catalog))
+        names = [record["name"] for record in catalog.get_records("example", "test")]
+        self.assertEqual(["a", "b", "c"], names)
+        self.assertEqual(["other", "test"], [record["namespace"] for record in catalog.get_records(limit=2)])
+        # replace
+        catalog.add({**asdict(nq), "sparql": "ASK {}"})
+        self.assertEqual("ASK {}", catalog.get_record(nq.query_id)["sparql"])
+        self.assertEqual(4, len(catalog))
+        catalog.remove(nq.query_id)
+        self.assertIsNone(catalog.get_record(nq.query_id))
+        self.assertEqual(["test"], list(set(record["namespace"] for record in catalog.get_records())))
+        urls, names = catalog.get_unique_sets("example.org", "test")
+        self.assertEqual({"a", "b", "c"}, names)
+        self.assertIn("http://example.org/a", urls)
+
+    def test_round_trip(self):
+        """
+        test that every field of a named query survives store and lookup
+        """
+        with tempfile.NamedTemporaryFile() as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            nq = NamedQuery(domain="example.org", namespace="round-trip", name="cats")
+            for field in fields(NamedQuery):
+                if field.init and field.name not in ("domain", "namespace", "name"):
+                    setattr(nq, field.name, f"{field.name} of cats")
+            nqm.add_and_store(nq)
+            query_name = QueryName(domain="example.org", namespace="round-trip", name="cats")
+            self.assertEqual(asdict(nq), asdict(nqm.lookup(query_name)))
+            self.assertEqual(asdict(nq), asdict(nqm.get_all_queries(domain="example.org", namespace="round-trip")[0]))
+            # a fresh catalog is loaded from the database
+            nqm.catalog = None
+            self.assertEqual(asdict(nq), asdict(nqm.lookup(query_name)))
+            self.assertEqual("comment of cats", nqm.lookup(query_name).comment)
+
+    def test_consistency(self):
+        """
+        test that the catalog answers like the SQL queries and stays consistent with store
+        """
+        with tempfile.NamedTemporaryFile() as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            qimport = QuerySetTool(nqm=nqm)
+            qimport.import_samples(with_store=True, show_progress=self.debug)
+            for domain, namespace in [("wikidata.org", "snapquery-examples"), ("", "examples"), ("", "")]:
+                sql_records = nqm.sql_db.query(
+                    "SELECT * FROM NamedQuery WHERE domain LIKE ? AND namespace LIKE ? ORDER BY domain,namespace,name",
+                    (f"{domain}%", f"{namespace}%"),
+                )
+                queries = nqm.get_all_queries(domain=domain, namespace=namespace)
+                self.assertEqual([record["query_id"] for record in sql_records], [nq.query_id for nq in queries])
+            report = nqm.get_catalog().get_memory_report()
+            if self.debug:
+                print(report)
+            self.assertEqual(len(nqm.get_catalog()), report["queries"])
+            self.assertGreater(report["sparql_bytes"], report["domain_bytes"])
+            # write through
+            nq = NamedQuery(domain="wikidata.org", namespace="snapquery-examples", name="dogs", sparql="SELECT * {}")
+            nqm.add_and_store(nq)
+            dogs = nqm.lookup(QueryName(domain="wikidata.org", namespace="snapquery-examples", name="dogs"))
+            self.assertEqual("SELECT * {}", dogs.sparql)
+            urls, names = nqm.get_unique_sets(domain="wikidata.org", namespace="snapquery-examples")
+            self.assertIn("dogs", names)
+            with self.assertRaises(ValueError):
+                nqm.lookup(QueryName(domain="wikidata.org", namespace="snapquery-examples", name="unicorns"))
@@ -0,0 +1,97 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import tempfile
+
+from basemkit.basetest import Basetest
+from lodstorage.params import Params
+
+from snapquery.param_template import ParamTemplate, ParamTemplateCache
+from snapquery.snapquery_core import NamedQuery, NamedQueryManager, QueryDetails
+from snapquery.sparql_analyzer import SparqlAnalyzer
+
+
+class TestParamTemplate(Basetest):
+    """
+    test the precompiled parameter templates
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.query = """SELECT ?work WHERE {
+  VALUES ?author { wd:{{ q }} }
+  ?work wdt:P50 ?author; wdt:P1433 wd:{{q2}}.
+  FILTER(?author != wd:{{q}})
+}"""
+
+    def test_render(self):
+        """
+        test that rendering matches lodstorage Params
+        """
+        template = ParamTemplate(self.query)
+        self.assertEqual(["q", "q2"], template.params)
+        self.assertEqual(["q", "q2", "q"], template.slots)
+        for param_dict in [{"q": "Q80", "q2": "Q5"}, {"q": 42}, {}]:
+            params = Params(self.query)
+            params.set(param_dict)
+            self.assertEqual(params.apply_parameters(), template.render(param_dict))
+        with self.assertRaises(ValueError):
+            template.render({"q": "Q80 } ; DELETE WHERE { ?s ?p ?o"})
+        with self.assertRaises(Exception) as context:
+            template.render_with_check({})
+        self.assertIn("Query needs 2 parameters: q, q2", str(context.exception))
+        plain = ParamTemplate("SELECT * WHERE { ?s ?p ?o }")
+        self.assertIs(plain.query, plain.render({"q": "Q80"}))
+
+    def test_validate(self):
+        """
+        test the validation and type check of the values
+        """
+        template = ParamTemplate(self.query)
+        qd = QueryDetails.from_sparql("test", self.query)
+        qd.default_param_types = "Q5"
+        qd.default_params = "Q80,Q1"
+        param_types = qd.get_param_types()
+        self.assertEqual({"q": "item", "q2": "item"}, param_types)
+        self.assertEqual([], template.validate({"q": "Q80", "q2": "Q5", "format": "html"}, param_types))
+        problems = template.validate({"q": "Tim Berners-Lee", "q2": "Q5'"}, param_types)
+        self.assertEqual(2, len(problems))
+        self.assertIn("type item", problems[0])
+        self.assertIn("malicious", problems[1])
+        with self.assertRaises(ValueError):
+            template.check({"q": "Q80"}, param_types)
+        self.assertEqual("integer", ParamTemplate.infer_type("2024"))
+
+    def test_cache(self):
+        """
+        test the template cache and its use by the named query manager
+        """
+        cache = ParamTemplateCache(max_size=2)
+        template = cache.get(self.query)
+        self.assertIs(template, cache.get(self.query))
+        cache.get("SELECT 1")
+        cache.get("SELECT 2")
+        self.assertEqual(2, len(cache))
+        self.assertIsNot(template, cache.get(self.query))
+        params = SparqlAnalyzer.get_query_parameter(self.query)
+        self.assertEqual({"q", "q2"}, params)
+        params.add("modified")
+        self.assertEqual({"q", "q2"}, SparqlAnalyzer.get_query_parameter(self.query))
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            nq = NamedQuery(domain="wikidata.org", namespace="test", name="works", sparql=self.query)
+            nqm.add_and_store(nq)
+            qb = nqm.as_query_bundle(nq, "wikidata")
+            nqm.check_params(qb, {"q": "Q80", "q2": "Tim"})
+            qd = QueryDetails.from_sparql(nq.query_id, nq.sparql)
+            qd.default_param_types = "Q5,Q5633421"
+            nqm.store_query_details_list([qd])
+            self.assertEqual({"q": "item", "q2": "item"}, nqm.get_param_types(nq.query_id))
+            with self.assertRaises(ValueError):
+                nqm.check_params(qb, {"q": "Q80", "q2": "Tim"})
+            self.assertIn("wd:Q80", qb.get_bound_query({"q": "Q80", "q2": "Q5"}))
+            with self.assertRaises(ValueError):
+                nqm.check_params(qb, {"q": "Q80"})
@@ -0,0 +1,62 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import datetime
+import tempfile
+
+from basemkit.basetest import Basetest
+
+from snapquery.models.person import Person
+from snapquery.person_cache import PersonCache
+
+
+class TestPersonCache(Basetest):
+    """
+    test the persistent person suggestion cache and the local autocomplete index
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_person_cache(self):
+        """
+        test caching lookups by normalized name prefix
+        """
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            cache = PersonCache(db_path=tmpfile.name)
+            persons = [
+                Person(label="Tim Berners-Lee", wikidata_id="Q80"),
+                Person(label="Timothy Bernard", dblp_author_id="b/TimothyBernard"),
+            ]
+            self.assertIsNone(cache.lookup("wikidata", "Tim Bern"))
+            cache.store("wikidata", "Tim Bern", 10, persons)
+            # changing a stored person does not change the cached one
+            persons[1].label = "changed"
+            self.assertEqual("Timothy Bernard", cache.search_local("Timothy")[0].label)
+            # reopen to check persistence and the rebuilt index
+            cache = PersonCache(db_path=tmpfile.name)
+            self.assertEqual(2, len(cache.lookup("wikidata", "tim  BERN")))
+            # the complete result of a shorter prefix is filtered locally
+            hits = cache.lookup("wikidata", "Tim Berners")
+            self.assertEqual(["Tim Berners-Lee"], [person.label for person in hits])
+            self.assertIsNone(cache.lookup("dblp", "Tim Bern"))
+            # a person with a shared identifier is merged
+            orcid_person = Person(label="T. Berners-Lee", wikidata_id="Q80", orcid_id="0000-0003-1279-3709")
+            cache.store("orcid", "Berners", 10, [orcid_person])
+            local = cache.search_local("berners")
+            self.assertEqual(1, len(local))
+            self.assertEqual("0000-0003-1279-3709", local[0].orcid_id)
+            # the index keeps copies of the stored persons
+            orcid_person.orcid_id = None
+            local[0].label = "changed"
+            local = cache.search_local("berners")
+            self.assertEqual("0000-0003-1279-3709", local[0].orcid_id)
+            self.assertEqual("Tim Berners-Lee", local[0].label)
+            # trigram fallback for misspellings
+            self.assertEqual("Timothy Bernard", cache.search_local("Timothy Benard")[0].label)
+            # stale entries are misses
+            cache.max_age = datetime.timedelta(0)
+            self.assertIsNone(cache.lookup("wikidata", "Tim Bern"))
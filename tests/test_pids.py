@@ -9,11 +9,48 @@ import tempfile
 from basemkit.basetest import Basetest
 
 from snapquery.dblp import DblpPersonLookup
+from snapquery.models.person import Person
+from snapquery.person_selector import PersonSelector
 from snapquery.pid import PIDs
 from snapquery.pid_lookup import PersonLookup
 from snapquery.snapquery_core import NamedQueryManager
 
 
+class StubCard:
+    """
+    a suggestion card recording the persons it showed
+    """
+
+    def __init__(self, person: Person):
+        self.shown = [person.label]
+
+    def update_person(self, person: Person):
+        self.shown.append(person.label)
+
+
+class StubLabel:
+    def set_text(self, text: str):
+        self.text = text
+
+
+class StubPersonSelector(PersonSelector):
+    """
+    a person selector without user interface recording the created cards
+    """
+
+    def __init__(self, limit: int = 10):
+        self.limit = limit
+        self.suggested_persons = []
+        self.pid_index = {}
+        self.suggestion_view = self
+        self.suggestion_list = self
+        self.suggestion_cards = []
+        self.matches_label = StubLabel()
+
+    def create_suggestion_card(self, person: Person) -> StubCard:
+        return StubCard(person)
+
+
 class TestPIDandPersons(Basetest):
     """
     Test cases for the PIDs and PersonLookup class.
@@ -90,3 +127,51 @@ class TestPIDandPersons(Basetest):
             assert pid_value.is_valid()
             assert pid_value.url is not None
             assert pid_value.html is not None
+
+    def test_person_pid_keys(self):
+        """
+        test the identifier keys used to merge person suggestions
+        """
+        person = Person(label="Tim Berners-Lee", wikidata_id="Q80")
+        other = Person(label="Tim Berners-Lee", wikidata_id="Q80", orcid_id="0000-0003-1279-3709")
+        self.assertEqual(["wikidata_id:Q80"], person.pid_keys)
+        self.assertTrue(set(person.pid_keys) & set(other.pid_keys))
+        person.merge_with(other)
+        self.assertEqual(["wikidata_id:Q80", "orcid_id:0000-0003-1279-3709"], person.pid_keys)
+        self.assertEqual([], Person(label="anonymous").pid_keys)
+
+    def test_merge_and_patch_suggestions(self):
+        """
+        test merging overlapping suggestion lists of two sources via the identifier index
+        and patching only the cards of the changed suggestions
+        """
+        selector = StubPersonSelector()
+        wikidata_persons = [
+            Person(label="Tim Berners-Lee", wikidata_id="Q80"),
+            Person(label="Douglas Adams", wikidata_id="Q42"),
+        ]
+        orcid_persons = [
+            Person(
+                label="Tim Berners-Lee (orcid)", given_name="Tim", wikidata_id="Q80", orcid_id="0000-0003-1279-3709"
+            ),
+            Person(label="Jane Doe", orcid_id="0000-0002-0000-0001"),
+            Person(label="Tim B.", orcid_id="0000-0003-1279-3709", dblp_author_id="b/TimBernersLee"),
+        ]
+        changed = selector.merge_and_update_suggestions(wikidata_persons)
+        self.assertEqual({0, 1}, changed)
+        selector.update_suggestions_view(changed)
+        changed = selector.merge_and_update_suggestions(orcid_persons)
+        # the third person is merged via the orcid added by the merge of the first one
+        self.assertEqual({0, 2}, changed)
+        selector.update_suggestions_view(changed)
+        labels = [person.label for person in selector.suggested_persons]
+        self.assertEqual(["Tim Berners-Lee", "Douglas Adams", "Jane Doe"], labels)
+        tim = selector.suggested_persons[0]
+        self.assertEqual("Tim", tim.given_name)
+        self.assertEqual("b/TimBernersLee", tim.dblp_author_id)
+        for key in tim.pid_keys:
+            self.assertEqual(0, selector.pid_index[key])
+        # the first card is patched once, the second one untouched and the third one added
+        shown = [card.shown for card in selector.suggestion_cards]
+        self.assertEqual([["Tim Berners-Lee", "Tim Berners-Lee"], ["Douglas Adams"], ["Jane Doe"]], shown)
+        self.assertEqual("", selector.matches_label.text)
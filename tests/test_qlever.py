@@ -5,11 +5,14 @@ Created on 2024-06-19
 """
 
 import os
+import tempfile
 import unittest
 
 from basemkit.basetest import Basetest
+from osprojects.osproject import Ticket
 
 from snapquery.qlever import QLever, QLeverUrl
+from snapquery.short_url_resolver import ShortUrlCache, ShortUrlResolution
 from snapquery.snapquery_core import NamedQuery, NamedQuerySet
 
 
@@ -41,6 +44,75 @@ SELECT * WHERE {
         self.assertTrue(sparql_query, "Failed to extract SPARQL query from QLever URL.")
         self.assertEqual(expected, sparql_query)
 
+    def test_cached_links_and_scan_state(self):
+        """
+        Test that resolved QLever links are served from the disk cache
+        and the issue scan state is persisted.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            link_cache = ShortUrlCache(db_path=os.path.join(tmpdir, "links.db"))
+            url = "https://qlever.cs.uni-freiburg.de/wikidata/abc123"
+            link_cache.store(
+                [ShortUrlResolution(short_url=url, url=url, sparql="SELECT * WHERE { ?s ?p ?o }", status_code=200)]
+            )
+            qlever = QLever(with_progress=False, link_cache=link_cache, state_dir=tmpdir, debug=self.debug)
+            resolutions = qlever.resolve_urls([url, url])
+            self.assertEqual(1, len(resolutions))
+            self.assertIn("?s ?p ?o", resolutions[url].sparql)
+            state = {"last_scan": "2026-10-19T00:00:00Z", "tickets": {"42": {"title": "t", "url": "u", "urls": [url]}}}
+            qlever.save_scan_state(state)
+            self.assertEqual(state, qlever.load_scan_state())
+
+    def test_incremental_scan(self):
+        """
+        Test that an incremental scan only lists the tickets updated since the last scan
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            link_cache = ShortUrlCache(db_path=os.path.join(tmpdir, "links.db"))
+            urls = [f"https://qlever.cs.uni-freiburg.de/wikidata/abc{i}" for i in range(3)]
+            link_cache.store(
+                [
+                    ShortUrlResolution(
+                        short_url=url, url=url, sparql=f"SELECT * WHERE {{ ?s ?p {i} }}", status_code=200
+                    )
+                    for i, url in enumerate(urls)
+                ]
+            )
+            qlever = QLever(with_progress=False, link_cache=link_cache, state_dir=tmpdir, debug=self.debug)
+
+            def ticket(number: int, body: str) -> Ticket:
+                url = f"https://github.com/ad-freiburg/qlever/issues/{number}"
+                return Ticket.init_from_dict(number=number, title=f"Issue {number}", url=url, body=body)
+
+            calls = []
+
+            def get_all_tickets(limit=None):
+                calls.append(("all", None))
+                return {2: ticket(2, f"see {urls[1]}"), 1: ticket(1, f"see {urls[0]}")}
+
+            def get_issues(**params):
+                calls.append(("since", params.get("since")))
+                return [ticket(3, f"see {urls[2]}")]
+
+            qlever.osproject.getAllTickets = get_all_tickets
+            qlever.osproject.getIssues = get_issues
+            qlever.osproject.getComments = lambda number: []
+            nq_set = qlever.get_issues_query_set(incremental=True)
+            self.assertEqual(2, len(nq_set.queries))
+            last_scan = qlever.load_scan_state()["last_scan"]
+            nq_set = qlever.get_issues_query_set(incremental=True)
+            self.assertEqual([("all", None), ("since", last_scan)], calls)
+            names = [nq.name for nq in nq_set.queries]
+            self.assertEqual(["Issue3_query1", "Issue2_query1", "Issue1_query1"], names)
+            self.assertEqual("Issue 1", nq_set.queries[2].description)
+            # a limited scan returns the most recent tickets and keeps the scan state
+            state = qlever.load_scan_state()
+            nq_set = qlever.get_issues_query_set(limit=1, incremental=True)
+            self.assertEqual(["Issue3_query1"], [nq.name for nq in nq_set.queries])
+            nq_set = qlever.get_issues_query_set(limit=1)
+            self.assertEqual(["Issue2_query1"], [nq.name for nq in nq_set.queries])
+            self.assertEqual(state, qlever.load_scan_state())
+
     def named_queries_for_performance_evaluation(self, queries):
         named_query_set = NamedQuerySet(
             domain="qlever.cs.uni-freiburg.de",
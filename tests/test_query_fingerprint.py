@@ -0,0 +1,90 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import tempfile
+
+from basemkit.basetest import Basetest
+
+from snapquery.bulk_import import BulkImporter
+from snapquery.duration_predictor import DurationPredictor
+from snapquery.query_fingerprint import QueryFingerprint
+from snapquery.snapquery_core import NamedQuery, NamedQueryManager
+
+
+class TestQueryFingerprint(Basetest):
+    """
+    test the normalized query fingerprints
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.cats = """PREFIX wd: <http://www.wikidata.org/entity/>
+# all cats
+SELECT ?item ?itemLabel WHERE {
+  ?item wdt:P31 wd:Q146 .
+  SERVICE wikibase:label { bd:serviceParam wikibase:language "en". }
+} LIMIT 10"""
+        self.kittens = """SELECT ?cat ?catLabel
+WHERE { ?cat wdt:P31 <http://www.wikidata.org/entity/Q146>
+  SERVICE wikibase:label { bd:serviceParam wikibase:language "en" } }
+LIMIT 10"""
+
+    def test_fingerprint(self):
+        """
+        test that only the semantics of a query are fingerprinted
+        """
+        cats = QueryFingerprint(self.cats)
+        kittens = QueryFingerprint(self.kittens)
+        if self.debug:
+            print(cats.canonical)
+        self.assertEqual(cats.fingerprint, kittens.fingerprint)
+        self.assertEqual({"item": "?v0", "itemLabel": "?v0Label"}, cats.variables)
+        # the label service binds the labels by the variable names
+        label_a = (
+            "SELECT ?a ?b ?aLabel { ?a wdt:P31 ?b SERVICE wikibase:label { bd:serviceParam wikibase:language 'en' } }"
+        )
+        label_b = label_a.replace("?aLabel", "?bLabel")
+        self.assertNotEqual(QueryFingerprint.of(label_a), QueryFingerprint.of(label_b))
+        renamed = label_b.replace("?a", "?x").replace("?b", "?y")
+        self.assertEqual(QueryFingerprint.of(label_b), QueryFingerprint.of(renamed))
+        dogs = QueryFingerprint(self.cats.replace("Q146", "Q144"))
+        self.assertNotEqual(cats.fingerprint, dogs.fingerprint)
+        works = "SELECT ?work WHERE { ?work wdt:P50 wd:{{ q }} }"
+        papers = "SELECT ?paper WHERE {\n  ?paper wdt:P50 wd:{{author}}\n}"
+        self.assertEqual(QueryFingerprint.of(works), QueryFingerprint.of(papers))
+        # comments end at the line end but not within IRIs and strings
+        commented = QueryFingerprint('SELECT ?x { ?x rdfs:label "#1" ; a <http://example.org/#a> # comment\n }')
+        other = QueryFingerprint('PREFIX ex: <http://example.org/#>\nselect ?y { ?y rdfs:label "#1"; rdf:type ex:a . }')
+        self.assertEqual(commented.fingerprint, other.fingerprint)
+        self.assertNotEqual(commented.fingerprint, QueryFingerprint.of(self.cats.replace('"en"', '"de"')))
+        # result rows are shared via the canonical variable names
+        rows = cats.to_canonical_rows([{"item": "Q1", "itemLabel": "cat"}])
+        self.assertEqual([{"cat": "Q1", "catLabel": "cat"}], kittens.from_canonical_rows(rows))
+
+    def test_duplicates(self):
+        """
+        test the duplicate detection on import and the shared execution statistics
+        """
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            cats = NamedQuery(domain="wikidata.org", namespace="examples", name="cats", sparql=self.cats)
+            kittens = NamedQuery(domain="wikidata.org", namespace="short-urls", name="kittens", sparql=self.kittens)
+            nqm.add_and_store(cats)
+            indexes = [record["name"] for record in nqm.sql_db.query("PRAGMA index_list(QueryDetails)")]
+            self.assertIn("idx_QueryDetails_fingerprint", indexes)
+            importer = BulkImporter(nqm)
+            stats = importer.import_queries([kittens], name="short-urls")
+            self.assertEqual({kittens.query_id: [cats.query_id]}, stats.duplicates)
+            self.assertIn("1 duplicates", str(stats))
+            duplicates = nqm.get_duplicates()
+            self.assertEqual(1, len(duplicates))
+            self.assertEqual(2, duplicates[0]["count"])
+            # the execution statistics of duplicates are shared
+            predictor = DurationPredictor.from_sql_db(nqm.sql_db)
+            predictor.add(cats.query_id, "wikidata", 2.0)
+            prediction = predictor.predict(kittens.query_id, "wikidata")
+            self.assertEqual(("duplicate", 2.0, 1), (prediction.source, prediction.duration, prediction.count))
+            self.assertEqual(nqm.get_fingerprint(cats).fingerprint, nqm.get_fingerprint(kittens).fingerprint)
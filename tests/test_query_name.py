@@ -5,11 +5,13 @@ Created on 03.07.2024
 """
 
 import tempfile
+from dataclasses import asdict
 
 from basemkit.basetest import Basetest
 
+from snapquery.query_name_index import QueryNameIndex
 from snapquery.query_set_tool import QuerySetTool
-from snapquery.snapquery_core import NamedQueryManager, QueryName, QueryNameSet
+from snapquery.snapquery_core import NamedQuery, NamedQueryManager, QueryName, QueryNameSet
 
 
 class TestQueryName(Basetest):
@@ -76,6 +78,64 @@ class TestQueryName(Basetest):
                         f"Number of names should be at least {expected_names_count}",
                     )
 
+    def test_query_name_index(self):
+        """
+        test the in memory query name index and its sync on store
+        """
+        with tempfile.NamedTemporaryFile() as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            name_index = nqm.get_name_index()
+            query = nqm.meta_qm.queriesByName["domain_namespace_stats"]
+            for domain, namespace in [("", ""), ("wikidata", ""), ("", "exam"), ("x-invalid", "")]:
+                with self.subTest(domain=domain, namespace=namespace):
+                    sql_stats = nqm.sql_db.query(query.query, (f"{domain}%", f"{namespace}%"))
+                    index_stats = name_index.stats(domain, namespace)
+                    sort_key = lambda record: (record["domain"], record["namespace"])
+                    self.assertEqual(sorted(sql_stats, key=sort_key), sorted(index_stats, key=sort_key))
+            total = len(name_index)
+            nq = NamedQuery(
+                domain="example.org", namespace="index-test", name="cats", sparql="SELECT * WHERE { ?s ?p ?o }"
+            )
+            nqm.add_and_store(nq)
+            # storing again does not count twice
+            nqm.add_and_store(nq)
+            self.assertEqual(total + 1, len(name_index))
+            qns = QueryNameSet(nqm)
+            qns.update("example", "index")
+            self.assertEqual(1, qns.total)
+            self.assertEqual({"cats"}, qns.names)
+            self.assertEqual([("example.org", "index-test", "cats")], name_index.complete(name="ca", domain="ex"))
+            self.assertEqual(1, name_index.count(domain="example.org", name="c"))
+            # storing the query under a new name moves its index entry
+            nq.name = "kittens"
+            nqm.store([asdict(nq)])
+            self.assertEqual(total + 1, len(name_index))
+            self.assertEqual([("example.org", "index-test", "kittens")], name_index.complete(domain="example.org"))
+            # a fresh index from the database agrees
+            nqm.name_index = None
+            self.assertEqual(name_index.names, nqm.get_name_index().names)
+
+    def test_name_index_prefixes(self):
+        """
+        test prefix lookups of the QueryNameIndex
+        """
+        records = [
+            {"domain": "wikidata.org", "namespace": "examples", "name": name}
+            for name in ["cats", "cat-breeds", "dogs", "horses", None]
+        ]
+        name_index = QueryNameIndex.from_records(records)
+        self.assertEqual(2, name_index.count(name="cat"))
+        self.assertEqual(4, name_index.count(domain="WIKI"))
+        self.assertEqual(["cat-breeds", "cats"], [name for _d, _ns, name in name_index.complete(name="cat")])
+        self.assertEqual(2, len(name_index.complete(limit=2)))
+        name_index.remove("wikidata.org", "examples", "dogs")
+        name_index.add("wikidata.org", None, "dogs")
+        self.assertEqual(3, len(name_index))
+        name_index.add("wikidata.org", "examples", "cats", query_id="cats--examples@wikidata.org")
+        name_index.add("wikidata.org", "examples-2", "cats", query_id="cats--examples@wikidata.org")
+        self.assertEqual([("wikidata.org", "examples-2", "cats")], name_index.complete(name="cats"))
+        self.assertEqual(3, len(name_index))
+
     def test_query_name(self):
         """
         test the QueryName class
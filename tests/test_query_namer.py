@@ -0,0 +1,88 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import os
+import tempfile
+
+from basemkit.basetest import Basetest
+
+from snapquery.query_namer import HeuristicNamingBackend, LLMNamingBackend, NamingBackend, QueryNamer
+from snapquery.snapquery_core import NamedQuery
+
+
+class TestQueryNamer(Basetest):
+    """
+    test the batch naming of imported queries
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_heuristic_batch_naming(self):
+        """
+        test naming queries in batches offline with collisions resolved locally
+        """
+        sparqls = [
+            "SELECT ?cat ?catLabel WHERE { ?cat wdt:P31 wd:Q146 }",
+            "SELECT ?cat ?catLabel WHERE { ?cat wdt:P31 wd:Q146 . }",
+            "SELECT ?horse WHERE { ?horse wdt:P31 wd:Q726 }",
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_path = os.path.join(tmpdir, "naming.json")
+            namer = QueryNamer(HeuristicNamingBackend(), batch_size=2, cache_path=cache_path)
+            nqs = [
+                NamedQuery(domain="wikidata.org", namespace="test", name=f"q{i}", sparql=sparql)
+                for i, sparql in enumerate(sparqls)
+            ]
+            unique_names = {"Select_horse_by_P31"}
+            named = namer.name_queries(nqs, unique_names)
+            names = [nq.name for nq in named]
+            if self.debug:
+                print(names)
+            self.assertEqual(
+                ["Select_cat_catLabel_by_P31", "Select_cat_catLabel_by_P31_2", "Select_horse_by_P31_2"], names
+            )
+            # cached by query hash
+            self.assertEqual(3, len(QueryNamer(HeuristicNamingBackend(), cache_path=cache_path).cache))
+
+    def test_unnamed_queries_not_cached(self):
+        """
+        test that queries which could not be named are retried
+        """
+
+        class CountingBackend(HeuristicNamingBackend):
+            def __init__(self):
+                self.requested = []
+
+            def name_queries(self, sparqls):
+                self.requested.extend(sparqls)
+                return super().name_queries(sparqls)
+
+        with self.assertRaises(TypeError):
+            NamingBackend()
+        sparqls = ["ASK { ?s ?p ?o }", "SELECT ?cat WHERE { ?cat wdt:P31 wd:Q146 }"]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_path = os.path.join(tmpdir, "naming.json")
+            # the second run only asks for the query that could not be named
+            for expected in [sparqls, sparqls[:1]]:
+                backend = CountingBackend()
+                namings = QueryNamer(backend, cache_path=cache_path).get_namings(sparqls)
+                self.assertEqual(1, len(namings))
+                self.assertEqual(expected, backend.requested)
+
+    def test_parse_llm_response(self):
+        """
+        test parsing a batched llm response
+        """
+        llm_response = """```json
+[
+  {"index": 1, "name": "Horses", "title": "Horses", "description": "all horses"},
+  {"index": 0}
+]
+```"""
+        namings = LLMNamingBackend.parse_response(llm_response, 2)
+        self.assertIsNone(namings[0])
+        self.assertEqual("Horses", namings[1]["name"])
@@ -0,0 +1,72 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import tempfile
+
+from basemkit.basetest import Basetest
+from lodstorage.query import Format
+
+from snapquery.local_endpoint import LocalEndpointConfig, LocalSparqlEndpoint
+from snapquery.metrics import SnapQueryMetrics
+from snapquery.query_timing import QueryTiming
+from snapquery.snapquery_core import NamedQueryManager, QueryName, QueryStats
+
+
+class TestQueryTiming(Basetest):
+    """
+    test the per stage timings of query executions
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_stage_timings(self):
+        """
+        test the stage timings of a query on the local endpoint
+        """
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            config = LocalEndpointConfig(latency=0.05, repeat=200)
+            with LocalSparqlEndpoint(config) as local:
+                local.register(nqm)
+                query_name = QueryName(name="cats", namespace="snapquery-examples", domain="wikidata.org")
+                cats = nqm.lookup(query_name)
+                write_duration = SnapQueryMetrics.get_instance().sqlite_write_duration
+                writes = write_duration.get_count(table="QueryStats")
+                lod, stats = nqm.execute_query(
+                    cats, params_dict={}, endpoint_name="local", with_snapshot=True, context="timing"
+                )
+            self.assertEqual(1000, len(lod))
+            stage_times = stats.get_stage_times()
+            if self.debug:
+                print(stage_times, stats.bytes_received)
+            for stage in ["prepare", "queue", "connect", "first_byte", "transfer", "parse", "snapshot", "store"]:
+                self.assertIsNotNone(stage_times[stage], stage)
+            # the injected latency is spent at the endpoint
+            self.assertGreaterEqual(stats.first_byte_time, 0.05)
+            self.assertGreater(stats.bytes_received, 1000 * 50)
+            self.assertLessEqual(
+                sum(stage_times[stage] for stage in QueryStats.stages if stage_times[stage]), stats.duration * 1.5
+            )
+            records = nqm.sql_db.query("SELECT * FROM QueryStats WHERE stats_id=?", (stats.stats_id,))
+            self.assertEqual(1, len(records))
+            stored = QueryStats.from_record(records[0])
+            self.assertEqual(stats.bytes_received, stored.bytes_received)
+            self.assertEqual("timing", records[0]["context"])
+            self.assertAlmostEqual(stats.snapshot_time, stored.snapshot_time)
+            # the upsert of the stats row is timed after the write and observed as SQLite write latency
+            self.assertIsNone(stored.store_time)
+            self.assertEqual(writes + 1, write_duration.get_count(table="QueryStats"))
+            self.assertAlmostEqual(stats.first_byte_time, stored.first_byte_time)
+            query_bundle = nqm.as_query_bundle(cats, "local")
+            query_bundle.format_result(lod, Format.github, query_stat=stats)
+            self.assertGreater(stats.format_time, 0)
+            stage_query = nqm.meta_qm.queriesByName["stage_times"]
+            stage_lod = nqm.sql_db.query(stage_query.query)
+            by_endpoint = {record["endpoint_name"]: record for record in stage_lod}
+            self.assertGreater(by_endpoint["local"]["avg_endpoint_time"], by_endpoint["local"]["avg_snapquery_time"])
+            # queries outside of a recording are not timed
+            self.assertIsNone(QueryTiming.current())
@@ -4,9 +4,14 @@ Created on 2024-05-03
 @author: wf
 """
 
+import tempfile
+from dataclasses import asdict
+
+from fastapi import HTTPException
 from ngwidgets.webserver_test import WebserverTest
 
 from snapquery.snapquery_cmd import SnapQueryCmd
+from snapquery.snapquery_core import NamedQuery, NamedQueryManager
 from snapquery.snapquery_webserver import SnapQueryWebServer
 
 
@@ -72,6 +77,27 @@ class TestRestFulApi(WebserverTest):
             if self.debug:
                 print(result)
 
+    def testInvalidParams(self):
+        """
+        test that invalid parameter values are rejected as unprocessable
+        """
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            ws = SnapQueryWebServer()
+            ws.nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            nq = NamedQuery(
+                domain="wikidata.org",
+                namespace="snapquery-tests",
+                name="label",
+                sparql="SELECT ?label WHERE { wd:{{ q }} rdfs:label ?label }",
+            )
+            ws.nqm.store([asdict(nq)])
+            for name, status_code in [("label", 422), ("unknown", 404)]:
+                with self.assertRaises(HTTPException) as context:
+                    ws.query(name=name, namespace=nq.namespace, domain=nq.domain, param_dict={"q": "Q80>"})
+                if self.debug:
+                    print(context.exception.detail)
+                self.assertEqual(status_code, context.exception.status_code)
+
     def testEndpoints(self):
         """
         test different endpoints
@@ -88,3 +114,15 @@ class TestRestFulApi(WebserverTest):
             result = self.getHtml(path)
             if debug:
                 print(result)
+
+    def testMetrics(self):
+        """
+        test the Prometheus metrics endpoint
+        """
+        self.getHtml("/api/sparql/wikidata.org/snapquery-examples/cats")
+        metrics = self.getHtml("/metrics")
+        if self.debug:
+            print(metrics)
+        self.assertIn("# TYPE snapquery_http_request_duration_seconds histogram", metrics)
+        self.assertIn('route="/api/sparql/{domain}/{namespace}/{name}",status="200",le="+Inf"', metrics)
+        self.assertIn('snapquery_threadpool_threads{pool="anyio",state="max"}', metrics)
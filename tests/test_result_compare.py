@@ -0,0 +1,107 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import tempfile
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from basemkit.basetest import Basetest
+from lodstorage.query import Endpoint
+
+from snapquery.result_compare import ResultComparator
+from snapquery.snapquery_core import NamedQuery, NamedQueryManager
+
+
+class CsvResultHandler(BaseHTTPRequestHandler):
+    """
+    answer every SPARQL query with the CSV result of the endpoint given by the path
+    """
+
+    results = {
+        "/a": "cat,catLabel\r\nQ1,Tom\r\nQ2,Felix\r\nQ3,Garfield\r\n",
+        # other column order, one row missing and one extra multiline row
+        "/b": 'catLabel,cat\r\nFelix,Q2\r\nTom,Q1\r\n"Hello\r\nKitty",Q4\r\nTom,Q1\r\n',
+    }
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        query = urllib.parse.parse_qs(self.rfile.read(length).decode())["query"][0]
+        assert "SELECT" in query
+        body = self.results[self.path].encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestResultCompare(Basetest):
+    """
+    test the cross endpoint result comparison
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_compare_records(self):
+        """
+        test the overlap and the sample differences of record streams
+        """
+        comparator = ResultComparator(nqm=None, sample_size=2)
+        rows_a = ({"n": str(i)} for i in range(1000))
+        rows_b = ({"n": str(i)} for i in range(10, 1005))
+        rows_c = iter([{"n": "1"}, {"n": "1"}])
+        comparison = comparator.compare_records("numbers", {"a": rows_a, "b": rows_b, "c": rows_c})
+        if self.debug:
+            print(comparison.to_json())
+        self.assertFalse(comparison.identical)
+        self.assertEqual(2, comparison.results["c"].rows)
+        self.assertEqual(1, comparison.results["c"].distinct)
+        pair = comparison.pairs[0]
+        self.assertEqual((990, 10, 5), (pair.common, pair.only_a, pair.only_b))
+        self.assertAlmostEqual(990 / 1005, pair.overlap)
+        self.assertEqual(2, len(pair.samples_a))
+        for row in pair.samples_a:
+            self.assertLess(int(row["n"]), 10)
+        for row in pair.samples_b:
+            self.assertGreaterEqual(int(row["n"]), 1000)
+        identical = comparator.compare_records("same", {"a": iter([{"x": "1"}]), "b": iter([{"x": "1"}])})
+        self.assertTrue(identical.identical)
+
+    def test_compare_endpoints(self):
+        """
+        test streaming CSV results from two endpoints
+        """
+        server = ThreadingHTTPServer(("127.0.0.1", 0), CsvResultHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+                nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+                for name in ["a", "b"]:
+                    url = f"http://127.0.0.1:{server.server_port}/{name}"
+                    nqm.endpoints[name] = Endpoint(name=name, endpoint=url, method="POST")
+                nq = NamedQuery(
+                    domain="example.org",
+                    namespace="compare",
+                    name="cats",
+                    sparql="SELECT ?cat ?catLabel WHERE { ?cat ?p ?catLabel }",
+                )
+                comparison = ResultComparator(nqm, timeout=5).compare(nq, ["a", "b"])
+                if self.debug:
+                    print(comparison.to_json())
+                pair = comparison.pairs[0]
+                self.assertEqual((2, 1, 1), (pair.common, pair.only_a, pair.only_b))
+                self.assertEqual([{"cat": "Q3", "catLabel": "Garfield"}], pair.samples_a)
+                self.assertEqual([{"cat": "Q4", "catLabel": "Hello\r\nKitty"}], pair.samples_b)
+                self.assertEqual(4, comparison.results["b"].rows)
+        finally:
+            server.shutdown()
+            server.server_close()
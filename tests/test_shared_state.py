@@ -0,0 +1,121 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+
+from basemkit.basetest import Basetest
+
+from snapquery.shared_state import ChangeNotifier, SharedCache, ThreadLocalSQLDB
+from snapquery.snapquery_core import NamedQuery, NamedQueryManager, QueryPrefixMerger, QueryStats
+
+
+def store_stats_worker(db_path: str, worker: int, count: int):
+    """
+    store query stats from a separate worker process
+    """
+    nqm = NamedQueryManager(db_path=db_path)
+    for i in range(count):
+        stats = QueryStats(query_id=f"worker-{worker}-{i}", endpoint_name="wikidata", context="workers")
+        stats.done()
+        nqm.store_stats([stats])
+
+
+class TestSharedState(Basetest):
+    """
+    test the state shared by several worker processes
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "named_queries.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        Basetest.tearDown(self)
+
+    def test_thread_local_connections(self):
+        """
+        test the per thread connections of a WAL mode database
+        """
+        sql_db = ThreadLocalSQLDB(self.db_path)
+        self.assertEqual("wal", sql_db.query("PRAGMA journal_mode")[0]["journal_mode"])
+        connections = [sql_db.c]
+        thread = threading.Thread(target=lambda: connections.append(sql_db.c))
+        thread.start()
+        thread.join()
+        self.assertIs(connections[0], sql_db.c)
+        self.assertIsNot(connections[0], connections[1])
+
+    def test_concurrent_workers(self):
+        """
+        test storing query stats from several worker processes
+        """
+        NamedQueryManager.from_samples(db_path=self.db_path)
+        context = multiprocessing.get_context("spawn")
+        workers = [context.Process(target=store_stats_worker, args=(self.db_path, i, 25)) for i in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            self.assertEqual(0, worker.exitcode)
+        nqm = NamedQueryManager(db_path=self.db_path)
+        self.assertEqual(100, len(nqm.get_query_stats_by_context("workers")))
+
+    def test_shared_cache(self):
+        """
+        test the shared cache
+        """
+        cache = SharedCache(self.db_path)
+        other = SharedCache(self.db_path)
+        cache.put("result", "cats", "content")
+        cache.put("result", "dogs", "content", ttl=0.05)
+        self.assertEqual("content", other.get("result", "cats"))
+        self.assertIsNone(other.get("merged_query", "cats"))
+        time.sleep(0.1)
+        self.assertIsNone(other.get("result", "dogs"))
+        self.assertEqual(1, other.purge())
+        cache.clear("result")
+        self.assertIsNone(other.get("result", "cats"))
+
+    def test_change_notification(self):
+        """
+        test the change notifications between the managers of two worker processes
+        """
+        worker1 = NamedQueryManager.from_samples(db_path=self.db_path)
+        worker2 = NamedQueryManager(db_path=self.db_path)
+        self.assertEqual(3, worker1.get_name_index().count("wikidata.org", "snapquery-examples"))
+        nq = NamedQuery(domain="wikidata.org", namespace="snapquery-examples", name="dogs", sparql="SELECT * {}")
+        worker2.store([asdict(nq)])
+        worker1.sync(force=True)
+        self.assertEqual(4, worker1.get_name_index().count("wikidata.org", "snapquery-examples"))
+        del worker1.endpoints["wikidata"]
+        worker2.notify_config_change()
+        worker1.sync(force=True)
+        self.assertIn("wikidata", worker1.endpoints)
+        # compiled queries are shared
+        worker2.as_query_bundle(nq, "wikidata", prefix_merger=QueryPrefixMerger.ANALYSIS_MERGER)
+        self.assertEqual(1, len(worker1.get_shared_cache().sql_db.query("SELECT * FROM SharedCache")))
+
+    def test_interleaved_notifications(self):
+        """
+        test that a change of another worker is not hidden by my own later change of the same topic
+        """
+        notifier1 = ChangeNotifier(ThreadLocalSQLDB(self.db_path))
+        notifier2 = ChangeNotifier(ThreadLocalSQLDB(self.db_path))
+        notifier1.notify("NamedQuery")
+        self.assertEqual([], notifier1.get_changes(force=True))
+        self.assertEqual(["NamedQuery"], notifier2.get_changes(force=True))
+        notifier2.notify("NamedQuery")
+        notifier1.notify("NamedQuery")
+        self.assertEqual(["NamedQuery"], notifier1.get_changes(force=True))
+        self.assertEqual(["NamedQuery"], notifier2.get_changes(force=True))
+        self.assertEqual([], notifier1.get_changes(force=True))
@@ -0,0 +1,83 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import tempfile
+
+import requests
+from basemkit.basetest import Basetest
+
+from snapquery.short_url_resolver import ShortUrlCache, ShortUrlResolution, ShortUrlResolver
+
+
+class TestShortUrlResolver(Basetest):
+    """
+    test the concurrent short url resolver and its persistent cache
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_cache(self):
+        """
+        test storing and looking up resolutions
+        """
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            cache = ShortUrlCache(db_path=tmpfile.name)
+            hit = ShortUrlResolution(
+                short_url="https://w.wiki/test",
+                url="https://query.wikidata.org/#SELECT%20*",
+                sparql="SELECT *",
+                status_code=301,
+            )
+            miss = ShortUrlResolution(short_url="https://w.wiki/none", status_code=404, error="404 Not Found")
+            transient = ShortUrlResolution(short_url="https://w.wiki/busy", status_code=429, error="429")
+            self.assertTrue(hit.cacheable)
+            self.assertTrue(miss.cacheable)
+            self.assertFalse(transient.cacheable)
+            cache.store([hit, miss])
+            # reopen to check persistence
+            cache = ShortUrlCache(db_path=tmpfile.name)
+            known = cache.lookup_all([hit.short_url, miss.short_url, transient.short_url])
+            self.assertEqual(2, len(known))
+            self.assertEqual("SELECT *", known[hit.short_url].sparql)
+            self.assertIsNone(known[miss.short_url].sparql)
+            resolver = ShortUrlResolver(cache=cache)
+            # known urls are never refetched
+            resolutions = resolver.resolve_all([hit.short_url, hit.short_url])
+            self.assertEqual(1, len(resolutions))
+            self.assertEqual("SELECT *", resolutions[hit.short_url].sparql)
+
+    def test_resolve(self):
+        """
+        test resolving a short url with HEAD requests - the requests are stubbed
+        """
+        requested = []
+
+        def head(url: str) -> requests.Response:
+            requested.append(url)
+            response = requests.Response()
+            response.url = url
+            if url == "https://w.wiki/6UCU":
+                response.status_code = 301
+                response.headers["Location"] = "https://query.wikidata.org/#SELECT%20%3Fx%20WHERE%20%7B%7D"
+            else:
+                response.status_code = 404
+            return response
+
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            cache = ShortUrlCache(db_path=tmpfile.name)
+            resolver = ShortUrlResolver(cache=cache, debug=self.debug)
+            resolver.head = head
+            resolution = resolver.resolve("https://w.wiki/6UCU")
+            if self.debug:
+                print(resolution)
+            self.assertEqual("SELECT ?x WHERE {}", resolution.sparql)
+            # the final target is never fetched
+            self.assertEqual(["https://w.wiki/6UCU"], requested)
+            self.assertIsNotNone(cache.lookup("https://w.wiki/6UCU"))
+            missing = resolver.resolve("https://w.wiki/none")
+            self.assertEqual(404, missing.status_code)
+            self.assertIsNone(missing.sparql)
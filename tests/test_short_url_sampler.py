@@ -0,0 +1,49 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import tempfile
+
+from basemkit.basetest import Basetest
+
+from snapquery.short_url_resolver import ShortUrlCache, ShortUrlResolution
+from snapquery.short_url_sampler import ShortUrlSampler
+from snapquery.wd_short_url import ShortIds
+
+
+class TestShortUrlSampler(Basetest):
+    """
+    test sampling random short urls with a persistent hit/miss cache
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_short_ids(self):
+        """
+        test the conversion between short ids and integers
+        """
+        short_ids = ShortIds()
+        for short_id in ["1111", "5aTp", "9pfu", "$$$$"]:
+            value = short_ids.id_to_int(short_id)
+            self.assertEqual(short_id, short_ids.int_to_id(value))
+
+    def test_sample_unprobed(self):
+        """
+        test that known hits are reused and probed ids are never drawn again
+        """
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            cache = ShortUrlCache(db_path=tmpfile.name)
+            # a tiny id space: 1111 .. 1116
+            hit = ShortUrlResolution(short_url="https://w.wiki/1111", url="x", sparql="SELECT * WHERE { ?s ?p ?o }")
+            misses = [ShortUrlResolution(short_url=f"https://w.wiki/111{i}", status_code=404) for i in range(2, 6)]
+            cache.store([hit] + misses)
+            sampler = ShortUrlSampler(max_postfix="1116", cache=cache)
+            self.assertEqual([hit.short_url], sampler.hits)
+            self.assertEqual(["https://w.wiki/1116"], sampler.sample_unprobed(10))
+            # the known hit is used without probing
+            nq_set = sampler.get_query_set(namespace="test", count=1, max_probes=0)
+            self.assertEqual(1, len(nq_set.queries))
+            self.assertEqual("1111", nq_set.queries[0].name)
@@ -7,10 +7,13 @@ Created on 2025-12-02
 """
 
 import os
+import subprocess
+import tempfile
 import unittest
 
 from basemkit.basetest import Basetest
 
+from snapquery.local_repository import LocalRepository
 from snapquery.sib_sparql_examples import SibSparqlExamples
 from snapquery.snapquery_core import NamedQueryManager
 
@@ -76,3 +79,56 @@ class TestSibExamples(Basetest):
 
         if self.debug:
             print(f"Successfully processed {db_count} queries.")
+
+    def test_parallel_parse_and_cache(self):
+        """
+        Test parsing TTL files of a local checkout in a process pool
+        and skipping unchanged files via the content hash parse cache.
+        """
+        ttl_template = """@prefix ex: <https://example.org/> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+
+ex:{name} a sh:SPARQLExecutable, sh:SPARQLSelectExecutable ;
+    rdfs:comment "Example {name}"@en ;
+    sh:select \"\"\"SELECT * WHERE {{ ?s ?p ?o }} LIMIT {limit}\"\"\" .
+"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            repo_path = os.path.join(tmpdir, "sparql-examples")
+            os.makedirs(os.path.join(repo_path, "examples", "Test"))
+            for i in range(4):
+                with open(os.path.join(repo_path, "examples", "Test", f"00{i}.ttl"), "w") as f:
+                    f.write(ttl_template.format(name=f"q{i}", limit=i + 1))
+            # any prefix name may be bound to the SHACL namespace
+            with open(os.path.join(repo_path, "examples", "Test", "004.ttl"), "w") as f:
+                f.write(ttl_template.format(name="q4", limit=5).replace("sh:", "shacl:"))
+            with open(os.path.join(repo_path, "examples", "Test", "prefixes.ttl"), "w") as f:
+                f.write("@prefix ex: <https://example.org/> .\n")
+            subprocess.run(["git", "init", "-q", repo_path], check=True)
+            local_repo = LocalRepository(repo_path, owner="sib-swiss", cache_dir=os.path.join(tmpdir, "local"))
+            nqm = NamedQueryManager.from_samples(db_path=os.path.join(tmpdir, "sib.db"))
+            for run in range(2):
+                sib_fetcher = SibSparqlExamples(
+                    nqm,
+                    github=local_repo,
+                    cache_dir=os.path.join(tmpdir, "sib"),
+                    max_workers=2,
+                    min_parallel=1,
+                    debug=self.debug,
+                )
+                queries = sib_fetcher.extract_queries()
+                self.assertEqual(5, len(queries), f"run {run}")
+                self.assertEqual("Test:000", queries[0].name)
+                self.assertIn("LIMIT 1", queries[0].sparql)
+                self.assertTrue(sib_fetcher.parse_cache_path.exists())
+            parse_cache = sib_fetcher.load_parse_cache()
+            self.assertEqual(6, len(parse_cache))
+            # the entries of changed and removed files are pruned
+            with open(os.path.join(repo_path, "examples", "Test", "000.ttl"), "w") as f:
+                f.write(ttl_template.format(name="q0", limit=10))
+            os.remove(os.path.join(repo_path, "examples", "Test", "003.ttl"))
+            queries = sib_fetcher.extract_queries()
+            self.assertEqual(4, len(queries))
+            self.assertIn("LIMIT 10", queries[0].sparql)
+            parse_cache = sib_fetcher.load_parse_cache()
+            self.assertEqual(5, len(parse_cache))
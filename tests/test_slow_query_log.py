@@ -0,0 +1,97 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import tempfile
+
+from basemkit.basetest import Basetest
+
+from snapquery.local_endpoint import LocalEndpointConfig, LocalSparqlEndpoint
+from snapquery.slow_query_log import SlowQuery, SlowQueryLog
+from snapquery.snapquery_core import NamedQueryManager, QueryName, QueryStats
+from snapquery.sparql_analyzer import SparqlAnalyzer
+
+
+class TestSlowQueryLog(Basetest):
+    """
+    test the slow query log
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_structure(self):
+        """
+        test the structural summary of queries
+        """
+        query = """SELECT ?horse (COUNT(?mother) AS ?mothers) WHERE {
+  ?horse wdt:P31/wdt:P279* wd:Q726 ; rdfs:label ?label ; ^wdt:P40 ?parent .
+  OPTIONAL { ?horse wdt:P25 ?mother . }
+  { ?horse wdt:P21 ?sex } UNION { ?horse wdt:P571 ?born } UNION { ?horse wdt:P570 ?died }
+  SERVICE wikibase:label { bd:serviceParam wikibase:language "en" . }
+  { SELECT ?horse WHERE { ?horse wdt:P31 wd:Q726 } LIMIT 10 }
+  FILTER(LANG(?label) = "en")
+} GROUP BY ?horse ORDER BY ?horse"""
+        structure = SparqlAnalyzer.get_structure(query)
+        if self.debug:
+            print(structure)
+        expected = {
+            "triple_patterns": 9,
+            "optionals": 1,
+            "unions": 2,
+            "property_paths": 2,
+            "services": 1,
+            "subqueries": 1,
+            "filters": 1,
+            "group_by": 1,
+            "order_by": 1,
+        }
+        self.assertEqual(expected, structure)
+
+    def test_check(self):
+        """
+        test the threshold check of query stats
+        """
+        slow_query_log = SlowQueryLog(thresholds={"fast": 0.1}, default_threshold=1.0)
+        stats = QueryStats(query_id="q", endpoint_name="fast")
+        stats.duration = 0.5
+        slow_query = slow_query_log.check(stats, sparql="SELECT * WHERE { ?s ?p ?o }")
+        self.assertEqual(0.1, slow_query.threshold)
+        self.assertEqual(1, slow_query.triple_patterns)
+        stats.endpoint_name = "other"
+        self.assertIsNone(slow_query_log.check(stats))
+        # timeouts are always slow
+        stats.error(Exception("HTTP Error 504: Query has timed out."))
+        slow_query = slow_query_log.check(stats, sparql="SELECT * WHERE { ?s ?p }")
+        self.assertEqual("Timeout", slow_query.error_category)
+        self.assertTrue(slow_query.parse_error)
+
+    def test_slow_execution(self):
+        """
+        test logging a slow execution on the local endpoint
+        """
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            self.assertEqual([], nqm.get_slow_queries())
+            nqm.slow_query_log.thresholds["local"] = 0.05
+            config = LocalEndpointConfig(latency=0.1)
+            with LocalSparqlEndpoint(config) as local:
+                local.register(nqm)
+                for name in ["cats", "bands", "cats"]:
+                    query_name = QueryName(name=name, namespace="snapquery-examples", domain="wikidata.org")
+                    nq = nqm.lookup(query_name)
+                    _lod, stats = nqm.execute_query(nq, params_dict={}, endpoint_name="local")
+            records = nqm.sql_db.query("SELECT * FROM SlowQuery WHERE stats_id=?", (stats.stats_id,))
+            self.assertEqual(1, len(records))
+            slow_query = SlowQuery(**records[0])
+            self.assertGreaterEqual(slow_query.duration, 0.1)
+            self.assertIn("wdt:P31", slow_query.sparql)
+            self.assertEqual(1, slow_query.optionals)
+            lod = nqm.get_slow_queries()
+            if self.debug:
+                print(lod)
+            self.assertEqual("cats--snapquery-examples@wikidata.org", lod[0]["query_id"])
+            self.assertEqual(2, lod[0]["count"])
+            self.assertIsNotNone(lod[0]["avg_first_byte"])
@@ -0,0 +1,84 @@
+"""
+Created on 2026-10-19
+
+@author: wf
+"""
+
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from basemkit.basetest import Basetest
+
+from snapquery.snapquery_core import NamedQueryManager, QueryStats
+from snapquery.snapshot_store import SnapshotStore
+
+
+class TestSnapshotStore(Basetest):
+    """
+    test content addressed result snapshots
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+
+    def test_snapshot_store(self):
+        """
+        test canonical hashing, deduplication and loading of snapshots
+        """
+        lod = [{"cat": "Q1", "catLabel": "Tom"}, {"cat": "Q2", "catLabel": "Felix"}]
+        reordered = [{"catLabel": "Felix", "cat": "Q2"}, {"catLabel": "Tom", "cat": "Q1"}]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SnapshotStore(base_path=tmpdir)
+            snapshot_hash = store.save(lod)
+            self.assertEqual(snapshot_hash, SnapshotStore.get_hash(reordered))
+            self.assertEqual(snapshot_hash, store.save(reordered))
+            self.assertEqual(1, len(list(store.base_path.glob("*/*.json.gz"))))
+            self.assertTrue(store.exists(snapshot_hash))
+            self.assertEqual(sorted(lod, key=lambda record: record["cat"]), store.load(snapshot_hash))
+            self.assertNotEqual(snapshot_hash, SnapshotStore.get_hash(lod[:1]))
+
+    def test_concurrent_save(self):
+        """
+        test saving the same snapshot from several threads at once
+        """
+        lod = [{"cat": f"Q{i}"} for i in range(1000)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SnapshotStore(base_path=tmpdir)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                hashes = set(executor.map(lambda _i: store.save(lod), range(32)))
+            self.assertEqual(1, len(hashes))
+            # no temporary files are left behind
+            self.assertEqual(1, len([path for path in store.base_path.rglob("*") if path.is_file()]))
+            self.assertEqual(len(lod), len(store.load(hashes.pop())))
+
+    def test_result_changes(self):
+        """
+        test change detection over the snapshots linked from the query stats
+        """
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            query_id = "horses--snapquery-examples@wikidata.org"
+            stats_list = []
+            for i, (endpoint_name, snapshot_hash) in enumerate(
+                [("wikidata", "a"), ("qlever-wikidata", "a"), ("wikidata", "a"), ("wikidata", "b")]
+            ):
+                stats = QueryStats(query_id=query_id, endpoint_name=endpoint_name, snapshot_hash=snapshot_hash)
+                stats.time_stamp = f"2026-10-19 12:00:0{i}"
+                stats_list.append(stats)
+            nqm.store_stats(stats_list)
+            changes = nqm.get_result_changes(query_id, endpoint_name="wikidata")
+            self.assertEqual(["a", "b"], [stats.snapshot_hash for stats in changes])
+            self.assertEqual(stats_list[3].stats_id, changes[1].stats_id)
+
+    def test_migrate_columns(self):
+        """
+        test that a QueryStats table of an older database gets the snapshot_hash column
+        """
+        with tempfile.NamedTemporaryFile(suffix=".db") as tmpfile:
+            nqm = NamedQueryManager.from_samples(db_path=tmpfile.name)
+            nqm.sql_db.execute("ALTER TABLE QueryStats DROP COLUMN snapshot_hash")
+            nqm = NamedQueryManager(db_path=tmpfile.name)
+            stats = QueryStats(query_id="horses--snapquery-examples@wikidata.org", endpoint_name="wikidata")
+            stats.snapshot_hash = "c"
+            nqm.store_stats([stats])
+            self.assertEqual(["c"], [change.snapshot_hash for change in nqm.get_result_changes(stats.query_id)])